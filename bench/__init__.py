@@ -0,0 +1,37 @@
+"""
+Бенчмарки на синтетичних даних.
+LifeHub Bot v4.0
+
+Запуск з кореня репозиторію: python -m bench.<скрипт> (параметри —
+в docstring кожного скрипта).
+
+Кожен скрипт працює з власною БД у BENCH_DIR (за замовчуванням
+<tmp>/lifehub-bench) — data/lifehub.db і .env (DATABASE_PATH, ARCHIVE_PATH)
+не чіпаються. Згенерована БД перевикористовується між запусками,
+--rebuild — згенерувати заново.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+BENCH_DIR = Path(os.getenv("BENCH_DIR", Path(tempfile.gettempdir()) / "lifehub-bench"))
+
+
+def use_database(name: str) -> Path:
+    """
+    Спрямувати бота на БД бенчмарку BENCH_DIR/name (і її архів).
+    Викликати ДО імпорту bot.* — config читає змінні середовища при імпорті.
+    """
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = BENCH_DIR / name
+    os.environ["DATABASE_PATH"] = str(path)
+    os.environ["ARCHIVE_PATH"] = str(path.with_name(f"{path.stem}-archive.db"))
+    return path
+
+
+def remove_database(path: Path) -> None:
+    """Видалити БД разом з -wal / -shm."""
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
@@ -0,0 +1,206 @@
+"""
+Бенчмарк холодного старту: процес → init_database → migrate →
+диспетчер з усіма роутерами → перший апдейт /today.
+LifeHub Bot v4.0
+
+    python -m bench.cold_start [--runs N] [--repo PATH] [--rebuild]
+
+Кожен прогін — окремий процес (холодні імпорти). Апдейт іде через
+dp.feed_update з фейковою сесією Bot API — мережі немає. БД —
+300 000 слів користувача апдейту (засіюється кодом перевіреної версії).
+Окремо — медіана 50 повторних init_database() / migrate() на актуальній
+схемі в одному процесі (саме їх прибирає відбиток схеми).
+
+--repo — виміряти іншу версію бота, наприклад до відбитка схеми:
+    git worktree add /tmp/lifehub-before ca64662~1
+    python -m bench.cold_start --repo /tmp/lifehub-before
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import io
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+_STARTED = time.perf_counter()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+USER_ID = 7
+WORDS = 300_000
+REPEATS = 50
+
+
+def _arg(name: str, default: str = None) -> str:
+    args = sys.argv[1:]
+    return args[args.index(name) + 1] if name in args else default
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                          ДОЧІРНІЙ ПРОЦЕС (--child ...)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def _seed() -> None:
+    from bot.database import migrations
+    from bot.database.models import init_database
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await init_database()
+        await migrations.migrate()
+    db = sqlite3.connect(os.environ["DATABASE_PATH"])
+    db.execute("INSERT OR IGNORE INTO user_settings (user_id) VALUES (?)", (USER_ID,))
+    start = date(2026, 1, 1)
+    db.executemany(
+        "INSERT INTO words (user_id, word, translation, due_date) VALUES (?, ?, ?, ?)",
+        (
+            (USER_ID, f"Wort{i}", f"слово {i}", (start + timedelta(days=i % 365)).isoformat())
+            for i in range(WORDS)
+        )
+    )
+    db.commit()
+    db.close()
+
+
+async def _repeat() -> None:
+    from bot.database import migrations
+    from bot.database.models import init_database
+
+    init_ms, migrate_ms = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            await init_database()
+            middle = time.perf_counter()
+            await migrations.migrate()
+            init_ms.append((middle - started) * 1000)
+            migrate_ms.append((time.perf_counter() - middle) * 1000)
+    print(f"init_database {statistics.median(init_ms):.2f} migrate {statistics.median(migrate_ms):.2f}")
+
+
+def _first_update() -> None:
+    import bot.main as main
+    from aiogram import Bot, Dispatcher
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.client.session.base import BaseSession
+    from aiogram.types import Chat, Message, Update, User
+    imported = time.perf_counter()
+
+    class FakeSession(BaseSession):
+        """Кожен запит до Bot API — одразу "надіслане" повідомлення."""
+
+        async def make_request(self, bot, method, timeout=None):
+            return Message(message_id=1, date=datetime.now(), chat=Chat(id=USER_ID, type='private'), text="ok")
+
+        async def stream_content(self, *args, **kwargs):
+            yield b""
+
+        async def close(self):
+            pass
+
+    async def run() -> None:
+        started = time.perf_counter()
+        await main.init_database()
+        await main.migrations.migrate()
+        database = time.perf_counter()
+
+        # Як у bot.main.main(); getattr — старіші версії мають не всі middleware
+        bot = Bot("1:bench", session=FakeSession(), default=DefaultBotProperties(parse_mode="HTML"))
+        dp = Dispatcher()
+        metrics = getattr(main, "metrics_middleware", None)
+        if metrics is not None:
+            dp.update.outer_middleware(metrics.MetricsMiddleware())
+            metrics.setup(dp)
+        if hasattr(main, "DbSessionMiddleware"):
+            dp.update.outer_middleware(main.DbSessionMiddleware())
+            bot.session.middleware(main.CommitBeforeRequestMiddleware())
+        if hasattr(main, "ThrottlingMiddleware"):
+            dp.callback_query.outer_middleware(main.ThrottlingMiddleware())
+        for name in ("admin", "common", "tasks", "goals", "habits", "today", "stats",
+                     "data", "search", "inline", "words", "books"):
+            if hasattr(main, name):
+                dp.include_router(getattr(main, name).router)
+        ready = time.perf_counter()
+
+        user = User(id=USER_ID, is_bot=False, first_name="bench")
+        chat = Chat(id=USER_ID, type='private')
+        await dp.feed_update(bot, Update(
+            update_id=1,
+            message=Message(message_id=1, date=datetime.now(), chat=chat, from_user=user, text="/today"),
+        ))
+        done = time.perf_counter()
+        print(
+            f"import {(imported - _STARTED) * 1000:.0f} db {(database - started) * 1000:.1f} "
+            f"dispatcher {(ready - database) * 1000:.1f} update {(done - ready) * 1000:.1f} "
+            f"total {(done - _STARTED) * 1000:.0f}"
+        )
+
+    with contextlib.redirect_stdout(io.StringIO()) as captured:
+        asyncio.run(run())
+    print(captured.getvalue().splitlines()[-1])
+
+
+def child(mode: str) -> None:
+    sys.path.insert(0, _arg("--repo"))
+    if mode == "seed":
+        asyncio.run(_seed())
+    elif mode == "repeat":
+        asyncio.run(_repeat())
+    else:
+        _first_update()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                                 ЗАПУСК
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _spawn(mode: str, repo: Path) -> tuple:
+    """(stdout останній рядок, мс від запуску процесу до виходу)."""
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-m", "bench.cold_start", "--child", mode, "--repo", str(repo)],
+        cwd=ROOT, env=os.environ, capture_output=True, text=True,
+    )
+    wall = (time.perf_counter() - started) * 1000
+    if out.returncode:
+        raise RuntimeError(out.stderr[-2000:])
+    lines = out.stdout.strip().splitlines()
+    return (lines[-1] if lines else ""), wall
+
+
+def main() -> None:
+    from bench import remove_database, use_database
+
+    repo = Path(_arg("--repo", str(ROOT))).resolve()
+    runs = int(_arg("--runs", "5"))
+    tag = hashlib.sha1(str(repo).encode()).hexdigest()[:8]
+    db_path = use_database(f"cold_start-{tag}.db")
+
+    if "--rebuild" in sys.argv[1:]:
+        remove_database(db_path)
+    if not db_path.exists():
+        _spawn("seed", repo)
+        print(f"БД: {WORDS} слів ({db_path})")
+
+    print(f"{repo}: повторно, медіана {REPEATS} (мс): {_spawn('repeat', repo)[0]}")
+
+    walls = []
+    for _ in range(runs):
+        line, wall = _spawn("first-update", repo)
+        walls.append(wall)
+        print(f"  холодний старт (мс): {line}, процес {wall:.0f}")
+    print(f"медіана процесу до першого апдейту: {statistics.median(walls):.0f} мс")
+
+
+if __name__ == "__main__":
+    mode = _arg("--child")
+    if mode:
+        child(mode)
+    else:
+        main()
@@ -0,0 +1,84 @@
+"""
+Бенчмарк /export: користувач з 1M логів звичок.
+LifeHub Bot v4.0
+
+    python -m bench.export [csv|json] [--memory] [--rebuild]
+
+Перший запуск генерує БД (100 звичок × 10 000 днів логів одного
+користувача; кілька хвилин — тригери бітмап і пошуку), далі вона
+перевикористовується. Виводить час services.export.build_export, розмір
+архіву і max RSS процесу. --memory — ще й пік алокацій Python
+(tracemalloc; сам час тоді помітно більший).
+"""
+
+import asyncio
+import resource
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from bench import remove_database, use_database
+
+
+DB_PATH = use_database("export.db")
+
+HABITS = 100
+DAYS = 10_000
+USER_ID = 1
+
+
+async def seed() -> None:
+    from bot.database.models import init_database
+
+    await init_database()
+    db = sqlite3.connect(DB_PATH)
+    db.executemany(
+        "INSERT INTO goals (id, user_id, title, goal_type) VALUES (?, ?, ?, 'habit')",
+        [(goal_id, USER_ID, f"звичка {goal_id}") for goal_id in range(1, HABITS + 1)]
+    )
+    start = date(2000, 1, 1)
+    db.executemany(
+        "INSERT INTO habit_logs (goal_id, user_id, date, status) VALUES (?, ?, ?, 'done')",
+        (
+            (goal_id, USER_ID, (start + timedelta(days=day)).isoformat())
+            for goal_id in range(1, HABITS + 1)
+            for day in range(DAYS)
+        )
+    )
+    db.commit()
+    db.close()
+
+
+async def main(fmt: str, memory: bool, rebuild: bool) -> None:
+    from bot.services import export
+
+    if rebuild:
+        remove_database(DB_PATH)
+    if not DB_PATH.exists():
+        started = time.perf_counter()
+        await seed()
+        print(f"БД: {HABITS * DAYS} логів за {time.perf_counter() - started:.0f} с")
+
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    path, counts = await export.build_export(USER_ID, fmt)
+    elapsed = time.perf_counter() - started
+
+    peak = f", пік алокацій {tracemalloc.get_traced_memory()[1] / 1e6:.1f} МБ" if memory else ""
+    print(
+        f"{fmt}: {counts} за {elapsed:.1f} с, архів {path.stat().st_size / 1e6:.1f} МБ, "
+        f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3:.0f} МБ{peak}"
+    )
+    path.unlink()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        "json" if "json" in args else "csv",
+        "--memory" in args,
+        "--rebuild" in args,
+    ))
@@ -0,0 +1,129 @@
+"""
+Бенчмарк /import: файл на 50 000 рядків у CSV, JSON і JSON Lines.
+LifeHub Bot v4.0
+
+    python -m bench.importer [--rows N] [--per-row N]
+
+Генерує файли (10% звичок, 20 проєктів, кожна 13-та задача виконана —
+пропускається, кожна 7-ма повторювана) і для кожного формату імпортує
+в чисту БД: парсинг + валідація + вставка + перерахунок прогресу
+(services.importer.import_file). Для порівняння — --per-row задач
+(2000) по одній через queries.create_task.
+"""
+
+import asyncio
+import csv
+import json
+import random
+import sys
+import time
+
+from bench import BENCH_DIR, remove_database, use_database
+
+
+DB_PATH = use_database("import.db")
+
+USER_ID = 1
+PROJECTS = 20
+
+
+def make_rows(count: int, projects: list) -> list:
+    """Рядки файлу імпорту (детерміновано — random.seed)."""
+    random.seed(1)
+    rows = []
+    for i in range(count):
+        if i % 10 == 0:
+            rows.append({
+                'type': 'habit',
+                'title': f"звичка {i}",
+                'frequency': random.choice(['daily', 'weekdays', 'custom']),
+                'schedule_days': '1,3,5',
+                'reminder_time': '8:00',
+                'parent_id': random.choice(projects),
+            })
+            continue
+        row = {
+            'type': 'task',
+            'title': f"задача {i}",
+            'priority': i % 4,
+            'deadline': f"2026-11-0{i % 9 + 1}",
+            'scheduled_time': '09:30',
+            'goal_id': random.choice(projects + ['']),
+        }
+        if i % 7 == 0:
+            row.update(recurrence_rule='custom', recurrence_days='2,4')
+        if i % 13 == 0:
+            row['is_completed'] = 1
+        rows.append(row)
+    return rows
+
+
+def write_file(fmt: str, rows: list):
+    path = BENCH_DIR / f"import.{fmt}"
+    columns = sorted({key for row in rows for key in row})
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        elif fmt == 'json':
+            json.dump(rows, f, ensure_ascii=False)
+        else:
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    return path
+
+
+async def fresh_database() -> list:
+    """Чиста БД з коренем і PROJECTS проєктами. Повертає id проєктів."""
+    from bot.database import queries
+    from bot.database.models import init_database
+
+    remove_database(DB_PATH)
+    await init_database()
+    root = await queries.create_goal(USER_ID, "root", 'project')
+    return [
+        await queries.create_goal(USER_ID, f"проєкт {i}", 'project', parent_id=root)
+        for i in range(PROJECTS)
+    ]
+
+
+async def main(count: int, per_row: int) -> None:
+    from bot.database import queries
+    from bot.services import importer
+
+    for fmt in ('csv', 'json', 'jsonl'):
+        projects = await fresh_database()
+        path = write_file(fmt, make_rows(count, projects))
+
+        started = time.perf_counter()
+        result, counts = await importer.import_file(USER_ID, path)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{fmt:5s}: {counts}, пропущено {result.skipped}, помилок {result.error_count} — "
+            f"{elapsed:.2f} с, {count / elapsed:.0f} рядків/с"
+        )
+        path.unlink()
+
+    if per_row:
+        projects = await fresh_database()
+        tasks = [row for row in make_rows(per_row * 2, projects) if row['type'] == 'task'][:per_row]
+        started = time.perf_counter()
+        for row in tasks:
+            await queries.create_task(
+                USER_ID, row['title'],
+                priority=row['priority'],
+                deadline=row['deadline'],
+                scheduled_time=row['scheduled_time'],
+                goal_id=row['goal_id'] or None,
+            )
+        elapsed = time.perf_counter() - started
+        print(f"create_task по одній: {per_row} за {elapsed:.2f} с, {per_row / elapsed:.0f} рядків/с")
+
+
+def _arg(name: str, default: int) -> int:
+    args = sys.argv[1:]
+    return int(args[args.index(name) + 1]) if name in args else default
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_arg("--rows", 50_000), _arg("--per-row", 2000)))
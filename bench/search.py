@@ -0,0 +1,121 @@
+"""
+Бенчмарк /search: 1M проіндексованих рядків.
+LifeHub Bot v4.0
+
+    python -m bench.search [--rebuild]
+
+Перший запуск генерує БД через тригери search_index: 600k задач,
+100k цілей, 200k нотаток occurrences, 100k нотаток логів звичок
+(синтетичний словник зі складів — багато спільних префіксів). 20% рядків
+належить одному "важкому" користувачу (~200k документів), решта —
+2000 користувачам (~400 на кожного). Далі перевикористовується.
+
+Для кожного випадку — 100 запитів queries.search (перша сторінка),
+p50 / p95 і середня кількість результатів на сторінці.
+"""
+
+import asyncio
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+from bench import remove_database, use_database
+
+
+DB_PATH = use_database("search.db")
+
+HEAVY_USER = 1
+LIGHT_USER = 777
+
+_SYLLABLES = [
+    'ко', 'ра', 'ні', 'ти', 'про', 'гра', 'ма', 'ст', 'ва', 'ли', 'ен', 'де', 'бу', 'по', 'се',
+    'ло', 'ка', 'на', 'ре', 'мо', 'ан', 'гл', 'ій', 'сь', 'ку', 'ба', 'тр', 'зи', 'ль',
+]
+
+
+async def seed() -> None:
+    from bot.database.models import init_database
+
+    await init_database()
+    random.seed(1)
+    vocab = list({
+        "".join(random.choice(_SYLLABLES) for _ in range(random.randint(2, 4)))
+        for _ in range(8000)
+    })
+
+    def phrase(words: int) -> str:
+        return " ".join(random.choices(vocab, k=words))
+
+    def user() -> int:
+        return HEAVY_USER if random.random() < 0.2 else random.randint(2, 2000)
+
+    db = sqlite3.connect(DB_PATH)
+    db.executemany(
+        "INSERT INTO tasks (user_id, title, description) VALUES (?, ?, ?)",
+        ((user(), phrase(4), phrase(10) if random.random() < 0.3 else None) for _ in range(600_000))
+    )
+    db.executemany(
+        "INSERT INTO goals (user_id, title, description, goal_type) VALUES (?, ?, ?, ?)",
+        ((user(), phrase(3), phrase(8), random.choice(['project', 'habit', 'target'])) for _ in range(100_000))
+    )
+    db.executemany(
+        "INSERT INTO task_occurrences (task_id, user_id, date, notes) VALUES (?, ?, '2026-10-01', ?)",
+        ((i, user(), phrase(6)) for i in range(1, 200_001))
+    )
+    db.executemany(
+        "INSERT INTO habit_logs (goal_id, user_id, date, status, notes) VALUES (?, ?, '2026-10-01', 'done', ?)",
+        ((i, user(), phrase(5)) for i in range(1, 100_001))
+    )
+    db.commit()
+    db.close()
+
+
+def cases() -> list:
+    """(користувач, назва, запити) — з власних заголовків користувача."""
+    db = sqlite3.connect(DB_PATH)
+    result = []
+    for user_id, label in ((HEAVY_USER, "важкий (~200k)"), (LIGHT_USER, "легкий (~400)")):
+        titles = [
+            row[0].split()
+            for row in db.execute("SELECT title FROM tasks WHERE user_id = ? LIMIT 100", (user_id,))
+        ]
+        result += [
+            (user_id, f"{label}, слово з 2 літер", [t[0][:2] for t in titles]),
+            (user_id, f"{label}, префікс 3", [t[0][:3] for t in titles]),
+            (user_id, f"{label}, префікс 4", [t[0][:4] for t in titles]),
+            (user_id, f"{label}, ціле слово", [t[1] for t in titles]),
+            (user_id, f"{label}, два префікси", [f"{t[0][:3]} {t[2][:3]}" for t in titles]),
+        ]
+    db.close()
+    return result
+
+
+async def main(rebuild: bool) -> None:
+    from bot.database import queries
+
+    if rebuild:
+        remove_database(DB_PATH)
+    if not DB_PATH.exists():
+        started = time.perf_counter()
+        await seed()
+        print(f"БД: 1M рядків через тригери за {time.perf_counter() - started:.0f} с")
+
+    for user_id, label, texts in cases():
+        times = []
+        hits = 0
+        for text in texts:
+            started = time.perf_counter()
+            page = await queries.search(user_id, text)
+            times.append((time.perf_counter() - started) * 1000)
+            hits += len(page['items'])
+        times.sort()
+        print(
+            f"{label:32s} p50 {statistics.median(times):6.2f} мс  "
+            f"p95 {times[int(len(times) * 0.95)]:6.2f} мс  результатів {hits / len(times):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main("--rebuild" in sys.argv[1:]))
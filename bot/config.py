@@ -22,9 +22,27 @@ class Config:
     # Database
     DATABASE_PATH: Path = Path(os.getenv("DATABASE_PATH", "data/lifehub.db"))
     
-    # Timezone
+    # Архів історії: виконані задачі, occurrences і логи звичок, старші
+    # за ARCHIVE_AFTER_DAYS днів, переносяться в ARCHIVE_PATH.
+    # 0 (за замовчуванням) — не архівувати: з архівом резервна копія — два файли
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "0"))
+    ARCHIVE_PATH: Path = Path(os.getenv("ARCHIVE_PATH", "data/lifehub-archive.db"))
+    
+    # Timezone (дефолт для користувачів без user_settings.timezone)
     TIMEZONE: str = os.getenv("TIMEZONE", "Europe/Berlin")
     
+    # Профілювання: /metrics на 127.0.0.1:METRICS_PORT (0 — вимкнено)
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+    
+    # Лог апдейтів, довших за SLOW_UPDATE_MS, разом з їх SQL (0 — вимкнено)
+    SLOW_UPDATE_MS: int = int(os.getenv("SLOW_UPDATE_MS", "0"))
+    
+    # Частота callback-ів на (користувач, дія): THROTTLE_BURST підряд,
+    # далі THROTTLE_RATE на секунду; однакові в межах THROTTLE_COALESCE_MS склеюються
+    THROTTLE_RATE: float = float(os.getenv("THROTTLE_RATE", "2"))
+    THROTTLE_BURST: int = int(os.getenv("THROTTLE_BURST", "5"))
+    THROTTLE_COALESCE_MS: int = int(os.getenv("THROTTLE_COALESCE_MS", "500"))
+    
     # Default language
     DEFAULT_LANGUAGE: str = "uk"
     
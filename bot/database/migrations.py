@@ -0,0 +1,317 @@
+"""
+Версійні міграції схеми.
+LifeHub Bot v4.0
+
+init_database() створює базову схему (CREATE ... IF NOT EXISTS) —
+нова БД одразу має актуальні таблиці (повторно DDL не виконується, поки
+не зміниться models.py — відбиток у schema_meta). Зміни існуючих БД — тут:
+
+- версія схеми — PRAGMA user_version
+- Migration: нові колонки (ADD COLUMN, якщо ще немає) і DDL — швидко,
+  одна транзакція на міграцію, до старту polling (migrate())
+- Backfill: оновлення даних порціями по BACKFILL_BATCH рядків
+  (keyset по rowid, окрема транзакція на порцію, пауза між порціями) —
+  фоновою задачею, бот тим часом обслуговує апдейти (run_backfills()).
+  Прогрес у schema_backfills — після перезапуску продовжується з місця зупинки
+
+Кроки міграцій ідемпотентні: БД, створені до появи міграцій
+(user_version = 0), вже можуть мати частину змін.
+
+Нова зміна схеми = новий Migration в кінці MIGRATIONS. Нову колонку
+додати і в CREATE TABLE базової схеми (для нових БД), індекси на нові
+колонки — лише в міграції (на старій БД колонки ще немає).
+
+Оцінка часу на поточній БД (нічого не змінює — все відкочується):
+    python -m bot.database.migrations --dry-run
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.database.models import get_db
+
+
+logger = logging.getLogger(__name__)
+
+# Рядків на транзакцію backfill
+BACKFILL_BATCH = 5000
+
+# Пауза між порціями (секунди) — апдейти встигають взяти блокування на запис
+BACKFILL_PAUSE = 0.05
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """UPDATE {table} SET {assign} WHERE {where} — порціями по rowid."""
+    table: str
+    assign: str
+    where: str
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    # (таблиця, колонка, визначення) — ADD COLUMN, якщо колонки немає
+    columns: Tuple[Tuple[str, str, str], ...] = ()
+    # DDL після колонок (IF NOT EXISTS / IF EXISTS)
+    statements: Tuple[str, ...] = ()
+    backfill: Optional[Backfill] = None
+
+
+MIGRATIONS = (
+    Migration(
+        1, "books: файли і прив'язка до цілі",
+        columns=(
+            ('books', 'file_unique_id', "TEXT"),
+            ('books', 'file_name', "TEXT"),
+            ('books', 'goal_id', "INTEGER"),
+            ('books', 'goal_unit', "TEXT CHECK(goal_unit IN ('pages', 'books'))"),
+        ),
+        statements=(
+            # Сторінки бібліотеки: keyset по id в межах (user_id, status)
+            "CREATE INDEX IF NOT EXISTS ix_books_page ON books(user_id, status, id)",
+            # Один файл — одна книга в бібліотеці користувача; метадані файлу спільні
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_books_file
+            ON books(file_unique_id, user_id) WHERE file_unique_id IS NOT NULL
+            """,
+        ),
+    ),
+    Migration(
+        2, "words: черга повторення SM-2",
+        statements=(
+            # Черга повторення: (user_id, due_date) + rowid — keyset по (due_date, id)
+            "CREATE INDEX IF NOT EXISTS ix_words_user_due ON words(user_id, due_date)",
+            "DROP INDEX IF EXISTS ix_words_user",
+            "DROP INDEX IF EXISTS ix_words_due",
+        ),
+        # Слова без due_date — до черги з дня додавання
+        backfill=Backfill('words', "due_date = DATE(created_at)", "due_date IS NULL"),
+    ),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def _ensure_progress_table(db) -> None:
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_backfills (
+            version INTEGER PRIMARY KEY,
+            last_rowid INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+async def _user_version(db) -> int:
+    cursor = await db.execute("PRAGMA user_version")
+    return (await cursor.fetchone())[0]
+
+
+async def _apply_schema(db, migration: Migration) -> None:
+    """Колонки + DDL + запис про backfill + user_version (без commit)."""
+    for table, column, definition in migration.columns:
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        if column not in {row['name'] for row in await cursor.fetchall()}:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    
+    for sql in migration.statements:
+        await db.execute(sql)
+    
+    if migration.backfill is not None:
+        await db.execute(
+            "INSERT OR IGNORE INTO schema_backfills (version) VALUES (?)",
+            (migration.version,)
+        )
+    # PRAGMA не приймає параметрів; version — int з MIGRATIONS
+    await db.execute(f"PRAGMA user_version = {int(migration.version)}")
+
+
+async def migrate() -> List[int]:
+    """Застосувати схему всіх нових міграцій. Повертає застосовані версії."""
+    db = await get_db()
+    try:
+        # Звичайний старт: схема вже остання — лише PRAGMA, без DDL і commit
+        current = await _user_version(db)
+        if current >= LATEST_VERSION:
+            return []
+        await _ensure_progress_table(db)
+        await db.commit()
+    
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            try:
+                await db.execute("BEGIN IMMEDIATE")
+                await _apply_schema(db, migration)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            logger.info(f"🧱 Міграція {migration.version}: {migration.name}")
+            applied.append(migration.version)
+        return applied
+    finally:
+        await db.close()
+
+
+async def _max_rowid(db, table: str) -> int:
+    cursor = await db.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}")
+    return (await cursor.fetchone())[0]
+
+
+async def _backfill_batch(db, backfill: Backfill, after: int, end: int) -> Tuple[int, Optional[int]]:
+    """
+    Одна порція: рядки з rowid у (after, upper], де upper — BACKFILL_BATCH-й rowid
+    (не далі end). Повертає (оновлено рядків, upper або None — діапазон пройдено).
+    """
+    cursor = await db.execute(
+        f"""
+        SELECT MAX(rowid) FROM (
+            SELECT rowid FROM {backfill.table} WHERE rowid > ? AND rowid <= ?
+            ORDER BY rowid LIMIT ?
+        )
+        """,
+        (after, end, BACKFILL_BATCH)
+    )
+    upper = (await cursor.fetchone())[0]
+    if upper is None:
+        return 0, None
+    
+    cursor = await db.execute(
+        f"""
+        UPDATE {backfill.table} SET {backfill.assign}
+        WHERE rowid > ? AND rowid <= ? AND ({backfill.where})
+        """,
+        (after, upper)
+    )
+    return cursor.rowcount, upper
+
+
+async def run_backfills() -> int:
+    """
+    Незавершені backfill-и порціями (фонова задача після старту).
+    Повертає кількість оновлених рядків.
+    """
+    by_version = {m.version: m for m in MIGRATIONS if m.backfill is not None}
+    updated = 0
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT version, last_rowid FROM schema_backfills WHERE done = 0 ORDER BY version"
+        )
+        pending = [(row['version'], row['last_rowid']) for row in await cursor.fetchall()]
+    
+        for version, after in pending:
+            migration = by_version.get(version)
+            if migration is None:
+                continue
+            started = time.perf_counter()
+            # Рядки, додані після старту, пише вже новий код — до них не йдемо
+            end = await _max_rowid(db, migration.backfill.table)
+            while True:
+                try:
+                    await db.execute("BEGIN IMMEDIATE")
+                    count, upper = await _backfill_batch(db, migration.backfill, after, end)
+                    await db.execute(
+                        "UPDATE schema_backfills SET last_rowid = ?, done = ? WHERE version = ?",
+                        (upper or after, upper is None, version)
+                    )
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+                updated += count
+                if upper is None:
+                    break
+                after = upper
+                await asyncio.sleep(BACKFILL_PAUSE)
+            logger.info(
+                f"🧱 Backfill {version} ({migration.name}): "
+                f"{time.perf_counter() - started:.1f} с"
+            )
+        return updated
+    finally:
+        await db.close()
+
+
+async def estimate() -> List[Dict[str, Any]]:
+    """
+    Dry run: схема нових міграцій і по одній порції кожного backfill
+    виконуються в транзакції, час міряється, все відкочується.
+    Оцінка backfill = час порції × кількість порцій + паузи.
+    """
+    report = []
+    db = await get_db()
+    try:
+        current = await _user_version(db)
+    
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            # schema_backfills (якщо її ще немає) теж лише в цій транзакції
+            await _ensure_progress_table(db)
+            cursor = await db.execute("SELECT version, last_rowid FROM schema_backfills WHERE done = 0")
+            resume = {row['version']: row['last_rowid'] for row in await cursor.fetchall()}
+    
+            for migration in MIGRATIONS:
+                pending_schema = migration.version > current
+                if not pending_schema and migration.version not in resume:
+                    continue
+    
+                entry = {'version': migration.version, 'name': migration.name,
+                         'schema_ms': None, 'rows': 0, 'batches': 0, 'backfill_s': 0.0}
+                if pending_schema:
+                    started = time.perf_counter()
+                    await _apply_schema(db, migration)
+                    entry['schema_ms'] = (time.perf_counter() - started) * 1000
+    
+                if migration.backfill is not None:
+                    after = resume.get(migration.version, 0)
+                    cursor = await db.execute(
+                        f"SELECT COUNT(*) FROM {migration.backfill.table} WHERE rowid > ?", (after,)
+                    )
+                    entry['rows'] = (await cursor.fetchone())[0]
+                    entry['batches'] = -(-entry['rows'] // BACKFILL_BATCH)
+                    if entry['rows']:
+                        end = await _max_rowid(db, migration.backfill.table)
+                        started = time.perf_counter()
+                        await _backfill_batch(db, migration.backfill, after, end)
+                        per_batch = time.perf_counter() - started
+                        entry['backfill_s'] = entry['batches'] * (per_batch + BACKFILL_PAUSE)
+                report.append(entry)
+        finally:
+            await db.rollback()
+        return report
+    finally:
+        await db.close()
+
+
+async def _main(dry_run: bool) -> None:
+    if dry_run:
+        report = await estimate()
+        if not report:
+            print(f"✅ Схема актуальна (user_version = {LATEST_VERSION})")
+        for entry in report:
+            schema = f"{entry['schema_ms']:.0f} мс" if entry['schema_ms'] is not None else "застосовано"
+            print(
+                f"{entry['version']}. {entry['name']}: схема {schema}; "
+                f"backfill {entry['rows']} рядків / {entry['batches']} порцій ≈ {entry['backfill_s']:.1f} с"
+            )
+        return
+    
+    from bot.database.models import init_database
+    await init_database()
+    print(f"🧱 Застосовано: {await migrate() or '—'}")
+    print(f"🧱 Backfill: {await run_backfills()} рядків")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main("--dry-run" in sys.argv))
@@ -7,35 +7,362 @@ LifeHub Bot v4.0
 - tasks (one-time + recurring з is_fixed)
 - task_occurrences (для recurring tasks)
 - goals (project, habit, target, metric) — БЕЗ 'task' типу!
+- goal_closure (всі пари предок → нащадок ієрархії goals, підтримується тригерами)
 - habit_logs
+- habit_bitmaps (статуси днів звички, 2 біти на день, рік — один blob; підтримуються тригерами)
 - goal_entries
+- goal_entry_buckets (тижневі / місячні агрегати goal_entries, підтримуються тригерами)
+- daily_stats (знімок дня, пише day rollover)
+- day_rollovers (які дні вже закриті для кожного часового поясу)
+- search_index (FTS5: задачі, цілі, нотатки occurrences і логів звичок) + search_owners
+- chart_cache (хеш даних графіка → Telegram file_id)
 - books (Фаза 3)
 - words (Фаза 3)
+- schema_backfills (прогрес фонових backfill міграцій)
+- schema_meta (відбиток базової схеми — init_database() пропускає DDL, якщо він актуальний)
+
+Зміни схеми існуючих БД (колонки, індекси, backfill) — migrations.py,
+версія — PRAGMA user_version.
+
+Архів історії (старі виконані задачі, occurrences, логи звичок) — окремий
+файл config.ARCHIVE_PATH, підключається через attach_archive() (queries, розділ Archive).
 
 ВИДАЛЕНО: time_blocks, time_block_skips (замінено на recurring tasks з is_fixed=1)
 """
 
+import asyncio
+import hashlib
+import sqlite3
+import time
+from contextvars import ContextVar, Token
+from datetime import date
+from typing import Callable, List, Optional, Tuple
+
 import aiosqlite
 from bot.config import config
 
 
-async def get_db() -> aiosqlite.Connection:
+# Джерела повнотекстового пошуку:
+# (таблиця, код у rowid, title, body, умова індексації, колонки для UPDATE-тригера)
+# {r} — new / old / назва таблиці (для backfill)
+SEARCH_SOURCES = (
+    ('tasks', 0, "{r}.title", "COALESCE({r}.description, '')", "1", "title, description"),
+    ('goals', 1, "{r}.title", "COALESCE({r}.description, '')", "1", "title, description"),
+    ('task_occurrences', 2, "''", "{r}.notes", "COALESCE({r}.notes, '') != ''", "notes"),
+    ('habit_logs', 3, "''", "{r}.notes", "COALESCE({r}.notes, '') != ''", "notes"),
+)
+
+# rowid у search_index: owner << SEARCH_OWNER_SHIFT | id << 2 | код джерела.
+# owner — компактний номер користувача (search_owners), до 2^24 користувачів,
+# id — до 2^37. Всі документи користувача лежать в одному діапазоні rowid,
+# і FTS5 фільтрує по ньому без перебору чужих документів.
+SEARCH_OWNER_SHIFT = 39
+
+# Агрегати goal_entries: зерно → (початок кошика, початок наступного) для дати {d}
+ENTRY_BUCKET_GRAINS = {
+    'week': ("date({d}, 'weekday 0', '-6 days')", "date({d}, 'weekday 0', '+1 day')"),
+    'month': ("date({d}, 'start of month')", "date({d}, 'start of month', '+1 month')"),
+}
+
+# Бітмапа звички: рік = HABIT_BITMAP_BYTES байтів, день року i (0..365) —
+# біти (i % 4) * 2 байта i // 4; код статусу (0 — логу немає)
+HABIT_STATUS_CODES = {'done': 1, 'skipped': 2, 'missed': 3}
+HABIT_BITMAP_BYTES = 92
+
+# Усі 256 байтів по порядку: substr() дає байт за значенням, instr() — значення байта
+# (у SQLite немає побайтового запису в BLOB)
+_BYTE_TABLE = "X'" + "".join(f"{value:02X}" for value in range(256)) + "'"
+
+
+def search_rowid_sql(table: str, ref: str) -> str:
+    """rowid документа search_index для рядка {ref} джерела table."""
+    code = next(source[1] for source in SEARCH_SOURCES if source[0] == table)
+    return (
+        f"((SELECT owner FROM search_owners WHERE user_id = {ref}.user_id) "
+        f"<< {SEARCH_OWNER_SHIFT}) | ({ref}.id << 2) | {code}"
+    )
+
+
+def search_documents_sql(table: str, ref: str, source: str = "") -> str:
     """
-    Єдина точка доступу до БД.
-    Використовуй ТІЛЬКИ цю функцію!
+    SELECT rowid, title, body документів для рядків {ref} джерела table
+    (тригери, перше заповнення індексу, архів історії). WHERE — умова індексації,
+    викликаючий код може дописати AND ...
     """
+    _, _, title, body, condition, _ = next(s for s in SEARCH_SOURCES if s[0] == table)
+    return (
+        f"SELECT {search_rowid_sql(table, ref)}, {title.format(r=ref)}, {body.format(r=ref)} "
+        f"{source} WHERE {condition.format(r=ref)}"
+    )
+
+
+def habit_status_code_sql(status: str) -> str:
+    """Код статусу логу звички (HABIT_STATUS_CODES) для SQL-виразу status."""
+    cases = " ".join(f"WHEN '{name}' THEN {code}" for name, code in HABIT_STATUS_CODES.items())
+    return f"CASE {status} {cases} ELSE 0 END"
+
+
+def habit_bitmap_set_sql(bits: str, day: str, code: str) -> str:
+    """SQL-вираз: бітмапа bits з кодом code для дня day (ISO-дата) її року."""
+    index = f"(CAST(strftime('%j', {day}) AS INTEGER) - 1)"
+    offset = f"({index} / 4)"
+    shift = f"(({index} % 4) * 2)"
+    old = f"(instr({_BYTE_TABLE}, substr({bits}, {offset} + 1, 1)) - 1)"
+    new = f"(({old} & ~(3 << {shift})) | (({code}) << {shift}))"
+    # || дає TEXT з тими самими байтами — назад у BLOB
+    return (
+        f"CAST(substr({bits}, 1, {offset}) || substr({_BYTE_TABLE}, {new} + 1, 1) "
+        f"|| substr({bits}, {offset} + 2) AS BLOB)"
+    )
+
+
+def set_habit_bit(bits: bytearray, day_index: int, code: int) -> None:
+    """Те саме в Python (перше заповнення habit_bitmaps): день року day_index (0..365)."""
+    shift = (day_index % 4) * 2
+    bits[day_index // 4] = (bits[day_index // 4] & ~(3 << shift)) | (code << shift)
+
+
+async def _connect() -> aiosqlite.Connection:
     db = await aiosqlite.connect(config.DATABASE_PATH)
     db.row_factory = aiosqlite.Row
+    await db.execute("PRAGMA synchronous = NORMAL")
     return db
 
 
+async def get_db(detached: bool = False) -> aiosqlite.Connection:
+    """
+    Єдина точка доступу до БД.
+    Використовуй ТІЛЬКИ цю функцію!
+    
+    Всередині апдейту (DbSession) — спільне з'єднання апдейту,
+    інакше — нове з'єднання.
+    detached=True — завжди окреме з'єднання зі справжнім commit
+    (обслуговування: VACUUM і checkpoint не працюють у транзакції).
+    """
+    session = None if detached else current_session()
+    if session is not None:
+        return await session.connection()
+    return await _connect()
+
+
+async def attach_archive(db: aiosqlite.Connection) -> None:
+    """
+    Підключити архів історії (config.ARCHIVE_PATH) як schema archive.
+    Раз на з'єднання; лише запитам, яким потрібна історія за межею архіву
+    (див. queries, розділ Archive).
+    """
+    cursor = await db.execute("SELECT 1 FROM pragma_database_list WHERE name = 'archive'")
+    if await cursor.fetchone() is None:
+        await db.execute("ATTACH DATABASE ? AS archive", (str(config.ARCHIVE_PATH),))
+        # Пишуть в архів лише з'єднання архіватора (поза транзакцією);
+        # всередині транзакції SQLite не дозволяє міняти synchronous
+        if not db.in_transaction:
+            await db.execute("PRAGMA archive.synchronous = NORMAL")
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                         СЕСІЯ АПДЕЙТУ (unit of work)                         ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+#
+# Один апдейт Telegram = одне з'єднання і одна транзакція.
+# Запити, як і раніше, роблять get_db() / commit() / close(), але в сесії
+# отримують обгортку спільного з'єднання:
+#   close()    — нічого (закриває сесія)
+#   commit()   — відкладено: сесія комітить перед запитом до Bot API
+#                (транзакція не тримає блокування під час мережі) і в кінці апдейту
+#   rollback() — відкат усієї незакоміченої роботи апдейту
+# Сесія прив'язана до задачі апдейту: фонові задачі (create_task копіює
+# contextvars) відкривають власні з'єднання.
+# Керують сесією bot/middlewares/db.py.
+#
+# Сесія також рахує SQL апдейту для профілювання (bot/middlewares/metrics.py):
+# statements (виклики execute* — тригери і службові запити FTS5 входять
+# у свій запит), db_time (час у aiosqlite, з чергою потоку) і тексти запитів,
+# якщо увімкнено лог повільних апдейтів (SLOW_UPDATE_MS).
+
+# Функції sqlite3, які aiosqlite викликає для execute / executemany / executescript /
+# execute_fetchall / execute_insert (з'єднання і курсора) — перший аргумент SQL
+_STATEMENT_CALLS = frozenset({
+    'execute', 'executemany', 'executescript', '_execute_fetchall', '_execute_insert'
+})
+
+_current_session: ContextVar[Optional["DbSession"]] = ContextVar("db_session", default=None)
+
+
+class _SessionConnection:
+    """Обгортка з'єднання сесії для коду запитів."""
+
+    def __init__(self, session: "DbSession", db: aiosqlite.Connection):
+        self._session = session
+        self._db = db
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        await self._session.rollback()
+
+    async def close(self) -> None:
+        pass
+
+
+class DbSession:
+    """З'єднання і транзакція одного апдейту."""
+
+    def __init__(self):
+        self.task = asyncio.current_task()
+        self.connections = 0
+        self.commits = 0
+        self.statements = 0
+        self.db_time = 0.0
+        self.sql: Optional[List[str]] = [] if config.SLOW_UPDATE_MS else None
+        self._db: Optional[aiosqlite.Connection] = None
+        self._proxy: Optional[_SessionConnection] = None
+        self._after_commit: List[Callable[[], None]] = []
+
+    async def connection(self) -> _SessionConnection:
+        """З'єднання відкривається при першому запиті (апдейт без БД — без з'єднання)."""
+        if self._db is None:
+            start = time.perf_counter()
+            self._db = await _connect()
+            self.db_time += time.perf_counter() - start
+            self._instrument(self._db)
+            self._proxy = _SessionConnection(self, self._db)
+            self.connections += 1
+        return self._proxy
+
+    def _instrument(self, db: aiosqlite.Connection) -> None:
+        # Всі виклики aiosqlite (execute, fetch*, commit) йдуть через Connection._execute
+        execute = db._execute
+
+        async def timed(fn, *args, **kwargs):
+            # Рахуємо там, де запит видається: trace callback SQLite повторює
+            # запит для кожного тригера, який він запускає
+            if getattr(fn, '__name__', None) in _STATEMENT_CALLS:
+                self.statements += 1
+                if self.sql is not None:
+                    self.sql.append(args[0])
+            start = time.perf_counter()
+            try:
+                return await execute(fn, *args, **kwargs)
+            finally:
+                self.db_time += time.perf_counter() - start
+
+        db._execute = timed
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Виконати після commit (інвалідація кешів — лише закомічені дані)."""
+        self._after_commit.append(callback)
+
+    async def commit(self) -> None:
+        if self._db is not None and self._db.in_transaction:
+            await self._db.commit()
+            self.commits += 1
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    async def rollback(self) -> None:
+        self._after_commit = []
+        if self._db is not None and self._db.in_transaction:
+            await self._db.rollback()
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+def current_session() -> Optional[DbSession]:
+    """Сесія поточного апдейту (None — поза апдейтом або у фоновій задачі)."""
+    session = _current_session.get()
+    if session is not None and session.task is asyncio.current_task():
+        return session
+    return None
+
+
+def start_session() -> Tuple[DbSession, Token]:
+    session = DbSession()
+    return session, _current_session.set(session)
+
+
+def end_session(token: Token) -> None:
+    _current_session.reset(token)
+
+
+def _schema_fingerprint() -> str:
+    """
+    Відбиток базової схеми: DDL, SEARCH_SOURCES, тригери — все в цьому файлі.
+    Будь-яка зміна файлу = один повний прогін DDL на старті (він ідемпотентний).
+    """
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+async def _schema_current(db: aiosqlite.Connection, fingerprint: str) -> bool:
+    try:
+        cursor = await db.execute("SELECT value FROM schema_meta WHERE key = 'schema'")
+    except sqlite3.OperationalError:
+        # Нова БД або створена до schema_meta
+        return False
+    row = await cursor.fetchone()
+    return row is not None and row[0] == fingerprint
+
+
+async def _fill_habit_bitmaps(db: aiosqlite.Connection) -> None:
+    """Перше заповнення habit_bitmaps з усіх логів звичок (і з архіву історії)."""
+    source = "SELECT goal_id, user_id, date, status FROM main.habit_logs"
+    if config.ARCHIVE_PATH.exists():
+        await attach_archive(db)
+        cursor = await db.execute(
+            "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = 'habit_logs'"
+        )
+        if await cursor.fetchone() is not None:
+            source += " UNION ALL SELECT goal_id, user_id, date, status FROM archive.habit_logs"
+    
+    bitmaps = {}
+    cursor = await db.execute(source)
+    for goal_id, user_id, day, status in await cursor.fetchall():
+        day = date.fromisoformat(day)
+        key = (goal_id, day.year)
+        if key not in bitmaps:
+            bitmaps[key] = (user_id, bytearray(HABIT_BITMAP_BYTES))
+        set_habit_bit(bitmaps[key][1], day.timetuple().tm_yday - 1, HABIT_STATUS_CODES[status])
+    
+    await db.executemany(
+        "INSERT OR REPLACE INTO habit_bitmaps (goal_id, year, user_id, bits) VALUES (?, ?, ?, ?)",
+        [(goal_id, year, user_id, bytes(bits)) for (goal_id, year), (user_id, bits) in bitmaps.items()]
+    )
+
+
 async def init_database() -> None:
-    """Ініціалізує базу даних та створює таблиці."""
+    """
+    Ініціалізує базу даних та створює таблиці.
+    
+    Якщо відбиток схеми в schema_meta збігається — один SELECT замість
+    ~100 DDL і seed (без блокування на запис).
+    """
     
     config.DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fingerprint = _schema_fingerprint()
     
     async with aiosqlite.connect(config.DATABASE_PATH) as db:
         
+        if await _schema_current(db, fingerprint):
+            print("✅ База даних актуальна (v4.0)")
+            return
+        
+        # Нова БД — одразу з incremental vacuum (/perf optimize повертає
+        # вільні сторінки); існуючу переводить /perf vacuum
+        await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
+        # WAL: читання не чекають на транзакцію апдейту, яка пише
+        # (режим зберігається у файлі БД; synchronous = NORMAL — в _connect)
+        await db.execute("PRAGMA journal_mode = WAL")
+        
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                    НАЛАШТУВАННЯ КОРИСТУВАЧА                     ║
         # ╚════════════════════════════════════════════════════════════════╝
@@ -107,6 +434,13 @@ async def init_database() -> None:
         await db.execute("CREATE INDEX IF NOT EXISTS ix_tasks_deadline ON tasks(deadline)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_tasks_goal ON tasks(goal_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_tasks_recurring ON tasks(is_recurring)")
+        # Keyset-пагінація списків задач (queries.get_tasks_page)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS ix_tasks_page ON tasks(
+                user_id, is_recurring, is_completed,
+                priority, COALESCE(scheduled_time, '99:99'), id
+            )
+        """)
         
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                    ВХОДЖЕННЯ ЗАДАЧ (Occurrences)                ║
@@ -126,7 +460,7 @@ async def init_database() -> None:
                 
                 date DATE NOT NULL,
                 occurrence_number INTEGER,        -- Порядковий номер: 1, 2, 3...
-                status TEXT DEFAULT 'pending',    -- pending, done, skipped
+                status TEXT DEFAULT 'pending',    -- pending, done, skipped, missed (rollover)
                 
                 notes TEXT,
                 completed_at DATETIME,
@@ -140,6 +474,7 @@ async def init_database() -> None:
         
         await db.execute("CREATE INDEX IF NOT EXISTS ix_task_occ_date ON task_occurrences(date)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_task_occ_task ON task_occurrences(task_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS ix_task_occ_user ON task_occurrences(user_id)")
         
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                         ЦІЛІ (Goals v3)                         ║
@@ -204,6 +539,94 @@ async def init_database() -> None:
         await db.execute("CREATE INDEX IF NOT EXISTS ix_goals_type ON goals(goal_type)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_goals_parent ON goals(parent_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_goals_status ON goals(status)")
+        await db.execute("CREATE INDEX IF NOT EXISTS ix_goals_page ON goals(user_id, status, id)")
+        
+        # ╔════════════════════════════════════════════════════════════════╗
+        # ║                   ІЄРАРХІЯ ЦІЛЕЙ (closure)                      ║
+        # ╚════════════════════════════════════════════════════════════════╝
+        #
+        # goal_closure — кожна пара (предок, нащадок) з відстанню depth,
+        # включно з (id, id, 0). Піддерево, предки і перевірка циклу —
+        # один індексований запит замість рекурсивного обходу parent_id.
+        #
+        # Синхронізація — тригерами на goals:
+        # - INSERT: шляхи від усіх предків батька + (id, id, 0)
+        # - UPDATE parent_id: піддерево відрізається від старих предків
+        #   і приєднується до нових; переміщення в своє піддерево — ABORT
+        # - DELETE: діти стають кореневими (як ON DELETE SET NULL)
+        #
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'goal_closure'"
+        )
+        goal_closure_exists = await cursor.fetchone() is not None
+        
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS goal_closure (
+                ancestor INTEGER NOT NULL,
+                descendant INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                PRIMARY KEY (ancestor, descendant)
+            ) WITHOUT ROWID
+        """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_goal_closure_descendant ON goal_closure(descendant, depth)"
+        )
+        
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS goals_closure_ai AFTER INSERT ON goals BEGIN
+                INSERT INTO goal_closure (ancestor, descendant, depth)
+                VALUES (new.id, new.id, 0);
+                INSERT INTO goal_closure (ancestor, descendant, depth)
+                SELECT ancestor, new.id, depth + 1 FROM goal_closure
+                WHERE descendant = new.parent_id;
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS goals_closure_cycle
+            BEFORE UPDATE OF parent_id ON goals
+            WHEN new.parent_id IS NOT NULL AND EXISTS (
+                SELECT 1 FROM goal_closure
+                WHERE ancestor = new.id AND descendant = new.parent_id
+            )
+            BEGIN
+                SELECT RAISE(ABORT, 'goal hierarchy cycle');
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS goals_closure_au
+            AFTER UPDATE OF parent_id ON goals
+            WHEN old.parent_id IS NOT new.parent_id
+            BEGIN
+                DELETE FROM goal_closure
+                WHERE descendant IN (SELECT descendant FROM goal_closure WHERE ancestor = new.id)
+                  AND ancestor NOT IN (SELECT descendant FROM goal_closure WHERE ancestor = new.id);
+                INSERT INTO goal_closure (ancestor, descendant, depth)
+                SELECT up.ancestor, down.descendant, up.depth + down.depth + 1
+                FROM goal_closure up, goal_closure down
+                WHERE up.descendant = new.parent_id AND down.ancestor = new.id;
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS goals_closure_ad AFTER DELETE ON goals BEGIN
+                UPDATE goals SET parent_id = NULL WHERE parent_id = old.id;
+                DELETE FROM goal_closure WHERE ancestor = old.id OR descendant = old.id;
+            END
+        """)
+        
+        if not goal_closure_exists:
+            # Побудова з існуючих даних (depth < 64 — захист від старих циклів)
+            await db.execute("""
+                INSERT INTO goal_closure (ancestor, descendant, depth)
+                WITH RECURSIVE paths(ancestor, descendant, depth) AS (
+                    SELECT id, id, 0 FROM goals
+                    UNION ALL
+                    SELECT p.ancestor, g.id, p.depth + 1
+                    FROM paths p JOIN goals g ON g.parent_id = p.descendant
+                    WHERE p.depth < 64
+                )
+                SELECT ancestor, descendant, MIN(depth) FROM paths
+                GROUP BY ancestor, descendant
+            """)
         
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                        ЛОГИ ЗВИЧОК                              ║
@@ -213,8 +636,8 @@ async def init_database() -> None:
         # status:
         # - done: виконано (streak +1)
         # - skipped: пропущено (streak зберігається)
-        # - missed: пропуск (streak = 0) — НЕ використовується напряму,
-        #           відсутність запису = missed
+        # - missed: пропуск (streak = 0) — ставить day rollover
+        #           для незалогованих запланованих звичок після опівночі
         #
         await db.execute("""
             CREATE TABLE IF NOT EXISTS habit_logs (
@@ -235,7 +658,55 @@ async def init_database() -> None:
         
         await db.execute("CREATE INDEX IF NOT EXISTS ix_habit_logs_date ON habit_logs(date)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_habit_logs_goal ON habit_logs(goal_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS ix_habit_logs_user ON habit_logs(user_id)")
+
+        # Бітмапи звичок: рядок на (звичка, рік), статус дня — 2 біти
+        # (HABIT_STATUS_CODES). Streak, heatmap і статистика звички читають
+        # 92 байти на рік замість сотень логів — і без архіву історії.
+        # INSERT / UPDATE логу — тригери. DELETE біт не чіпає: архіватор
+        # переносить рядки, історія лишається; скасування логу —
+        # queries.unlog_habit() (прибирає і біт).
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'habit_bitmaps'"
+        )
+        habit_bitmaps_exist = await cursor.fetchone() is not None
         
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS habit_bitmaps (
+                goal_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                bits BLOB NOT NULL,
+                PRIMARY KEY (goal_id, year)
+            ) WITHOUT ROWID
+        """)
+        
+        def set_bit(ref: str, code: str) -> str:
+            return f"""
+                INSERT INTO habit_bitmaps (goal_id, year, user_id, bits)
+                VALUES ({ref}.goal_id, CAST(strftime('%Y', {ref}.date) AS INTEGER),
+                        {ref}.user_id, zeroblob({HABIT_BITMAP_BYTES}))
+                ON CONFLICT (goal_id, year) DO NOTHING;
+                UPDATE habit_bitmaps SET bits = {habit_bitmap_set_sql("bits", f"{ref}.date", code)}
+                WHERE goal_id = {ref}.goal_id AND year = CAST(strftime('%Y', {ref}.date) AS INTEGER);
+            """
+        
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS habit_logs_bits_ai AFTER INSERT ON habit_logs BEGIN
+                {set_bit("new", habit_status_code_sql("new.status"))}
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS habit_logs_bits_au
+            AFTER UPDATE OF goal_id, date, status ON habit_logs BEGIN
+                {set_bit("old", "0")}
+                {set_bit("new", habit_status_code_sql("new.status"))}
+            END
+        """)
+        
+        if not habit_bitmaps_exist:
+            await _fill_habit_bitmaps(db)
+
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                   ЗАПИСИ ЦІЛЕЙ (Target/Metric)                  ║
         # ╚════════════════════════════════════════════════════════════════╝
@@ -261,6 +732,186 @@ async def init_database() -> None:
         
         await db.execute("CREATE INDEX IF NOT EXISTS ix_goal_entries_goal ON goal_entries(goal_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_goal_entries_date ON goal_entries(date)")
+        await db.execute("CREATE INDEX IF NOT EXISTS ix_goal_entries_user ON goal_entries(user_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS ix_goal_entries_goal_date ON goal_entries(goal_id, date)")
+        
+        # Тижневі / місячні кошики для трендів (services/trends.py):
+        # довга історія читається з кошиків, а не з сирих записів.
+        # INSERT — інкрементально; DELETE / UPDATE — кошик перераховується
+        # з goal_entries (мін / макс не віднімаються).
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'goal_entry_buckets'"
+        )
+        entry_buckets_exist = await cursor.fetchone() is not None
+        
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS goal_entry_buckets (
+                goal_id INTEGER NOT NULL,
+                grain TEXT NOT NULL CHECK(grain IN ('week', 'month')),
+                bucket DATE NOT NULL,
+                count INTEGER NOT NULL,
+                total REAL NOT NULL,
+                min_value REAL NOT NULL,
+                max_value REAL NOT NULL,
+                PRIMARY KEY (goal_id, grain, bucket)
+            ) WITHOUT ROWID
+        """)
+        
+        for grain, (start, end) in ENTRY_BUCKET_GRAINS.items():
+            def rebuild(ref: str) -> str:
+                return f"""
+                    DELETE FROM goal_entry_buckets
+                    WHERE goal_id = {ref}.goal_id AND grain = '{grain}'
+                      AND bucket = {start.format(d=f"{ref}.date")};
+                    INSERT INTO goal_entry_buckets
+                    SELECT goal_id, '{grain}', {start.format(d=f"{ref}.date")},
+                           COUNT(*), SUM(value), MIN(value), MAX(value)
+                    FROM goal_entries
+                    WHERE goal_id = {ref}.goal_id
+                      AND date >= {start.format(d=f"{ref}.date")}
+                      AND date < {end.format(d=f"{ref}.date")}
+                    GROUP BY goal_id;
+                """
+            
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS goal_entries_{grain}_ai AFTER INSERT ON goal_entries BEGIN
+                    INSERT INTO goal_entry_buckets
+                    VALUES (new.goal_id, '{grain}', {start.format(d="new.date")}, 1, new.value, new.value, new.value)
+                    ON CONFLICT (goal_id, grain, bucket) DO UPDATE SET
+                        count = count + 1,
+                        total = total + excluded.total,
+                        min_value = MIN(min_value, excluded.min_value),
+                        max_value = MAX(max_value, excluded.max_value);
+                END
+            """)
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS goal_entries_{grain}_ad AFTER DELETE ON goal_entries BEGIN
+                    {rebuild("old")}
+                END
+            """)
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS goal_entries_{grain}_au
+                AFTER UPDATE OF goal_id, date, value ON goal_entries BEGIN
+                    {rebuild("old")}
+                    {rebuild("new")}
+                END
+            """)
+            
+            if not entry_buckets_exist:
+                await db.execute(f"""
+                    INSERT INTO goal_entry_buckets
+                    SELECT goal_id, '{grain}', {start.format(d="date")},
+                           COUNT(*), SUM(value), MIN(value), MAX(value)
+                    FROM goal_entries
+                    GROUP BY goal_id, {start.format(d="date")}
+                """)
+        
+        # ╔════════════════════════════════════════════════════════════════╗
+        # ║                   ЩОДЕННА СТАТИСТИКА (Rollover)                 ║
+        # ╚════════════════════════════════════════════════════════════════╝
+        #
+        # Один рядок на користувача на день. Заповнюється після опівночі
+        # (в часовому поясі користувача) під час закриття дня.
+        #
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                user_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                
+                tasks_completed INTEGER DEFAULT 0,
+                occurrences_done INTEGER DEFAULT 0,
+                occurrences_skipped INTEGER DEFAULT 0,
+                occurrences_missed INTEGER DEFAULT 0,
+                habits_done INTEGER DEFAULT 0,
+                habits_skipped INTEGER DEFAULT 0,
+                habits_missed INTEGER DEFAULT 0,
+                goal_entries INTEGER DEFAULT 0,
+                
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                
+                PRIMARY KEY (user_id, date)
+            )
+        """)
+        
+        # Останній закритий день для кожного часового поясу
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS day_rollovers (
+                timezone TEXT PRIMARY KEY,
+                last_closed DATE NOT NULL,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # ╔════════════════════════════════════════════════════════════════╗
+        # ║                        ПОШУК (FTS5)                             ║
+        # ╚════════════════════════════════════════════════════════════════╝
+        #
+        # Один FTS5-індекс на всі джерела (SEARCH_SOURCES), rowid кодує
+        # користувача, id і джерело (див. SEARCH_OWNER_SHIFT).
+        # prefix='3 4' — готові префіксні індекси для пошуку "на льоту".
+        # Синхронізація — тригерами, код нічого не знає про індекс.
+        #
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        )
+        search_index_exists = await cursor.fetchone() is not None
+        
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS search_owners (
+                owner INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL UNIQUE
+            )
+        """)
+        await db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                title, body,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '3 4'
+            )
+        """)
+        
+        for table, *_, columns in SEARCH_SOURCES:
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN
+                    INSERT OR IGNORE INTO search_owners (user_id) VALUES (new.user_id);
+                    INSERT INTO search_index (rowid, title, body) {search_documents_sql(table, 'new')};
+                END
+            """)
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN
+                    DELETE FROM search_index WHERE rowid = {search_rowid_sql(table, 'old')};
+                END
+            """)
+            await db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF {columns} ON {table} BEGIN
+                    DELETE FROM search_index WHERE rowid = {search_rowid_sql(table, 'old')};
+                    INSERT INTO search_index (rowid, title, body) {search_documents_sql(table, 'new')};
+                END
+            """)
+            
+            # Перший запуск на існуючій БД — заповнюємо індекс
+            if not search_index_exists:
+                await db.execute(f"INSERT OR IGNORE INTO search_owners (user_id) SELECT DISTINCT user_id FROM {table}")
+                await db.execute(f"""
+                    INSERT INTO search_index (rowid, title, body)
+                    {search_documents_sql(table, table, f'FROM {table}')}
+                """)
+
+        
+        # ╔════════════════════════════════════════════════════════════════╗
+        # ║                        КЕШ ГРАФІКІВ                             ║
+        # ╚════════════════════════════════════════════════════════════════╝
+        #
+        # Хеш вмісту графіка → file_id вже завантаженого фото.
+        # Той самий графік повторно не рендериться і не вантажиться.
+        #
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS chart_cache (
+                key TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID
+        """)
         
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                         КНИГИ (Фаза 3)                          ║
@@ -279,12 +930,17 @@ async def init_database() -> None:
                 tags TEXT DEFAULT '[]',           -- JSON array
                 notes TEXT,
                 file_id TEXT,                     -- Telegram file_id
+                file_unique_id TEXT,              -- однаковий для того самого файлу
+                file_name TEXT,
+                goal_id INTEGER,                  -- Target, куди йде прогрес
+                goal_unit TEXT CHECK(goal_unit IN ('pages', 'books')),
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         """)
         
         await db.execute("CREATE INDEX IF NOT EXISTS ix_books_user ON books(user_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS ix_books_status ON books(status)")
+        # ix_books_page, ix_books_file — міграція 1 (migrations.py)
         
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                       СЛОВНИК (Фаза 3, SM-2)                    ║
@@ -311,8 +967,7 @@ async def init_database() -> None:
             )
         """)
         
-        await db.execute("CREATE INDEX IF NOT EXISTS ix_words_user ON words(user_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS ix_words_due ON words(due_date)")
+        # ix_words_user_due і due_date старих слів — міграція 2 (migrations.py)
         
         # ╔════════════════════════════════════════════════════════════════╗
         # ║                     МОТИВАЦІЙНІ ЦИТАТИ                          ║
@@ -336,6 +991,22 @@ async def init_database() -> None:
             (5, 'Успіх — це сума маленьких зусиль, що повторюються день за днем', 'consistency')
         """)
         
+        # ╔════════════════════════════════════════════════════════════════╗
+        # ║                        ВІДБИТОК СХЕМИ                           ║
+        # ╚════════════════════════════════════════════════════════════════╝
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS schema_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        
+        # В тій самій транзакції, що й seed: відбиток є — все вище вже виконано
+        await db.execute(
+            "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('schema', ?)",
+            (fingerprint,)
+        )
+        
         await db.commit()
         
         print("✅ База даних ініціалізована (v4.0)")
@@ -3,21 +3,80 @@ SQL запити для роботи з даними.
 LifeHub Bot v4.0
 
 ЄДИНИЙ ФАЙЛ для всіх запитів:
+- Change listeners (інвалідація кешів)
 - User settings
 - Tasks (one-time + recurring)
+- Task / goal pages (keyset-пагінація)
 - Task occurrences
 - Goals (project, habit, target, metric)
-- Habit logs
+- Goal tree (goal_closure)
+- Habit logs (статуси днів — habit_bitmaps)
 - Goal entries
 - Today schedule
+- Daily stats (історія)
+- Day rollover
+- Export (порційне читання)
+- Import (пакетна вставка)
+- Search (FTS5)
+- Chart cache (file_id графіків)
+- Words (SM-2, черга повторення)
+- Books (бібліотека)
+- Maintenance (/perf: розмір БД, ANALYZE / optimize / vacuum)
+- Archive (стара історія в архівній БД, UNION ALL для запитів історії)
 
 ВАЖЛИВО: Не створювати окремих файлів queries!
 """
 
 import json
+import logging
+import os
+import re
+import sqlite3
+import time
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
-from bot.database.models import get_db
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Tuple
+from bot.config import config
+from bot.database.models import (
+    get_db, current_session, attach_archive, search_documents_sql, SEARCH_OWNER_SHIFT,
+    habit_bitmap_set_sql, HABIT_STATUS_CODES
+)
+from bot.services import clock
+
+
+logger = logging.getLogger(__name__)
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                          CHANGE LISTENERS                                    ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+# Підписники на зміни даних: listener(user_id, entity).
+# entity: 'tasks' | 'goals' | 'occurrences' | 'habit_logs';
+# user_id=None — зміна для всіх користувачів.
+# Використовуються для інвалідації кешів (лічильники сторінок, inline-підказки).
+_change_listeners: List[Callable[[Optional[int], str], None]] = []
+
+
+def add_change_listener(listener: Callable[[Optional[int], str], None]) -> None:
+    """Підписатись на зміни даних (викликається після commit)."""
+    _change_listeners.append(listener)
+
+
+def _notify_change(user_id: Optional[int], entity: str) -> None:
+    # В сесії апдейту commit запиту відкладений — слухачі після справжнього commit
+    session = current_session()
+    if session is not None:
+        session.after_commit(lambda: _fire_change(user_id, entity))
+        return
+    _fire_change(user_id, entity)
+
+
+def _fire_change(user_id: Optional[int], entity: str) -> None:
+    for listener in _change_listeners:
+        try:
+            listener(user_id, entity)
+        except Exception:
+            logger.exception("❌ Помилка в change listener")
 
 
 # ╔════════════════════════════════════════════════════════════════════════════╗
@@ -44,6 +103,31 @@ async def get_user_language(user_id: int) -> str:
     return settings['language'] if settings else 'uk'
 
 
+# Кеш часових поясів: user_id → назва зони.
+# Скидається в upsert_user_settings().
+_user_timezones: Dict[int, str] = {}
+
+
+async def get_user_timezone(user_id: int) -> str:
+    """Часовий пояс користувача (з кешу, інакше з user_settings)."""
+    tz_name = _user_timezones.get(user_id)
+    if tz_name is None:
+        settings = await get_user_settings(user_id)
+        tz_name = (settings or {}).get('timezone') or config.TIMEZONE
+        _user_timezones[user_id] = tz_name
+    return tz_name
+
+
+async def get_user_today(user_id: int) -> date:
+    """Сьогоднішня дата в часовому поясі користувача."""
+    return clock.local_today(await get_user_timezone(user_id))
+
+
+async def get_user_now(user_id: int) -> datetime:
+    """Поточний локальний час користувача (naive)."""
+    return clock.local_now(await get_user_timezone(user_id))
+
+
 async def upsert_user_settings(user_id: int, **kwargs) -> None:
     """Створити або оновити налаштування."""
     db = await get_db()
@@ -68,6 +152,7 @@ async def upsert_user_settings(user_id: int, **kwargs) -> None:
             )
         
         await db.commit()
+        _user_timezones.pop(user_id, None)
     finally:
         await db.close()
 
@@ -109,6 +194,7 @@ async def create_task(
              int(is_fixed), goal_id)
         )
         await db.commit()
+        _notify_change(user_id, 'tasks')
         return cursor.lastrowid
     finally:
         await db.close()
@@ -133,7 +219,7 @@ async def get_task_by_id(task_id: int, user_id: int) -> Optional[Dict[str, Any]]
         await db.close()
 
 
-async def get_tasks_today(user_id: int) -> List[Dict[str, Any]]:
+async def get_tasks_today(user_id: int, for_date: date = None) -> List[Dict[str, Any]]:
     """
     Отримати задачі на сьогодні:
     1. One-time з deadline = today
@@ -141,7 +227,7 @@ async def get_tasks_today(user_id: int) -> List[Dict[str, Any]]:
     3. НЕ включає: задачі без дедлайну (Inbox)
     4. НЕ включає: recurring (окрема логіка)
     """
-    today = date.today().isoformat()
+    today = (for_date or await get_user_today(user_id)).isoformat()
     
     db = await get_db()
     try:
@@ -229,6 +315,39 @@ async def get_tasks_by_goal(goal_id: int, user_id: int) -> List[Dict[str, Any]]:
         await db.close()
 
 
+async def get_recent_task_titles(user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Недавні різні назви one-time задач (новіші першими).
+    Повертає [{'id': ID найновішої задачі з такою назвою, 'title'}].
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            SELECT id, title FROM tasks
+            WHERE user_id = ? AND is_recurring = 0
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (user_id, limit * 4)
+        )
+        rows = await cursor.fetchall()
+    finally:
+        await db.close()
+    
+    seen = set()
+    titles = []
+    for row in rows:
+        key = row['title'].casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        titles.append(dict(row))
+        if len(titles) >= limit:
+            break
+    return titles
+
+
 async def complete_task(task_id: int, user_id: int) -> bool:
     """Позначити one-time задачу виконаною."""
     db = await get_db()
@@ -247,9 +366,10 @@ async def complete_task(task_id: int, user_id: int) -> bool:
             SET is_completed = 1, completed_at = ?
             WHERE id = ? AND user_id = ? AND is_recurring = 0
             """,
-            (datetime.now().isoformat(), task_id, user_id)
+            ((await get_user_now(user_id)).isoformat(), task_id, user_id)
         )
         await db.commit()
+        _notify_change(user_id, 'tasks')
         success = cursor.rowcount > 0
         
         # Перерахувати прогрес проєкту якщо є
@@ -274,6 +394,7 @@ async def uncomplete_task(task_id: int, user_id: int) -> bool:
             (task_id, user_id)
         )
         await db.commit()
+        _notify_change(user_id, 'tasks')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -294,6 +415,7 @@ async def update_task(task_id: int, user_id: int, **kwargs) -> bool:
             values
         )
         await db.commit()
+        _notify_change(user_id, 'tasks')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -308,11 +430,153 @@ async def delete_task(task_id: int, user_id: int) -> bool:
             (task_id, user_id)
         )
         await db.commit()
+        _notify_change(user_id, 'tasks')
         return cursor.rowcount > 0
     finally:
         await db.close()
 
 
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                            TASK PAGES                                        ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+# Списки задач посторінково: keyset-курсор (priority, sort_time, id) замість
+# OFFSET — гортання коштує однаково на будь-якій сторінці (індекс ix_tasks_page).
+# sort_time = COALESCE(scheduled_time, '99:99') — задачі без часу в кінці.
+
+TASK_VIEWS = ('today', 'inbox', 'all')
+TASKS_PAGE_SIZE = 5
+GOALS_PAGE_SIZE = 10
+
+_TASK_SORT_TIME = "COALESCE(t.scheduled_time, '99:99')"
+
+# Кеш лічильників: user_id → {(view, день): кількість}.
+# Скидається через change listener при будь-якій зміні задач/цілей.
+_page_counts: Dict[int, Dict[tuple, int]] = {}
+
+
+def _reset_page_counts(user_id: Optional[int], entity: str) -> None:
+    if entity not in ('tasks', 'goals'):
+        return
+    if user_id is None:
+        _page_counts.clear()
+    else:
+        _page_counts.pop(user_id, None)
+
+
+add_change_listener(_reset_page_counts)
+
+
+def task_cursor(task: Dict[str, Any]) -> Tuple[int, str, int]:
+    """Keyset-ключ задачі: (priority, sort_time, id)."""
+    return (task.get('priority', 2), task.get('scheduled_time') or '99:99', task['id'])
+
+
+async def _task_view_filter(user_id: int, view: str) -> Tuple[str, list]:
+    """WHERE-умова і параметри для списку задач."""
+    if view not in TASK_VIEWS:
+        raise ValueError(f"Unknown task view: {view}")
+    
+    sql = "t.user_id = ? AND t.is_recurring = 0 AND t.is_completed = 0"
+    params: list = [user_id]
+    
+    if view == 'today':
+        sql += " AND t.deadline IS NOT NULL AND DATE(t.deadline) <= ?"
+        params.append((await get_user_today(user_id)).isoformat())
+    elif view == 'inbox':
+        sql += " AND t.deadline IS NULL AND t.goal_id IS NULL"
+    
+    return sql, params
+
+
+async def get_tasks_page(
+    user_id: int,
+    view: str = 'today',
+    after: Optional[tuple] = None,
+    before: Optional[tuple] = None,
+    limit: int = TASKS_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Одна сторінка задач (view: today | inbox | all).
+    
+    after  — курсор останньої задачі попередньої сторінки (гортання вперед)
+    before — курсор першої задачі наступної сторінки (гортання назад)
+    
+    Повертає {'items': [...], 'has_prev': bool, 'has_next': bool}.
+    """
+    where, params = await _task_view_filter(user_id, view)
+    backward = before is not None
+    cursor_key = before if backward else after
+    op, direction = ("<", "DESC") if backward else (">", "ASC")
+    order = f"t.priority {direction}, {_TASK_SORT_TIME} {direction}, t.id {direction}"
+    
+    if cursor_key is None:
+        conditions = [("1", [])]
+    else:
+        # (priority, sort_time, id) > курсор, розкладене на три діапазони:
+        # SQLite не шукає row value по індексу з виразом, а кожна частина —
+        # окремий seek по ix_tasks_page. UNION ALL + LIMIT зупиняється рано.
+        priority, sort_time, task_id = cursor_key
+        conditions = [
+            (f"t.priority = ? AND {_TASK_SORT_TIME} = ? AND t.id {op} ?", [priority, sort_time, task_id]),
+            (f"t.priority = ? AND {_TASK_SORT_TIME} {op} ?", [priority, sort_time]),
+            (f"t.priority {op} ?", [priority]),
+        ]
+    
+    ranges = [
+        (f"SELECT * FROM (SELECT t.id, t.priority, {_TASK_SORT_TIME} AS sort_time FROM tasks t "
+         f"WHERE {where} AND {cond} ORDER BY {order} LIMIT ?)", [*params, *cond_params, limit + 1])
+        for cond, cond_params in conditions
+    ]
+    
+    page_sql = " UNION ALL ".join(sql for sql, _ in ranges)
+    page_params = [value for _, values in ranges for value in values]
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""
+            SELECT t.*, g.title as goal_title
+            FROM ({page_sql} LIMIT ?) AS page
+            JOIN tasks t ON t.id = page.id
+            LEFT JOIN goals g ON t.goal_id = g.id
+            ORDER BY page.priority {direction}, page.sort_time {direction}, page.id {direction}
+            """,
+            (*page_params, limit + 1)
+        )
+        rows = [dict(row) for row in await cursor.fetchall()]
+    finally:
+        await db.close()
+    
+    more = len(rows) > limit
+    rows = rows[:limit]
+    
+    if backward:
+        rows.reverse()
+        return {'items': rows, 'has_prev': more, 'has_next': True}
+    return {'items': rows, 'has_prev': after is not None, 'has_next': more}
+
+
+async def count_tasks(user_id: int, view: str = 'today') -> int:
+    """Кількість задач у списку (кешується до наступної зміни задач)."""
+    where, params = await _task_view_filter(user_id, view)
+    key = (view, params[1] if view == 'today' else None)
+    
+    cached = _page_counts.get(user_id, {}).get(key)
+    if cached is not None:
+        return cached
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(f"SELECT COUNT(*) FROM tasks t WHERE {where}", params)
+        count = (await cursor.fetchone())[0]
+    finally:
+        await db.close()
+    
+    _page_counts.setdefault(user_id, {})[key] = count
+    return count
+
+
 # ╔════════════════════════════════════════════════════════════════════════════╗
 # ║                         RECURRING TASKS                                      ║
 # ╚════════════════════════════════════════════════════════════════════════════╝
@@ -375,7 +639,7 @@ async def get_or_create_occurrence(task_id: int, user_id: int, for_date: date =
     Отримати або створити occurrence для recurring task на дату.
     Автоматично рахує occurrence_number.
     """
-    for_date = for_date or date.today()
+    for_date = for_date or await get_user_today(user_id)
     date_str = for_date.isoformat()
     
     db = await get_db()
@@ -390,9 +654,10 @@ async def get_or_create_occurrence(task_id: int, user_id: int, for_date: date =
         if row:
             return dict(row)
         
-        # Створюємо новий
+        # Створюємо новий (номер — з урахуванням архівованих)
+        occurrences = await _history(db, 'task_occurrences')
         cursor = await db.execute(
-            "SELECT COUNT(*) FROM task_occurrences WHERE task_id = ?",
+            f"SELECT COUNT(*) FROM {occurrences} WHERE task_id = ?",
             (task_id,)
         )
         count = (await cursor.fetchone())[0]
@@ -423,7 +688,7 @@ async def get_or_create_occurrence(task_id: int, user_id: int, for_date: date =
 
 async def complete_occurrence(task_id: int, user_id: int, for_date: date = None) -> bool:
     """Позначити occurrence як виконане."""
-    for_date = for_date or date.today()
+    for_date = for_date or await get_user_today(user_id)
     date_str = for_date.isoformat()
     
     db = await get_db()
@@ -434,9 +699,32 @@ async def complete_occurrence(task_id: int, user_id: int, for_date: date = None)
             SET status = 'done', completed_at = ?
             WHERE task_id = ? AND user_id = ? AND date = ?
             """,
-            (datetime.now().isoformat(), task_id, user_id, date_str)
+            ((await get_user_now(user_id)).isoformat(), task_id, user_id, date_str)
+        )
+        await db.commit()
+        _notify_change(user_id, 'occurrences')
+        return cursor.rowcount > 0
+    finally:
+        await db.close()
+
+
+async def uncomplete_occurrence(task_id: int, user_id: int, for_date: date = None) -> bool:
+    """Скасувати виконання occurrence."""
+    for_date = for_date or await get_user_today(user_id)
+    date_str = for_date.isoformat()
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            UPDATE task_occurrences 
+            SET status = 'pending', completed_at = NULL
+            WHERE task_id = ? AND user_id = ? AND date = ?
+            """,
+            (task_id, user_id, date_str)
         )
         await db.commit()
+        _notify_change(user_id, 'occurrences')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -444,7 +732,7 @@ async def complete_occurrence(task_id: int, user_id: int, for_date: date = None)
 
 async def skip_occurrence(task_id: int, user_id: int, for_date: date = None, notes: str = None) -> bool:
     """Пропустити occurrence (звільняє слот часу)."""
-    for_date = for_date or date.today()
+    for_date = for_date or await get_user_today(user_id)
     date_str = for_date.isoformat()
     
     db = await get_db()
@@ -458,6 +746,7 @@ async def skip_occurrence(task_id: int, user_id: int, for_date: date = None, not
             (notes, task_id, user_id, date_str)
         )
         await db.commit()
+        _notify_change(user_id, 'occurrences')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -465,7 +754,7 @@ async def skip_occurrence(task_id: int, user_id: int, for_date: date = None, not
 
 async def unskip_occurrence(task_id: int, user_id: int, for_date: date = None) -> bool:
     """Скасувати пропуск occurrence."""
-    for_date = for_date or date.today()
+    for_date = for_date or await get_user_today(user_id)
     date_str = for_date.isoformat()
     
     db = await get_db()
@@ -479,6 +768,7 @@ async def unskip_occurrence(task_id: int, user_id: int, for_date: date = None) -
             (task_id, user_id, date_str)
         )
         await db.commit()
+        _notify_change(user_id, 'occurrences')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -488,13 +778,15 @@ async def get_task_occurrence_stats(task_id: int) -> Dict[str, Any]:
     """Статистика по recurring task."""
     db = await get_db()
     try:
+        occurrences = await _history(db, 'task_occurrences')
         cursor = await db.execute(
-            """
+            f"""
             SELECT 
                 COUNT(*) as total,
                 SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END) as done,
-                SUM(CASE WHEN status = 'skipped' THEN 1 ELSE 0 END) as skipped
-            FROM task_occurrences WHERE task_id = ?
+                SUM(CASE WHEN status = 'skipped' THEN 1 ELSE 0 END) as skipped,
+                SUM(CASE WHEN status = 'missed' THEN 1 ELSE 0 END) as missed
+            FROM {occurrences} WHERE task_id = ?
             """,
             (task_id,)
         )
@@ -506,6 +798,7 @@ async def get_task_occurrence_stats(task_id: int) -> Dict[str, Any]:
             'total': total,
             'done': done,
             'skipped': row['skipped'] or 0,
+            'missed': row['missed'] or 0,
             'success_rate': int(done / total * 100) if total > 0 else 0
         }
     finally:
@@ -563,6 +856,7 @@ async def create_goal(
              target_value, unit, target_min, target_max)
         )
         await db.commit()
+        _notify_change(user_id, 'goals')
         return cursor.lastrowid
     finally:
         await db.close()
@@ -628,6 +922,75 @@ async def get_all_goals(user_id: int, status: str = None) -> List[Dict[str, Any]
         await db.close()
 
 
+async def get_goals_page(
+    user_id: int,
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+    limit: int = GOALS_PAGE_SIZE,
+    status: str = 'active',
+) -> Dict[str, Any]:
+    """
+    Одна сторінка project/target/metric (нові першими, курсор — id).
+    Звички мають свій список (/habits) і сюди не потрапляють.
+    
+    Повертає {'items': [...], 'has_prev': bool, 'has_next': bool}.
+    """
+    where = "user_id = ? AND status = ? AND goal_type != 'habit'"
+    params: list = [user_id, status]
+    backward = before is not None
+    
+    if backward:
+        where += " AND id > ?"
+        params.append(before)
+    elif after is not None:
+        where += " AND id < ?"
+        params.append(after)
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""
+            SELECT * FROM goals
+            WHERE {where}
+            ORDER BY id {'ASC' if backward else 'DESC'}
+            LIMIT ?
+            """,
+            (*params, limit + 1)
+        )
+        rows = [_parse_goal(row) for row in await cursor.fetchall()]
+    finally:
+        await db.close()
+    
+    more = len(rows) > limit
+    rows = rows[:limit]
+    
+    if backward:
+        rows.reverse()
+        return {'items': rows, 'has_prev': more, 'has_next': True}
+    return {'items': rows, 'has_prev': after is not None, 'has_next': more}
+
+
+async def count_goals(user_id: int, status: str = 'active') -> int:
+    """Кількість project/target/metric (кешується до наступної зміни цілей)."""
+    key = ('goals', status)
+    cached = _page_counts.get(user_id, {}).get(key)
+    if cached is not None:
+        return cached
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM goals WHERE user_id = ? AND status = ? AND goal_type != 'habit'",
+            (user_id, status)
+        )
+        count = (await cursor.fetchone())[0]
+    finally:
+        await db.close()
+    
+    _page_counts.setdefault(user_id, {})[key] = count
+    return count
+
+
 async def get_projects(user_id: int, status: str = 'active') -> List[Dict[str, Any]]:
     """Отримати проєкти для вибору батьківської цілі."""
     return await get_goals_by_type(user_id, 'project', status)
@@ -652,7 +1015,7 @@ async def get_child_goals(parent_id: int, user_id: int) -> List[Dict[str, Any]]:
 
 
 async def update_goal(goal_id: int, user_id: int, **kwargs) -> bool:
-    """Оновити поля цілі."""
+    """Оновити поля цілі. False — не знайдено або parent_id утворив би цикл."""
     if not kwargs:
         return False
     
@@ -664,11 +1027,21 @@ async def update_goal(goal_id: int, user_id: int, **kwargs) -> bool:
     
     db = await get_db()
     try:
+        # Не можна зробити батьком саму ціль або її нащадка
+        if kwargs.get('parent_id') is not None:
+            cursor = await db.execute(
+                "SELECT 1 FROM goal_closure WHERE ancestor = ? AND descendant = ?",
+                (goal_id, kwargs['parent_id'])
+            )
+            if await cursor.fetchone():
+                return False
+        
         cursor = await db.execute(
             f"UPDATE goals SET {fields} WHERE id = ? AND user_id = ?",
             values
         )
         await db.commit()
+        _notify_change(user_id, 'goals')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -692,9 +1065,10 @@ async def complete_goal(goal_id: int, user_id: int) -> bool:
             SET status = 'completed', progress = 100, completed_at = ?
             WHERE id = ? AND user_id = ?
             """,
-            (datetime.now().isoformat(), goal_id, user_id)
+            ((await get_user_now(user_id)).isoformat(), goal_id, user_id)
         )
         await db.commit()
+        _notify_change(user_id, 'goals')
         success = cursor.rowcount > 0
         
         # Перерахувати прогрес батьківського проєкту
@@ -719,6 +1093,7 @@ async def restore_goal(goal_id: int, user_id: int) -> bool:
             (goal_id, user_id)
         )
         await db.commit()
+        _notify_change(user_id, 'goals')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -733,6 +1108,7 @@ async def delete_goal(goal_id: int, user_id: int) -> bool:
             (goal_id, user_id)
         )
         await db.commit()
+        _notify_change(user_id, 'goals')
         return cursor.rowcount > 0
     finally:
         await db.close()
@@ -756,60 +1132,219 @@ async def recalculate_project_progress(project_id: int, user_id: int) -> int:
     """
     db = await get_db()
     try:
-        # Дочірні цілі
-        cursor = await db.execute(
-            """
-            SELECT progress, status FROM goals 
-            WHERE parent_id = ? AND user_id = ?
-            """,
-            (project_id, user_id)
-        )
-        children = await cursor.fetchall()
+        await _recalculate_projects_progress(db, [project_id], user_id)
+        await db.commit()
+        _notify_change(user_id, 'goals')
         
-        # Пов'язані задачі (тільки one-time)
         cursor = await db.execute(
-            """
-            SELECT is_completed FROM tasks 
-            WHERE goal_id = ? AND user_id = ? AND is_recurring = 0
-            """,
+            "SELECT progress FROM goals WHERE id = ? AND user_id = ?",
             (project_id, user_id)
         )
-        tasks = await cursor.fetchall()
-        
-        total_items = len(children) + len(tasks)
-        if total_items == 0:
-            return 0
-        
-        total_progress = 0
-        
-        for child in children:
-            if child['status'] == 'completed':
-                total_progress += 100
-            else:
-                total_progress += (child['progress'] or 0)
-        
-        for task in tasks:
-            if task['is_completed']:
-                total_progress += 100
-        
-        avg_progress = int(total_progress / total_items)
-        
+        row = await cursor.fetchone()
+        return (row['progress'] or 0) if row else 0
+    finally:
+        await db.close()
+
+
+async def _recalculate_projects_progress(db, project_ids, user_id: int) -> None:
+    """
+    Set-based перерахунок прогресу кількох проєктів і всіх їх предків
+    на переданому з'єднанні (без commit).
+    
+    Прогрес = середнє по дочірніх цілях (completed = 100) і one-time задачах
+    (виконана = 100). Проєкт без елементів зберігає свій прогрес.
+    
+    Всі предки — одним запитом до goal_closure. Рівень предка = найбільша
+    відстань до змінених проєктів, тож батько рахується вже з оновлених дітей.
+    """
+    ids = list({pid for pid in project_ids if pid})
+    if not ids:
+        return
+    
+    placeholders = ", ".join("?" * len(ids))
+    cursor = await db.execute(
+        f"""
+        SELECT ancestor, MAX(depth) AS level FROM goal_closure
+        WHERE descendant IN ({placeholders})
+        GROUP BY ancestor
+        """,
+        ids
+    )
+    levels: Dict[int, List[int]] = {}
+    for row in await cursor.fetchall():
+        levels.setdefault(row['level'], []).append(row['ancestor'])
+    
+    for level in sorted(levels):
+        ids = levels[level]
+        placeholders = ", ".join("?" * len(ids))
         await db.execute(
-            "UPDATE goals SET progress = ? WHERE id = ?",
-            (avg_progress, project_id)
+            f"""
+            UPDATE goals
+            SET progress = COALESCE((
+                SELECT CAST(SUM(item.p) * 1.0 / COUNT(*) AS INTEGER)
+                FROM (
+                    SELECT CASE WHEN c.status = 'completed' THEN 100
+                                ELSE COALESCE(c.progress, 0) END AS p
+                    FROM goals c
+                    WHERE c.parent_id = goals.id AND c.user_id = goals.user_id
+                    UNION ALL
+                    SELECT CASE WHEN t.is_completed THEN 100 ELSE 0 END
+                    FROM tasks t
+                    WHERE t.goal_id = goals.id AND t.user_id = goals.user_id
+                      AND t.is_recurring = 0
+                ) AS item
+            ), progress)
+            WHERE user_id = ? AND id IN ({placeholders})
+            """,
+            [user_id, *ids]
         )
-        await db.commit()
-        
-        # Якщо цей проєкт сам є дочірнім — оновити батька
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                              GOAL TREE                                       ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+#
+# Піддерево проєкту (цілі + прив'язані задачі) одним запитом по goal_closure.
+# Дерево кешується на користувача і скидається при будь-якій зміні його
+# цілей або задач (change listener).
+
+# Кеш дерев: user_id → {root_id: tree}
+_goal_trees: Dict[int, Dict[int, Dict[str, Any]]] = {}
+
+
+def _reset_goal_trees(user_id: Optional[int], entity: str) -> None:
+    if entity not in ('tasks', 'goals'):
+        return
+    if user_id is None:
+        _goal_trees.clear()
+    else:
+        _goal_trees.pop(user_id, None)
+
+
+add_change_listener(_reset_goal_trees)
+
+
+_GOAL_TREE_SQL = """
+    WITH subtree(id) AS (
+        SELECT c.descendant FROM goal_closure c
+        JOIN goals r ON r.id = c.ancestor AND r.user_id = :user_id
+        WHERE c.ancestor = :root
+    )
+    SELECT 'goal' AS node, g.id, g.parent_id AS parent, g.title, g.goal_type,
+           g.status, g.progress, NULL AS is_completed, NULL AS priority,
+           NULL AS deadline, NULL AS is_recurring, g.created_at
+    FROM subtree s JOIN goals g ON g.id = s.id
+    UNION ALL
+    SELECT 'task', t.id, t.goal_id, t.title, NULL,
+           NULL, NULL, t.is_completed, t.priority,
+           t.deadline, t.is_recurring, t.created_at
+    FROM subtree s JOIN tasks t ON t.goal_id = s.id AND t.user_id = :user_id
+"""
+
+
+async def get_goal_tree(root_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Все піддерево цілі одним запитом (нащадки — з goal_closure).
+    
+    Вузол: {'id', 'title', 'goal_type', 'status', 'progress',
+            'children': [вузли], 'tasks': [{'id', 'title', 'is_completed',
+            'priority', 'deadline', 'is_recurring'}]}
+    Порядок як у get_child_goals / get_tasks_by_goal.
+    
+    Результат спільний для всіх викликів (кеш) — НЕ змінювати.
+    None — ціль не знайдено.
+    """
+    cached = _goal_trees.get(user_id, {}).get(root_id)
+    if cached is not None:
+        return cached
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(_GOAL_TREE_SQL, {'root': root_id, 'user_id': user_id})
+        rows = await cursor.fetchall()
+    finally:
+        await db.close()
+    
+    nodes: Dict[int, Dict[str, Any]] = {}
+    goal_rows = []
+    task_rows = []
+    for row in rows:
+        if row['node'] == 'goal':
+            nodes[row['id']] = {
+                'id': row['id'],
+                'title': row['title'],
+                'goal_type': row['goal_type'],
+                'status': row['status'],
+                'progress': row['progress'] or 0,
+                'children': [],
+                'tasks': [],
+            }
+            goal_rows.append(row)
+        else:
+            task_rows.append(row)
+    
+    root = nodes.get(root_id)
+    if root is None:
+        return None
+    
+    goal_rows.sort(key=lambda r: r['created_at'] or '', reverse=True)
+    goal_rows.sort(key=lambda r: r['goal_type'])
+    for row in goal_rows:
+        if row['id'] != root_id and row['parent'] in nodes:
+            nodes[row['parent']]['children'].append(nodes[row['id']])
+    
+    task_rows.sort(key=lambda r: (r['is_completed'], r['priority'], r['deadline'] or ''))
+    for row in task_rows:
+        nodes[row['parent']]['tasks'].append({
+            'id': row['id'],
+            'title': row['title'],
+            'is_completed': row['is_completed'],
+            'priority': row['priority'],
+            'deadline': row['deadline'],
+            'is_recurring': row['is_recurring'],
+        })
+    
+    _goal_trees.setdefault(user_id, {})[root_id] = root
+    return root
+
+
+def iter_goal_tree(node: Dict[str, Any], depth: int = 0):
+    """Обхід дерева в глибину: (вузол, глибина)."""
+    yield node, depth
+    for child in node['children']:
+        yield from iter_goal_tree(child, depth + 1)
+
+
+async def get_goal_rollup(goal_id: int, user_id: int) -> Dict[str, int]:
+    """
+    Підсумок по всьому піддереву цілі (без неї самої):
+    goals / goals_completed — вкладені цілі, tasks / tasks_done — one-time задачі
+    (включно з задачами самої цілі).
+    """
+    db = await get_db()
+    try:
         cursor = await db.execute(
-            "SELECT parent_id FROM goals WHERE id = ?",
-            (project_id,)
+            """
+            SELECT
+                (SELECT COUNT(*) FROM goal_closure c
+                 JOIN goals g ON g.id = c.descendant
+                 WHERE c.ancestor = :goal AND c.depth > 0 AND g.user_id = :user_id) AS goals,
+                (SELECT COUNT(*) FROM goal_closure c
+                 JOIN goals g ON g.id = c.descendant
+                 WHERE c.ancestor = :goal AND c.depth > 0 AND g.user_id = :user_id
+                   AND g.status = 'completed') AS goals_completed,
+                (SELECT COUNT(*) FROM goal_closure c
+                 JOIN tasks t ON t.goal_id = c.descendant
+                 WHERE c.ancestor = :goal AND t.user_id = :user_id
+                   AND t.is_recurring = 0) AS tasks,
+                (SELECT COUNT(*) FROM goal_closure c
+                 JOIN tasks t ON t.goal_id = c.descendant
+                 WHERE c.ancestor = :goal AND t.user_id = :user_id
+                   AND t.is_recurring = 0 AND t.is_completed = 1) AS tasks_done
+            """,
+            {'goal': goal_id, 'user_id': user_id}
         )
-        row = await cursor.fetchone()
-        if row and row['parent_id']:
-            await recalculate_project_progress(row['parent_id'], user_id)
-        
-        return avg_progress
+        return dict(await cursor.fetchone())
     finally:
         await db.close()
 
@@ -818,11 +1353,28 @@ async def recalculate_project_progress(project_id: int, user_id: int) -> int:
 # ║                              HABITS                                          ║
 # ╚════════════════════════════════════════════════════════════════════════════╝
 
-async def get_habits_today(user_id: int) -> List[Dict[str, Any]]:
+# Чи запланована звичка g на день тижня.
+# Параметри: (weekday, str(weekday)), weekday — ISO (1=Пн, 7=Нд).
+# Спільна умова для /today і day rollover — "пропущено" рахується
+# тільки для тих днів, коли звичка була в розкладі.
+_HABIT_SCHEDULED_SQL = """
+    (
+        g.frequency = 'daily'
+        OR (g.frequency = 'weekdays' AND ? BETWEEN 1 AND 5)
+        OR (
+            COALESCE(g.frequency, '') NOT IN ('daily', 'weekdays')
+            AND (g.schedule_days IS NULL OR g.schedule_days LIKE '%' || ? || '%')
+        )
+    )
+"""
+
+
+async def get_habits_today(user_id: int, for_date: date = None) -> List[Dict[str, Any]]:
     """Отримати звички на сьогодні з їх статусом."""
+    today = for_date or await get_user_today(user_id)
+    
     db = await get_db()
     try:
-        today = date.today()
         weekday = today.isoweekday()
         today_iso = today.isoformat()
         
@@ -834,12 +1386,7 @@ async def get_habits_today(user_id: int) -> List[Dict[str, Any]]:
             WHERE g.user_id = ? 
               AND g.goal_type = 'habit' 
               AND g.status = 'active'
-              AND (
-                  g.frequency = 'daily'
-                  OR (g.frequency = 'weekdays' AND ? BETWEEN 1 AND 5)
-                  OR g.schedule_days LIKE '%' || ? || '%'
-                  OR g.schedule_days IS NULL
-              )
+              AND """ + _HABIT_SCHEDULED_SQL + """
             ORDER BY g.reminder_time, g.title
             """,
             (today_iso, user_id, weekday, str(weekday))
@@ -850,12 +1397,18 @@ async def get_habits_today(user_id: int) -> List[Dict[str, Any]]:
         await db.close()
 
 
-async def log_habit(goal_id: int, user_id: int, status: str, notes: str = None) -> int:
+async def log_habit(
+    goal_id: int,
+    user_id: int,
+    status: str,
+    notes: str = None,
+    for_date: date = None
+) -> int:
     """Залогувати виконання звички та оновити streak."""
+    today = for_date or await get_user_today(user_id)
+    
     db = await get_db()
     try:
-        today = date.today().isoformat()
-        
         # Upsert log
         cursor = await db.execute(
             """
@@ -863,43 +1416,103 @@ async def log_habit(goal_id: int, user_id: int, status: str, notes: str = None)
             VALUES (?, ?, ?, ?, ?)
             ON CONFLICT(goal_id, date) DO UPDATE SET status = ?, notes = ?
             """,
-            (goal_id, user_id, today, status, notes, status, notes)
+            (goal_id, user_id, today.isoformat(), status, notes, status, notes)
         )
         await db.commit()
         
         # Перерахувати streak
-        await _update_habit_streak(goal_id, user_id)
+        await _update_habit_streak(goal_id, user_id, today)
+        _notify_change(user_id, 'habit_logs')
         
         return cursor.lastrowid
     finally:
         await db.close()
 
 
-async def _update_habit_streak(goal_id: int, user_id: int) -> None:
+async def unlog_habit(goal_id: int, user_id: int, for_date: date = None) -> None:
+    """Скасувати лог звички за день (разом з бітом у habit_bitmaps) та оновити streak."""
+    day = for_date or await get_user_today(user_id)
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "DELETE FROM habit_logs WHERE goal_id = ? AND user_id = ? AND date = ?",
+            (goal_id, user_id, day.isoformat())
+        )
+        # DELETE біт не чіпає (див. habit_bitmaps у models) — прибираємо тут
+        if cursor.rowcount:
+            await db.execute(
+                f"""
+                UPDATE habit_bitmaps SET bits = {habit_bitmap_set_sql("bits", ":date", "0")}
+                WHERE goal_id = :goal AND user_id = :user_id AND year = :year
+                """,
+                {'date': day.isoformat(), 'goal': goal_id, 'user_id': user_id, 'year': day.year}
+            )
+        await db.commit()
+        
+        await _update_habit_streak(goal_id, user_id, day)
+        _notify_change(user_id, 'habit_logs')
+    finally:
+        await db.close()
+
+
+# Код бітмапи → статус логу
+_HABIT_STATUSES = {code: status for status, code in HABIT_STATUS_CODES.items()}
+
+# Байт бітмапи → кількість днів 'done' у ньому (bytes.translate + sum)
+_DONE_PER_BYTE = bytes(
+    sum((value >> shift) & 3 == HABIT_STATUS_CODES['done'] for shift in (0, 2, 4, 6))
+    for value in range(256)
+)
+
+
+async def _habit_bitmaps(db, goal_id: int, user_id: int, first_year: int = 0) -> Dict[int, bytes]:
+    """Бітмапи звички по роках (від first_year)."""
+    cursor = await db.execute(
+        """
+        SELECT year, bits FROM habit_bitmaps
+        WHERE goal_id = ? AND user_id = ? AND year >= ?
+        """,
+        (goal_id, user_id, first_year)
+    )
+    return {row['year']: row['bits'] for row in await cursor.fetchall()}
+
+
+def _habit_day_codes(bitmaps: Dict[int, bytes], start: date, end: date) -> List[int]:
+    """Коди статусів (HABIT_STATUS_CODES, 0 — логу немає) днів від start до end включно."""
+    codes = []
+    for year in range(start.year, end.year + 1):
+        first = (max(start, date(year, 1, 1)) - date(year, 1, 1)).days
+        last = (min(end, date(year, 12, 31)) - date(year, 1, 1)).days
+        bits = bitmaps.get(year)
+        if bits is None:
+            codes += [0] * (last - first + 1)
+            continue
+        codes += [(bits[i >> 2] >> ((i & 3) << 1)) & 3 for i in range(first, last + 1)]
+    return codes
+
+
+async def _update_habit_streak(goal_id: int, user_id: int, today: date = None) -> None:
     """
     ВИПРАВЛЕНИЙ алгоритм розрахунку streak.
     
     Правила:
-    1. Починаємо з сьогодні
+    1. Починаємо з сьогодні (дата користувача)
     2. Йдемо назад по днях
     3. Якщо є лог 'done' або 'skipped' — streak++
     4. Якщо є лог 'missed' АБО немає логу — СТОП (streak обривається)
+    
+    Дні читаються з habit_bitmaps (не більше двох років по 92 байти).
     """
+    today = today or await get_user_today(user_id)
+    # Streak не довший за 365 днів
+    since = today - timedelta(days=364)
+    
     db = await get_db()
     try:
-        # Отримуємо логи в хронологічному порядку (від нових до старих)
-        cursor = await db.execute(
-            """
-            SELECT date, status FROM habit_logs 
-            WHERE goal_id = ? 
-            ORDER BY date DESC 
-            LIMIT 365
-            """,
-            (goal_id,)
-        )
-        logs = await cursor.fetchall()
+        bitmaps = await _habit_bitmaps(db, goal_id, user_id, since.year)
         
-        if not logs:
+        if not bitmaps:
             await db.execute(
                 "UPDATE goals SET current_streak = 0 WHERE id = ?",
                 (goal_id,)
@@ -907,24 +1520,13 @@ async def _update_habit_streak(goal_id: int, user_id: int) -> None:
             await db.commit()
             return
         
-        # Рахуємо streak
+        # Рахуємо streak: від сьогодні назад до першого дня без 'done' / 'skipped'
         current_streak = 0
-        check_date = date.today()
-        
-        for log in logs:
-            log_date = date.fromisoformat(log['date'])
-            
-            if log_date == check_date:
-                # Дата співпадає — перевіряємо статус
-                if log['status'] in ('done', 'skipped'):
-                    current_streak += 1
-                    check_date -= timedelta(days=1)
-                else:  # missed
-                    break
-            elif log_date < check_date:
-                # GAP — є пропущені дні без логу = streak обривається
+        kept = (HABIT_STATUS_CODES['done'], HABIT_STATUS_CODES['skipped'])
+        for code in reversed(_habit_day_codes(bitmaps, since, today)):
+            if code not in kept:
                 break
-            # Якщо log_date > check_date — ігноруємо (майбутні дати)
+            current_streak += 1
         
         # Оновлюємо streak
         cursor = await db.execute(
@@ -952,12 +1554,14 @@ async def _update_habit_streak(goal_id: int, user_id: int) -> None:
 
 async def get_habit_logs(goal_id: int, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
     """Отримати логи звички за останні N днів."""
+    since_date = (await get_user_today(user_id) - timedelta(days=days)).isoformat()
+    
     db = await get_db()
     try:
-        since_date = (date.today() - timedelta(days=days)).isoformat()
+        logs_source = await _history(db, 'habit_logs', since_date)
         cursor = await db.execute(
-            """
-            SELECT * FROM habit_logs 
+            f"""
+            SELECT * FROM {logs_source} 
             WHERE goal_id = ? AND user_id = ? AND date >= ?
             ORDER BY date DESC
             """,
@@ -969,112 +1573,167 @@ async def get_habit_logs(goal_id: int, user_id: int, days: int = 30) -> List[Dic
         await db.close()
 
 
+async def get_habit_statuses(goal_id: int, user_id: int, since: date) -> Dict[str, str]:
+    """Статуси звички по днях (ISO-дата → status) від since до сьогодні — з habit_bitmaps."""
+    today = await get_user_today(user_id)
+    
+    db = await get_db()
+    try:
+        bitmaps = await _habit_bitmaps(db, goal_id, user_id, since.year)
+    finally:
+        await db.close()
+    
+    return {
+        (since + timedelta(days=offset)).isoformat(): _HABIT_STATUSES[code]
+        for offset, code in enumerate(_habit_day_codes(bitmaps, since, today))
+        if code
+    }
+
+
 async def get_habit_stats(goal_id: int, user_id: int) -> Dict[str, Any]:
-    """Статистика звички."""
+    """Статистика звички (з habit_bitmaps: місяць — біти днів, всього — по байтах)."""
+    month_start = (await get_user_today(user_id)).replace(day=1)
+    month_end = (month_start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    
     db = await get_db()
     try:
-        # Цього місяця
-        month_start = date.today().replace(day=1).isoformat()
-        cursor = await db.execute(
-            """
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END) as done,
-                SUM(CASE WHEN status = 'skipped' THEN 1 ELSE 0 END) as skipped
-            FROM habit_logs 
-            WHERE goal_id = ? AND date >= ?
-            """,
-            (goal_id, month_start)
-        )
-        month = await cursor.fetchone()
-        
-        # Всього виконано
-        cursor = await db.execute(
-            """
-            SELECT COUNT(*) as total
-            FROM habit_logs 
-            WHERE goal_id = ? AND status = 'done'
-            """,
-            (goal_id,)
-        )
-        total = await cursor.fetchone()
-        
-        month_total = month['total'] or 0
-        month_done = month['done'] or 0
-        
-        return {
-            'month_total': month_total,
-            'month_done': month_done,
-            'month_rate': int(month_done / month_total * 100) if month_total > 0 else 0,
-            'total_done': total['total'] or 0
-        }
+        bitmaps = await _habit_bitmaps(db, goal_id, user_id)
     finally:
         await db.close()
+    
+    # Цього місяця
+    month = _habit_day_codes(bitmaps, month_start, month_end)
+    month_total = len(month) - month.count(0)
+    month_done = month.count(HABIT_STATUS_CODES['done'])
+    
+    # Всього виконано
+    total_done = sum(sum(bits.translate(_DONE_PER_BYTE)) for bits in bitmaps.values())
+    
+    return {
+        'month_total': month_total,
+        'month_done': month_done,
+        'month_rate': int(month_done / month_total * 100) if month_total > 0 else 0,
+        'total_done': total_done
+    }
 
 
 # ╔════════════════════════════════════════════════════════════════════════════╗
 # ║                            GOAL ENTRIES                                      ║
 # ╚════════════════════════════════════════════════════════════════════════════╝
 
+# Прогрес Target з накопиченого значення (та сама формула і в repair)
+_TARGET_PROGRESS_SQL = "MIN(100, CAST({total} * 1.0 / target_value * 100 AS INTEGER))"
+
+
+async def _post_goal_entry(db, goal_id: int, user_id: int, day: str, value: float, notes: str = None) -> int:
+    """
+    Запис для Target/Metric на переданому з'єднанні (без commit):
+    запис, current_value += value і progress для Target, перерахунок проєктів-предків.
+    """
+    cursor = await db.execute(
+        """
+        INSERT INTO goal_entries (goal_id, user_id, date, value, notes)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (goal_id, user_id, day, value, notes)
+    )
+    entry_id = cursor.lastrowid
+    
+    # Оновити current_value та progress для Target
+    total = "(COALESCE(current_value, 0) + :value)"
+    cursor = await db.execute(
+        f"""
+        UPDATE goals
+        SET current_value = {total},
+            progress = {_TARGET_PROGRESS_SQL.format(total=total)}
+        WHERE id = :goal_id AND user_id = :user_id
+          AND goal_type = 'target' AND target_value
+        RETURNING parent_id
+        """,
+        {'value': value, 'goal_id': goal_id, 'user_id': user_id}
+    )
+    row = await cursor.fetchone()
+    
+    # Якщо належить проєкту — оновити його прогрес
+    if row and row['parent_id']:
+        await _recalculate_projects_progress(db, [row['parent_id']], user_id)
+    
+    return entry_id
+
+
 async def add_goal_entry(goal_id: int, user_id: int, value: float, notes: str = None) -> int:
-    """Додати запис для Target/Metric."""
+    """
+    Додати запис для Target/Metric.
+    
+    Одна транзакція на одному з'єднанні (_post_goal_entry).
+    SUM по всіх записах — тільки в repair_target_progress().
+    """
+    today = (await get_user_today(user_id)).isoformat()
+    
     db = await get_db()
     try:
-        today = date.today().isoformat()
-        cursor = await db.execute(
-            """
-            INSERT INTO goal_entries (goal_id, user_id, date, value, notes)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (goal_id, user_id, today, value, notes)
-        )
+        entry_id = await _post_goal_entry(db, goal_id, user_id, today, value, notes)
         await db.commit()
-        
-        # Оновити current_value та progress для Target
-        await _update_target_progress(goal_id, user_id)
-        
-        return cursor.lastrowid
+        _notify_change(user_id, 'goals')
+        return entry_id
+    except Exception:
+        await db.rollback()
+        raise
     finally:
         await db.close()
 
 
-async def _update_target_progress(goal_id: int, user_id: int) -> None:
-    """Оновлює прогрес Target цілі."""
+async def repair_target_progress(user_id: Optional[int] = None) -> int:
+    """
+    Перерахувати current_value / progress Target з SUM(goal_entries)
+    (якщо інкрементальне значення розійшлося — ручні правки, збої).
+    
+    Повертає кількість виправлених цілей.
+    """
+    total = "COALESCE((SELECT SUM(e.value) FROM goal_entries e WHERE e.goal_id = goals.id), 0)"
+    user_filter = "" if user_id is None else "AND user_id = :user_id"
+    
     db = await get_db()
     try:
-        goal = await get_goal_by_id(goal_id, user_id)
-        
-        if not goal or goal['goal_type'] != 'target' or not goal.get('target_value'):
-            return
-        
         cursor = await db.execute(
-            "SELECT SUM(value) as total FROM goal_entries WHERE goal_id = ?",
-            (goal_id,)
+            f"""
+            UPDATE goals
+            SET current_value = {total},
+                progress = {_TARGET_PROGRESS_SQL.format(total=total)}
+            WHERE goal_type = 'target' AND target_value {user_filter}
+              AND (current_value IS NOT {total}
+                   OR progress IS NOT {_TARGET_PROGRESS_SQL.format(total=total)})
+            RETURNING user_id, parent_id
+            """,
+            {'user_id': user_id}
         )
-        row = await cursor.fetchone()
-        total = row['total'] or 0
+        rows = await cursor.fetchall()
         
-        progress = min(100, int((total / goal['target_value']) * 100))
+        parents: Dict[int, set] = {}
+        for row in rows:
+            if row['parent_id']:
+                parents.setdefault(row['user_id'], set()).add(row['parent_id'])
+        for owner, project_ids in parents.items():
+            await _recalculate_projects_progress(db, project_ids, owner)
         
-        await db.execute(
-            "UPDATE goals SET current_value = ?, progress = ? WHERE id = ?",
-            (total, progress, goal_id)
-        )
         await db.commit()
-        
-        # Якщо належить проєкту — оновити його прогрес
-        if goal.get('parent_id'):
-            await recalculate_project_progress(goal['parent_id'], user_id)
-            
+    except Exception:
+        await db.rollback()
+        raise
     finally:
         await db.close()
+    
+    for owner in {row['user_id'] for row in rows}:
+        _notify_change(owner, 'goals')
+    return len(rows)
 
 
 async def get_goal_entries(goal_id: int, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
     """Отримати записи цілі за останні N днів."""
+    since_date = (await get_user_today(user_id) - timedelta(days=days)).isoformat()
+    
     db = await get_db()
     try:
-        since_date = (date.today() - timedelta(days=days)).isoformat()
         cursor = await db.execute(
             """
             SELECT * FROM goal_entries 
@@ -1089,13 +1748,64 @@ async def get_goal_entries(goal_id: int, user_id: int, days: int = 30) -> List[D
         await db.close()
 
 
+ENTRY_GRAINS = ('day', 'week', 'month')
+
+
+async def get_goal_entry_series(
+    goal_id: int,
+    user_id: int,
+    grain: str,
+    start: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Записи цілі, агреговані по кошиках (старіші першими).
+    
+    grain: day — з сирих goal_entries (для коротких періодів),
+           week / month — з goal_entry_buckets (не залежить від кількості записів).
+    Рядок: bucket (дата початку), count, total, min_value, max_value.
+    """
+    if grain not in ENTRY_GRAINS:
+        raise ValueError(f"Unknown grain: {grain}")
+    
+    since = start.isoformat() if start else '0000-00-00'
+    
+    if grain == 'day':
+        sql = """
+            SELECT e.date AS bucket, COUNT(*) AS count, SUM(e.value) AS total,
+                   MIN(e.value) AS min_value, MAX(e.value) AS max_value
+            FROM goal_entries e
+            WHERE e.goal_id = :goal_id AND e.user_id = :user_id AND e.date >= :since
+            GROUP BY e.date
+            ORDER BY e.date
+        """
+    else:
+        sql = """
+            SELECT b.bucket, b.count, b.total, b.min_value, b.max_value
+            FROM goal_entry_buckets b
+            JOIN goals g ON g.id = b.goal_id AND g.user_id = :user_id
+            WHERE b.goal_id = :goal_id AND b.grain = :grain AND b.bucket >= :since
+            ORDER BY b.bucket
+        """
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            sql,
+            {'goal_id': goal_id, 'user_id': user_id, 'grain': grain, 'since': since}
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
 # ╔════════════════════════════════════════════════════════════════════════════╗
 # ║                              STATISTICS                                      ║
 # ╚════════════════════════════════════════════════════════════════════════════╝
 
 async def get_tasks_stats(user_id: int) -> Dict[str, Any]:
     """Статистика задач."""
-    today = date.today().isoformat()
+    today = (await get_user_today(user_id)).isoformat()
     
     db = await get_db()
     try:
@@ -1169,7 +1879,7 @@ async def get_goals_stats(user_id: int) -> Dict[str, Any]:
 # ║                           TODAY SCHEDULE                                     ║
 # ╚════════════════════════════════════════════════════════════════════════════╝
 
-async def get_today_schedule(user_id: int) -> Dict[str, Any]:
+async def get_today_schedule(user_id: int, for_date: date = None) -> Dict[str, Any]:
     """
     Повний розклад на сьогодні:
     - recurring_tasks (з occurrences) — включаючи is_fixed (школа, робота)
@@ -1180,8 +1890,10 @@ async def get_today_schedule(user_id: int) -> Dict[str, Any]:
     ВАЖЛИВО: Recurring tasks ≠ Habits!
     - Recurring: is_fixed=1 для фіксованого часу, статистика, БЕЗ streak
     - Habits: streak tracking, мотивація безперервністю
+    
+    Дата — локальна дата користувача (його часовий пояс).
     """
-    today = date.today()
+    today = for_date or await get_user_today(user_id)
     weekday = today.isoweekday()
     
     schedule = {
@@ -1203,10 +1915,10 @@ async def get_today_schedule(user_id: int) -> Dict[str, Any]:
         })
     
     # 2. One-time tasks
-    schedule['one_time_tasks'] = await get_tasks_today(user_id)
+    schedule['one_time_tasks'] = await get_tasks_today(user_id, today)
     
     # 3. Habits (ОКРЕМО від recurring!)
-    schedule['habits'] = await get_habits_today(user_id)
+    schedule['habits'] = await get_habits_today(user_id, today)
     
     # 4. Build timeline
     timeline = []
@@ -1258,3 +1970,1510 @@ async def get_today_schedule(user_id: int) -> Dict[str, Any]:
     schedule['timeline'] = timeline
     
     return schedule
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                        DAILY STATS (історія)                                 ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+#
+# daily_stats — по рядку на користувача на день, пише day rollover.
+# Тиждень / місяць / рік читають готові рядки замість сканування логів.
+# Поточний (ще не закритий) день рахується наживо тим самим SELECT.
+
+DAILY_STATS_FIELDS = (
+    'tasks_completed',
+    'occurrences_done', 'occurrences_skipped', 'occurrences_missed',
+    'habits_done', 'habits_skipped', 'habits_missed',
+    'goal_entries',
+)
+
+# Підрахунок одного дня для кожного u.user_id (параметр :day).
+# FROM підставляє викликаючий код, джерела історії — _daily_stats_select().
+_DAILY_STATS_SELECT_SQL = """
+    SELECT
+        u.user_id, :day AS date,
+        (SELECT COUNT(*) FROM {tasks} t
+         WHERE t.user_id = u.user_id AND t.is_completed = 1
+           AND DATE(t.completed_at) = :day) AS tasks_completed,
+        (SELECT COUNT(*) FROM {task_occurrences} o
+         WHERE o.user_id = u.user_id AND o.date = :day AND o.status = 'done') AS occurrences_done,
+        (SELECT COUNT(*) FROM {task_occurrences} o
+         WHERE o.user_id = u.user_id AND o.date = :day AND o.status = 'skipped') AS occurrences_skipped,
+        (SELECT COUNT(*) FROM {task_occurrences} o
+         WHERE o.user_id = u.user_id AND o.date = :day AND o.status = 'missed') AS occurrences_missed,
+        (SELECT COUNT(*) FROM {habit_logs} hl
+         WHERE hl.user_id = u.user_id AND hl.date = :day AND hl.status = 'done') AS habits_done,
+        (SELECT COUNT(*) FROM {habit_logs} hl
+         WHERE hl.user_id = u.user_id AND hl.date = :day AND hl.status = 'skipped') AS habits_skipped,
+        (SELECT COUNT(*) FROM {habit_logs} hl
+         WHERE hl.user_id = u.user_id AND hl.date = :day AND hl.status = 'missed') AS habits_missed,
+        (SELECT COUNT(*) FROM goal_entries ge
+         WHERE ge.user_id = u.user_id AND ge.date = :day) AS goal_entries
+"""
+
+
+async def _daily_stats_select(db, day: str) -> str:
+    """_DAILY_STATS_SELECT_SQL для дня (день за межею архіву — разом з архівом)."""
+    sources = {table: await _history(db, table, day) for table in ARCHIVE_TABLES}
+    return _DAILY_STATS_SELECT_SQL.format(**sources)
+
+
+async def get_daily_stats(user_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+    """Закриті дні з daily_stats за період [start, end]."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""
+            SELECT date, {", ".join(DAILY_STATS_FIELDS)}
+            FROM daily_stats
+            WHERE user_id = ? AND date BETWEEN ? AND ?
+            ORDER BY date
+            """,
+            (user_id, start.isoformat(), end.isoformat())
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def get_monthly_stats(user_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+    """daily_stats, згорнуті по місяцях ('YYYY-MM') — для річного перегляду."""
+    sums = ", ".join(f"SUM({field}) AS {field}" for field in DAILY_STATS_FIELDS)
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""
+            SELECT substr(date, 1, 7) AS month, {sums}
+            FROM daily_stats
+            WHERE user_id = ? AND date BETWEEN ? AND ?
+            GROUP BY month
+            ORDER BY month
+            """,
+            (user_id, start.isoformat(), end.isoformat())
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def get_live_day_stats(user_id: int, day: date) -> Dict[str, Any]:
+    """Статистика ще не закритого дня (рахується з сирих рядків)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            await _daily_stats_select(db, day.isoformat()) + " FROM (SELECT :user_id AS user_id) u",
+            {'day': day.isoformat(), 'user_id': user_id}
+        )
+        row = await cursor.fetchone()
+        return dict(row)
+    finally:
+        await db.close()
+
+
+async def backfill_daily_stats(since: date = None) -> int:
+    """
+    Заповнити daily_stats для існуючої БД (дні до останнього закритого).
+    Без since — від першої активності користувачів поясу.
+    Повертає кількість оброблених (пояс, день).
+    """
+    processed = 0
+    
+    for tz_name in await get_timezone_buckets():
+        last_closed = await get_last_closed_day(tz_name)
+        end = last_closed or clock.local_today(tz_name) - timedelta(days=1)
+        
+        db = await get_db()
+        try:
+            await _fill_rollover_users(db, tz_name)
+            
+            start = since
+            if start is None:
+                sources = {table: await _history(db, table) for table in ARCHIVE_TABLES}
+                cursor = await db.execute(
+                    f"""
+                    SELECT MIN(d) FROM (
+                        SELECT MIN(DATE(completed_at)) AS d FROM {sources['tasks']}
+                        WHERE completed_at IS NOT NULL
+                          AND user_id IN (SELECT user_id FROM temp.rollover_users)
+                        UNION ALL
+                        SELECT MIN(date) FROM {sources['task_occurrences']}
+                        WHERE user_id IN (SELECT user_id FROM temp.rollover_users)
+                        UNION ALL
+                        SELECT MIN(date) FROM {sources['habit_logs']}
+                        WHERE user_id IN (SELECT user_id FROM temp.rollover_users)
+                        UNION ALL
+                        SELECT MIN(date) FROM goal_entries
+                        WHERE user_id IN (SELECT user_id FROM temp.rollover_users)
+                    )
+                    """
+                )
+                first = (await cursor.fetchone())[0]
+                if not first:
+                    continue
+                start = date.fromisoformat(first)
+            
+            day = start
+            while day <= end:
+                await _snapshot_daily_stats(db, day)
+                processed += 1
+                day += timedelta(days=1)
+                
+                # Комітимо порціями, щоб не тримати write lock довго
+                if processed % 30 == 0:
+                    await db.commit()
+            
+            await db.commit()
+        finally:
+            await db.close()
+    
+    return processed
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                            DAY ROLLOVER                                      ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+#
+# Закриття минулого дня після опівночі — окремо для кожного часового поясу.
+# Все робиться set-based запитами в ОДНІЙ транзакції на часовий пояс:
+# 1. Незалоговані заплановані звички → habit_logs 'missed'
+# 2. Pending occurrences → 'missed'
+# 3. Streak = 0 для звичок з 'missed'
+# 4. Знімок daily_stats
+#
+# Користувачі поясу збираються в temp.rollover_users, щоб кожен запит
+# фільтрувався через один індексований підзапит.
+
+async def get_timezone_buckets() -> List[str]:
+    """Всі часові пояси користувачів (+ config.TIMEZONE для тих, хто без налаштувань)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            SELECT DISTINCT COALESCE(timezone, ?) AS tz FROM user_settings
+            UNION
+            SELECT ?
+            """,
+            (config.TIMEZONE, config.TIMEZONE)
+        )
+        rows = await cursor.fetchall()
+        return [row['tz'] for row in rows]
+    finally:
+        await db.close()
+
+
+async def get_last_closed_day(tz_name: str) -> Optional[date]:
+    """Останній закритий день для часового поясу (None — ще не закривали)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT last_closed FROM day_rollovers WHERE timezone = ?",
+            (tz_name,)
+        )
+        row = await cursor.fetchone()
+        return date.fromisoformat(row['last_closed']) if row else None
+    finally:
+        await db.close()
+
+
+async def _fill_rollover_users(db, tz_name: str) -> None:
+    """Заповнити temp.rollover_users користувачами часового поясу."""
+    await db.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS rollover_users (user_id INTEGER PRIMARY KEY)"
+    )
+    await db.execute("DELETE FROM temp.rollover_users")
+    await db.execute(
+        """
+        INSERT INTO temp.rollover_users (user_id)
+        SELECT user_id FROM user_settings WHERE COALESCE(timezone, ?) = ?
+        """,
+        (config.TIMEZONE, tz_name)
+    )
+    
+    # Користувачі без user_settings живуть у config.TIMEZONE
+    if tz_name == config.TIMEZONE:
+        await db.execute(
+            """
+            INSERT OR IGNORE INTO temp.rollover_users (user_id)
+            SELECT user_id FROM goals
+            WHERE user_id NOT IN (SELECT user_id FROM user_settings)
+            UNION
+            SELECT user_id FROM tasks
+            WHERE user_id NOT IN (SELECT user_id FROM user_settings)
+            """
+        )
+
+
+async def _snapshot_daily_stats(db, day: date) -> None:
+    """Записати daily_stats за день для всіх користувачів з temp.rollover_users."""
+    await db.execute(
+        """
+        INSERT OR REPLACE INTO daily_stats (
+            user_id, date,
+            tasks_completed,
+            occurrences_done, occurrences_skipped, occurrences_missed,
+            habits_done, habits_skipped, habits_missed,
+            goal_entries
+        )
+        """ + await _daily_stats_select(db, day.isoformat()) + """
+        FROM temp.rollover_users u
+        """,
+        {'day': day.isoformat()}
+    )
+
+
+async def close_day(tz_name: str, day: date) -> Dict[str, int]:
+    """
+    Закрити день для всіх користувачів часового поясу.
+    Одна транзакція: або все, або нічого.
+    
+    Повертає кількість змінених рядків по кроках.
+    """
+    day_iso = day.isoformat()
+    weekday = day.isoweekday()
+    
+    db = await get_db()
+    try:
+        await _fill_rollover_users(db, tz_name)
+        
+        # 1. Незалоговані заплановані звички → missed
+        cursor = await db.execute(
+            """
+            INSERT OR IGNORE INTO habit_logs (goal_id, user_id, date, status)
+            SELECT g.id, g.user_id, ?, 'missed'
+            FROM goals g
+            WHERE g.user_id IN (SELECT user_id FROM temp.rollover_users)
+              AND g.goal_type = 'habit'
+              AND g.status = 'active'
+              AND DATE(g.created_at) <= ?
+              AND """ + _HABIT_SCHEDULED_SQL,
+            (day_iso, day_iso, weekday, str(weekday))
+        )
+        habits_missed = cursor.rowcount
+        
+        # 2. Pending occurrences (за цей день і раніше) → missed
+        cursor = await db.execute(
+            """
+            UPDATE task_occurrences
+            SET status = 'missed'
+            WHERE status = 'pending'
+              AND date <= ?
+              AND user_id IN (SELECT user_id FROM temp.rollover_users)
+            """,
+            (day_iso,)
+        )
+        occurrences_missed = cursor.rowcount
+        
+        # 3. Обірвані серії
+        # (якщо звичку вже залогували пізніше — streak вже порахований без цього дня)
+        cursor = await db.execute(
+            """
+            UPDATE goals
+            SET current_streak = 0
+            WHERE goal_type = 'habit'
+              AND current_streak > 0
+              AND id IN (
+                  SELECT goal_id FROM habit_logs
+                  WHERE date = ? AND status = 'missed'
+              )
+              AND id NOT IN (
+                  SELECT goal_id FROM habit_logs WHERE date > ?
+              )
+              AND user_id IN (SELECT user_id FROM temp.rollover_users)
+            """,
+            (day_iso, day_iso)
+        )
+        streaks_reset = cursor.rowcount
+        
+        # 4. Знімок статистики
+        await _snapshot_daily_stats(db, day)
+        
+        await db.execute(
+            """
+            INSERT INTO day_rollovers (timezone, last_closed, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(timezone) DO UPDATE SET
+                last_closed = excluded.last_closed,
+                updated_at = excluded.updated_at
+            """,
+            (tz_name, day_iso)
+        )
+        
+        await db.commit()
+        
+        return {
+            'habits_missed': habits_missed,
+            'occurrences_missed': occurrences_missed,
+            'streaks_reset': streaks_reset,
+        }
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                               EXPORT                                         ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+#
+# Порційне читання всіх рядків користувача: кожна порція — окремий короткий
+# запит (keyset по id через індекс user_id), тож довгий експорт не тримає
+# read lock і не блокує записи інших апдейтів. Пам'ять — O(chunk_size).
+
+EXPORT_TABLES = ('tasks', 'task_occurrences', 'goals', 'habit_logs', 'goal_entries')
+
+
+async def get_table_columns(table: str) -> List[str]:
+    """Назви колонок таблиці (порядок як у схемі)."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        rows = await cursor.fetchall()
+        return [row['name'] for row in rows]
+    finally:
+        await db.close()
+
+
+async def iter_user_rows(
+    user_id: int,
+    table: str,
+    chunk_size: int = 1000
+) -> AsyncIterator[List[tuple]]:
+    """
+    Порції рядків таблиці користувача (кортежі в порядку get_table_columns).
+    Таблиці архіву — спершу гарячі рядки, потім архівовані.
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    
+    db = await get_db()
+    try:
+        sources = [f"main.{table}"]
+        if table in ARCHIVE_TABLES and await get_archived_until() is not None:
+            await attach_archive(db)
+            columns = ", ".join(_archive['columns'][table])
+            # Колонки — в порядку гарячої таблиці
+            sources.append(f"(SELECT {columns} FROM archive.{table})")
+        
+        for source in sources:
+            last_id = 0
+            while True:
+                # Кожна порція — окремий завершений SELECT (lock знімається між порціями)
+                cursor = await db.execute(
+                    f"""
+                    SELECT * FROM {source}
+                    WHERE user_id = ? AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                    """,
+                    (user_id, last_id, chunk_size)
+                )
+                rows = [tuple(row) for row in await cursor.fetchall()]
+                
+                if rows:
+                    yield rows
+                
+                if len(rows) < chunk_size:
+                    break
+                last_id = rows[-1][0]
+    finally:
+        await db.close()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                               IMPORT                                         ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+# Порядок колонок у кортежах для bulk_import()
+IMPORT_TASK_COLUMNS = (
+    'title', 'description', 'priority', 'deadline',
+    'scheduled_time', 'scheduled_end', 'estimated_minutes',
+    'is_recurring', 'recurrence_rule', 'recurrence_days',
+    'is_fixed', 'goal_id',
+)
+IMPORT_HABIT_COLUMNS = (
+    'title', 'description', 'parent_id', 'frequency',
+    'schedule_days', 'reminder_time', 'duration_minutes',
+)
+
+# Рядків на один executemany
+IMPORT_CHUNK_SIZE = 5000
+
+
+async def bulk_import(
+    user_id: int,
+    tasks: List[tuple],
+    habits: List[tuple],
+) -> Dict[str, int]:
+    """
+    Вставити задачі та звички однією транзакцією.
+    
+    tasks / habits — кортежі в порядку IMPORT_TASK_COLUMNS / IMPORT_HABIT_COLUMNS
+    (вже провалідовані, див. services/importer.py).
+    Після вставки — один пакетний перерахунок прогресу всіх зачеплених проєктів.
+    Помилка → rollback, нічого не вставлено.
+    """
+    task_sql = (
+        f"INSERT INTO tasks (user_id, {', '.join(IMPORT_TASK_COLUMNS)}) "
+        f"VALUES (?{', ?' * len(IMPORT_TASK_COLUMNS)})"
+    )
+    habit_sql = (
+        f"INSERT INTO goals (user_id, goal_type, {', '.join(IMPORT_HABIT_COLUMNS)}) "
+        f"VALUES (?, 'habit'{', ?' * len(IMPORT_HABIT_COLUMNS)})"
+    )
+    goal_idx = IMPORT_TASK_COLUMNS.index('goal_id')
+    parent_idx = IMPORT_HABIT_COLUMNS.index('parent_id')
+    
+    db = await get_db()
+    try:
+        for sql, rows in ((task_sql, tasks), (habit_sql, habits)):
+            for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+                await db.executemany(
+                    sql,
+                    [(user_id, *row) for row in rows[start:start + IMPORT_CHUNK_SIZE]]
+                )
+        
+        projects = {row[goal_idx] for row in tasks if row[goal_idx]}
+        projects |= {row[parent_idx] for row in habits if row[parent_idx]}
+        await _recalculate_projects_progress(db, projects, user_id)
+        
+        await db.commit()
+        _notify_change(user_id, 'tasks')
+        _notify_change(user_id, 'goals')
+        return {'tasks': len(tasks), 'habits': len(habits), 'projects': len(projects)}
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                               SEARCH                                         ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+# Код джерела в rowid search_index (див. models.SEARCH_SOURCES)
+SEARCH_KINDS = ('task', 'goal', 'occurrence', 'habit_log')
+SEARCH_PAGE_SIZE = 10
+
+# Слова коротші за це шукаються цілком, довші — як префікс.
+# Префікс з 1-2 літер збігається з третиною індексу (і немає prefix-індексу
+# для нього — FTS5 злив би всі терміни вручну).
+SEARCH_MIN_PREFIX = 3
+
+# Маркери підсвітки у title / snippet (HTML-екранування робить handler)
+SEARCH_MARK_START = "\x02"
+SEARCH_MARK_END = "\x03"
+
+_SEARCH_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_SEARCH_ID_MASK = (1 << (SEARCH_OWNER_SHIFT - 2)) - 1
+
+
+def _search_match(text: str) -> Optional[str]:
+    """
+    Текст користувача → FTS5 MATCH-вираз.
+    Всі слова обов'язкові (AND), спецсинтаксис FTS5 з тексту не пропускаємо —
+    тільки слова в лапках.
+    """
+    tokens = _SEARCH_TOKEN_RE.findall(text.lower())[:8]
+    if not tokens:
+        return None
+    return " AND ".join(
+        f'"{token}"*' if len(token) >= SEARCH_MIN_PREFIX else f'"{token}"'
+        for token in tokens
+    )
+
+
+async def _resolve_archived_hits(db, hits: List[Dict[str, Any]]) -> None:
+    """Дата, батьківська задача / звичка і її назва для архівованих нотаток."""
+    await attach_archive(db)
+    for code, table, parent, parents in (
+        (2, 'task_occurrences', 'task_id', 'tasks'),
+        (3, 'habit_logs', 'goal_id', 'goals'),
+    ):
+        by_id = {hit['id']: hit for hit in hits if hit['kind_code'] == code}
+        if not by_id:
+            continue
+        goal_type = "p.goal_type" if parents == 'goals' else "NULL"
+        cursor = await db.execute(
+            f"""
+            SELECT a.id, a.date, a.{parent} AS parent_id, p.title, {goal_type} AS goal_type
+            FROM archive.{table} a
+            LEFT JOIN {parents} p ON p.id = a.{parent}
+            WHERE a.id IN ({", ".join("?" * len(by_id))})
+            """,
+            list(by_id)
+        )
+        for row in await cursor.fetchall():
+            by_id[row['id']].update(date=row['date'], parent_id=row['parent_id'],
+                                    title=row['title'], goal_type=row['goal_type'])
+
+
+async def search(
+    user_id: int,
+    text: str,
+    page: int = 0,
+    limit: int = SEARCH_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Повнотекстовий пошук по задачах, цілях і нотатках.
+    
+    Ранжування: спершу збіги в назві, потім в описі / нотатці;
+    всередині — новіші першими. bm25 тут не використовуємо: він рахує
+    глобальну частоту терміна, тобто сканує весь doclist незалежно від
+    користувача (десятки мс на префіксах), а обидва яруси — це нативний
+    прохід FTS5 по rowid з раннім LIMIT.
+    
+    Повертає {'items': [...], 'has_more': bool}. Кожен item:
+    kind, id, title, title_hl / snippet (з маркерами SEARCH_MARK_*),
+    date, parent_id, goal_type.
+    """
+    match = _search_match(text)
+    if match is None:
+        return {'items': [], 'has_more': False}
+    
+    title_match = f"{{title}} : ({match})"
+    body_match = f"({match}) NOT {title_match}"
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT owner FROM search_owners WHERE user_id = ?",
+            (user_id,)
+        )
+        owner = await cursor.fetchone()
+        if owner is None:
+            return {'items': [], 'has_more': False}
+        
+        low = owner['owner'] << SEARCH_OWNER_SHIFT
+        high = low + (1 << SEARCH_OWNER_SHIFT) - 1
+        
+        # Скільки збігів у назві — щоб знати, де сторінка переходить на 2-й ярус
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM search_index WHERE search_index MATCH ? AND rowid BETWEEN ? AND ?",
+            (title_match, low, high)
+        )
+        title_hits = (await cursor.fetchone())[0]
+        
+        start = page * limit
+        need = limit + 1
+        title_limit = max(0, min(need, title_hits - start))
+        
+        tier_sql = """
+            SELECT * FROM (
+                SELECT rowid AS key, {tier} AS tier,
+                       highlight(search_index, 0, :start, :end) AS title_hl,
+                       snippet(search_index, 1, :start, :end, '…', 12) AS snippet
+                FROM search_index
+                WHERE search_index MATCH :{name}_match AND rowid BETWEEN :low AND :high
+                ORDER BY rowid DESC
+                LIMIT :{name}_limit OFFSET :{name}_offset
+            )
+        """
+        
+        cursor = await db.execute(
+            f"""
+            SELECT
+                page.key & 3 AS kind_code,
+                (page.key >> 2) & {_SEARCH_ID_MASK} AS id,
+                page.title_hl,
+                page.snippet,
+                CASE page.key & 3
+                    WHEN 0 THEN t.title
+                    WHEN 1 THEN g.title
+                    WHEN 2 THEN ot.title
+                    ELSE lg.title
+                END AS title,
+                COALESCE(g.goal_type, lg.goal_type) AS goal_type,
+                COALESCE(o.date, l.date) AS date,
+                COALESCE(o.task_id, l.goal_id) AS parent_id
+            FROM (
+                {tier_sql.format(tier=0, name='title')}
+                UNION ALL
+                {tier_sql.format(tier=1, name='body')}
+            ) AS page
+            LEFT JOIN tasks t ON page.key & 3 = 0 AND t.id = (page.key >> 2) & {_SEARCH_ID_MASK}
+            LEFT JOIN goals g ON page.key & 3 = 1 AND g.id = (page.key >> 2) & {_SEARCH_ID_MASK}
+            LEFT JOIN task_occurrences o ON page.key & 3 = 2 AND o.id = (page.key >> 2) & {_SEARCH_ID_MASK}
+            LEFT JOIN tasks ot ON ot.id = o.task_id
+            LEFT JOIN habit_logs l ON page.key & 3 = 3 AND l.id = (page.key >> 2) & {_SEARCH_ID_MASK}
+            LEFT JOIN goals lg ON lg.id = l.goal_id
+            ORDER BY page.tier, page.key DESC
+            """,
+            {
+                'start': SEARCH_MARK_START, 'end': SEARCH_MARK_END,
+                'low': low, 'high': high,
+                'title_match': title_match,
+                'title_limit': title_limit,
+                'title_offset': start,
+                'body_match': body_match,
+                'body_limit': need - title_limit,
+                'body_offset': max(0, start - title_hits),
+            }
+        )
+        rows = [dict(row) for row in await cursor.fetchall()]
+        
+        # Нотатки, рядки яких уже в архіві (в гарячих таблицях їх немає)
+        unresolved = [row for row in rows if row['kind_code'] in (2, 3) and row['date'] is None]
+        if unresolved and await get_archived_until() is not None:
+            await _resolve_archived_hits(db, unresolved)
+    finally:
+        await db.close()
+    
+    items = []
+    for row in rows[:limit]:
+        item = dict(row)
+        item['kind'] = SEARCH_KINDS[item.pop('kind_code')]
+        items.append(item)
+    
+    return {'items': items, 'has_more': len(rows) > limit}
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                             CHART CACHE                                      ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+# Скільки днів зберігати file_id (старі ключі — дані, яких вже немає)
+CHART_CACHE_DAYS = 90
+
+
+async def get_chart_file_id(key: str) -> Optional[str]:
+    """file_id графіка за хешем вмісту."""
+    db = await get_db()
+    try:
+        cursor = await db.execute("SELECT file_id FROM chart_cache WHERE key = ?", (key,))
+        row = await cursor.fetchone()
+        return row['file_id'] if row else None
+    finally:
+        await db.close()
+
+
+async def save_chart_file_id(key: str, file_id: str) -> None:
+    """Зберегти file_id (і прибрати застарілі записи)."""
+    db = await get_db()
+    try:
+        await db.execute(
+            "INSERT OR REPLACE INTO chart_cache (key, file_id) VALUES (?, ?)",
+            (key, file_id)
+        )
+        await db.execute(
+            "DELETE FROM chart_cache WHERE created_at < datetime('now', ?)",
+            (f"-{CHART_CACHE_DAYS} days",)
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def delete_chart_file_id(key: str) -> None:
+    """Забути file_id (Telegram його більше не приймає)."""
+    db = await get_db()
+    try:
+        await db.execute("DELETE FROM chart_cache WHERE key = ?", (key,))
+        await db.commit()
+    finally:
+        await db.close()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                               WORDS                                          ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+# Черга повторення — keyset по (due_date, id) в індексі ix_words_user_due:
+# кожна порція — короткий seek незалежно від розміру словника.
+# SM-2 рахує services/srs.py, сюди приходять готові значення пакетом.
+
+WORDS_BATCH_SIZE = 20
+
+# Порядок колонок у кортежах для apply_word_reviews()
+WORD_REVIEW_COLUMNS = ('ease_factor', 'interval', 'repetitions', 'due_date', 'last_review')
+
+_WORD_CARD_COLUMNS = "id, word, translation, example, ease_factor, interval, repetitions, due_date"
+
+
+async def create_word(
+    user_id: int,
+    word: str,
+    translation: str,
+    example: str = None,
+    language: str = 'de',
+) -> int:
+    """Додати слово (одразу в чергу на сьогодні)."""
+    due_date = (await get_user_today(user_id)).isoformat()
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            INSERT INTO words (user_id, word, translation, example, language, due_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (user_id, word, translation, example, language, due_date)
+        )
+        await db.commit()
+        return cursor.lastrowid
+    finally:
+        await db.close()
+
+
+async def get_due_words(
+    user_id: int,
+    today: date,
+    after: Optional[Tuple[str, int]] = None,
+    limit: int = WORDS_BATCH_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Наступна порція слів до повторення (due_date <= today), від найстаріших.
+    
+    after — (due_date, id) останньої картки попередньої порції.
+    """
+    if after is None:
+        sql = f"""
+            SELECT {_WORD_CARD_COLUMNS} FROM words
+            WHERE user_id = ? AND due_date <= ?
+            ORDER BY due_date, id LIMIT ?
+        """
+        params: tuple = (user_id, today.isoformat(), limit)
+    else:
+        # (due_date, id) > курсор — два діапазони, кожен окремий seek по індексу
+        due_date, word_id = after
+        sql = f"""
+            SELECT * FROM (
+                SELECT {_WORD_CARD_COLUMNS} FROM words
+                WHERE user_id = ? AND due_date = ? AND id > ?
+                ORDER BY id LIMIT ?
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT {_WORD_CARD_COLUMNS} FROM words
+                WHERE user_id = ? AND due_date > ? AND due_date <= ?
+                ORDER BY due_date, id LIMIT ?
+            )
+            LIMIT ?
+        """
+        params = (
+            user_id, due_date, word_id, limit,
+            user_id, due_date, today.isoformat(), limit,
+            limit,
+        )
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(sql, params)
+        return [dict(row) for row in await cursor.fetchall()]
+    finally:
+        await db.close()
+
+
+async def get_words_stats(user_id: int, today: date) -> Dict[str, int]:
+    """Скільки слів всього і скільки до повторення сьогодні."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM words WHERE user_id = ?) AS total,
+                (SELECT COUNT(*) FROM words WHERE user_id = ? AND due_date <= ?) AS due
+            """,
+            (user_id, user_id, today.isoformat())
+        )
+        return dict(await cursor.fetchone())
+    finally:
+        await db.close()
+
+
+async def apply_word_reviews(user_id: int, reviews: List[tuple]) -> int:
+    """
+    Записати результати повторень однією транзакцією.
+    
+    reviews — кортежі (word_id, *WORD_REVIEW_COLUMNS).
+    """
+    if not reviews:
+        return 0
+    
+    assignments = ", ".join(f"{column} = ?" for column in WORD_REVIEW_COLUMNS)
+    db = await get_db()
+    try:
+        await db.executemany(
+            f"UPDATE words SET {assignments} WHERE id = ? AND user_id = ?",
+            [(*values, word_id, user_id) for word_id, *values in reviews]
+        )
+        await db.commit()
+        return len(reviews)
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                               BOOKS                                          ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+# Бібліотека посторінково: keyset по id (нові першими) в межах (user_id, status),
+# індекс ix_books_page. Файл книги — Telegram file_id: повторно не завантажується.
+# file_unique_id — дедуплікація (ix_books_file) і спільні метадані файлу.
+
+BOOK_STATUSES = ('reading', 'want_to_read', 'completed')
+BOOKS_PAGE_SIZE = 10
+
+# Що книга додає до прив'язаної Target: прочитані сторінки або +1 за прочитану книгу
+BOOK_GOAL_UNITS = ('pages', 'books')
+
+# Поля, які можна заповнити з метаданих файлу
+BOOK_METADATA_FIELDS = ('pages', 'author')
+
+
+async def create_book(
+    user_id: int,
+    title: str,
+    author: str = None,
+    pages: int = None,
+    file_id: str = None,
+    file_unique_id: str = None,
+    file_name: str = None,
+) -> Optional[int]:
+    """Додати книгу. None — цей файл уже є в бібліотеці користувача."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            INSERT INTO books (user_id, title, author, pages, file_id, file_unique_id, file_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (file_unique_id, user_id) WHERE file_unique_id IS NOT NULL DO NOTHING
+            RETURNING id
+            """,
+            (user_id, title, author, pages, file_id, file_unique_id, file_name)
+        )
+        row = await cursor.fetchone()
+        await db.commit()
+        return row['id'] if row else None
+    finally:
+        await db.close()
+
+
+async def get_book_by_id(book_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """Отримати книгу по ID."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            SELECT b.*, g.title AS goal_title FROM books b
+            LEFT JOIN goals g ON g.id = b.goal_id AND g.user_id = b.user_id
+            WHERE b.id = ? AND b.user_id = ?
+            """,
+            (book_id, user_id)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+    finally:
+        await db.close()
+
+
+async def find_book_by_file(user_id: int, file_unique_id: str) -> Optional[Dict[str, Any]]:
+    """Книга користувача з цим файлом (дедуплікація завантажень)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT * FROM books WHERE file_unique_id = ? AND user_id = ?",
+            (file_unique_id, user_id)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+    finally:
+        await db.close()
+
+
+async def get_file_metadata(file_unique_id: str) -> Optional[Dict[str, Any]]:
+    """Метадані файлу, вже визначені для будь-якої книги з ним."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""
+            SELECT {', '.join(BOOK_METADATA_FIELDS)} FROM books
+            WHERE file_unique_id = ? AND pages IS NOT NULL
+            LIMIT 1
+            """,
+            (file_unique_id,)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+    finally:
+        await db.close()
+
+
+async def fill_book_metadata(
+    book_id: int,
+    user_id: int,
+    metadata: Dict[str, Any],
+    file_title: str = None,
+) -> bool:
+    """
+    Заповнити порожні поля книги з метаданих файлу (введене вручну не чіпаємо).
+    file_title — назва з імені файлу: замінюється назвою з метаданих.
+    """
+    fields = [field for field in BOOK_METADATA_FIELDS if metadata.get(field)]
+    assignments = [f"{field} = COALESCE({field}, ?)" for field in fields]
+    params = [metadata[field] for field in fields]
+    
+    if file_title and metadata.get('title'):
+        assignments.append("title = CASE WHEN title = ? THEN ? ELSE title END")
+        params += [file_title, metadata['title']]
+    
+    if not assignments:
+        return False
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"UPDATE books SET {', '.join(assignments)} WHERE id = ? AND user_id = ?",
+            (*params, book_id, user_id)
+        )
+        await db.commit()
+        return cursor.rowcount > 0
+    finally:
+        await db.close()
+
+
+async def get_books_page(
+    user_id: int,
+    status: str = 'reading',
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+    limit: int = BOOKS_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Одна сторінка книг зі статусом status (нові першими, курсор — id).
+    
+    Повертає {'items': [...], 'has_prev': bool, 'has_next': bool}.
+    """
+    if status not in BOOK_STATUSES:
+        raise ValueError(f"Unknown book status: {status}")
+    
+    where = "user_id = ? AND status = ?"
+    params: list = [user_id, status]
+    backward = before is not None
+    
+    if backward:
+        where += " AND id > ?"
+        params.append(before)
+    elif after is not None:
+        where += " AND id < ?"
+        params.append(after)
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""
+            SELECT id, title, author, pages, current_page, status FROM books
+            WHERE {where}
+            ORDER BY id {'ASC' if backward else 'DESC'}
+            LIMIT ?
+            """,
+            (*params, limit + 1)
+        )
+        rows = [dict(row) for row in await cursor.fetchall()]
+    finally:
+        await db.close()
+    
+    more = len(rows) > limit
+    rows = rows[:limit]
+    
+    if backward:
+        rows.reverse()
+        return {'items': rows, 'has_prev': more, 'has_next': True}
+    return {'items': rows, 'has_prev': after is not None, 'has_next': more}
+
+
+async def count_books(user_id: int) -> Dict[str, int]:
+    """Кількість книг по статусах."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT status, COUNT(*) AS count FROM books WHERE user_id = ? GROUP BY status",
+            (user_id,)
+        )
+        counts = {status: 0 for status in BOOK_STATUSES}
+        counts.update({row['status']: row['count'] for row in await cursor.fetchall()})
+        return counts
+    finally:
+        await db.close()
+
+
+async def update_book_progress(
+    book_id: int,
+    user_id: int,
+    current_page: int = None,
+    pages: int = None,
+    status: str = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Поточна сторінка / кількість сторінок / статус книги.
+    
+    Статус за сторінкою: почали — reading, дійшли до кінця — completed;
+    явний completed ставить current_page = pages.
+    
+    Якщо книга прив'язана до Target — в тій самій транзакції запис
+    у goal_entries (прочитані сторінки або ±1 книга), current_value
+    цілі і прогрес проєктів-предків. Один commit на одному з'єднанні.
+    
+    Повертає книгу + 'goal_value' (скільки додано до цілі, None — нічого).
+    """
+    if status is not None and status not in BOOK_STATUSES:
+        raise ValueError(f"Unknown book status: {status}")
+    
+    today = (await get_user_today(user_id)).isoformat()
+    
+    db = await get_db()
+    try:
+        # Блокування на запис до читання — різниця рахується від актуальних значень
+        # (в сесії апдейту транзакція вже може бути відкрита)
+        if not db.in_transaction:
+            await db.execute("BEGIN IMMEDIATE")
+        cursor = await db.execute(
+            """
+            SELECT b.title, b.pages, b.current_page, b.status, b.goal_unit,
+                   g.id AS goal_id, g.title AS goal_title
+            FROM books b
+            LEFT JOIN goals g ON g.id = b.goal_id AND g.user_id = b.user_id
+                             AND g.goal_type = 'target'
+            WHERE b.id = ? AND b.user_id = ?
+            """,
+            (book_id, user_id)
+        )
+        old = await cursor.fetchone()
+        if old is None:
+            await db.commit()
+            return None
+        
+        new_pages = pages or old['pages']
+        new_page = old['current_page'] or 0
+        new_status = old['status']
+        
+        if current_page is not None:
+            new_page = min(current_page, new_pages) if new_pages else current_page
+            if new_pages and new_page >= new_pages:
+                new_status = 'completed'
+            elif new_page > 0:
+                new_status = 'reading'
+        
+        if status is not None:
+            new_status = status
+            if status == 'completed' and new_pages:
+                new_page = new_pages
+        
+        cursor = await db.execute(
+            """
+            UPDATE books SET pages = ?, current_page = ?, status = ?
+            WHERE id = ? AND user_id = ?
+            RETURNING *
+            """,
+            (new_pages, new_page, new_status, book_id, user_id)
+        )
+        book = dict(await cursor.fetchone())
+        
+        goal_value = None
+        if old['goal_id']:
+            if old['goal_unit'] == 'books':
+                goal_value = (new_status == 'completed') - (old['status'] == 'completed')
+            else:
+                goal_value = new_page - (old['current_page'] or 0)
+            if goal_value:
+                await _post_goal_entry(db, old['goal_id'], user_id, today, goal_value, old['title'])
+            else:
+                goal_value = None
+        
+        await db.commit()
+        if goal_value:
+            _notify_change(user_id, 'goals')
+        
+        book['goal_title'] = old['goal_title']
+        book['goal_value'] = goal_value
+        return book
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def set_book_status(book_id: int, user_id: int, status: str) -> Optional[Dict[str, Any]]:
+    """Змінити статус книги (прогрес цілі — як в update_book_progress)."""
+    return await update_book_progress(book_id, user_id, status=status)
+
+
+async def link_book_goal(book_id: int, user_id: int, goal_id: Optional[int], unit: str = 'pages') -> bool:
+    """
+    Прив'язати книгу до Target (goal_id=None — відв'язати).
+    Рахується лише прогрес після прив'язки.
+    """
+    if unit not in BOOK_GOAL_UNITS:
+        raise ValueError(f"Unknown book goal unit: {unit}")
+    
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """
+            UPDATE books SET goal_id = ?, goal_unit = ?
+            WHERE id = ? AND user_id = ?
+              AND (? IS NULL OR EXISTS (
+                  SELECT 1 FROM goals
+                  WHERE id = ? AND user_id = ? AND goal_type = 'target'
+              ))
+            """,
+            (goal_id, unit if goal_id else None, book_id, user_id, goal_id, goal_id, user_id)
+        )
+        await db.commit()
+        return cursor.rowcount > 0
+    finally:
+        await db.close()
+
+
+async def delete_book(book_id: int, user_id: int) -> bool:
+    """Видалити книгу."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "DELETE FROM books WHERE id = ? AND user_id = ?",
+            (book_id, user_id)
+        )
+        await db.commit()
+        return cursor.rowcount > 0
+    finally:
+        await db.close()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                             MAINTENANCE                                      ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+# Для адмін-команди /perf. Обслуговування йде на окремому з'єднанні
+# (get_db(detached=True)): VACUUM і wal_checkpoint не працюють у транзакції,
+# а FTS5 скидає сегменти лише при commit — incremental_vacuum після нього.
+
+# Таблиці, кількість рядків яких показує /perf
+STATS_TABLES = (
+    'tasks', 'task_occurrences', 'goals', 'habit_logs', 'habit_bitmaps', 'goal_entries', 'words', 'books'
+)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+async def get_db_stats() -> Dict[str, Any]:
+    """Розмір файлів, сторінки, режими і найбільші таблиці / індекси."""
+    db = await get_db()
+    try:
+        stats = {}
+        for pragma in ('page_count', 'page_size', 'freelist_count', 'journal_mode', 'auto_vacuum'):
+            cursor = await db.execute(f"PRAGMA {pragma}")
+            stats[pragma] = (await cursor.fetchone())[0]
+        
+        stats['file_size'] = _file_size(str(config.DATABASE_PATH))
+        stats['wal_size'] = _file_size(f"{config.DATABASE_PATH}-wal")
+        stats['archive_size'] = _file_size(str(config.ARCHIVE_PATH))
+        stats['archived_until'] = await get_archived_until()
+        
+        stats['rows'] = {}
+        for table in STATS_TABLES:
+            cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")
+            stats['rows'][table] = (await cursor.fetchone())[0]
+        
+        # dbstat є не в кожній збірці SQLite
+        try:
+            cursor = await db.execute(
+                """
+                SELECT name, pgsize FROM dbstat WHERE aggregate = TRUE
+                ORDER BY pgsize DESC LIMIT 5
+                """
+            )
+            stats['largest'] = [(row['name'], row['pgsize']) for row in await cursor.fetchall()]
+        except sqlite3.OperationalError:
+            stats['largest'] = []
+        
+        return stats
+    finally:
+        await db.close()
+
+
+async def optimize_database() -> Dict[str, Any]:
+    """
+    Обслуговування на вимогу: checkpoint WAL, PRAGMA optimize, ANALYZE,
+    злиття сегментів FTS5, incremental_vacuum (якщо auto_vacuum = INCREMENTAL).
+    Повертає час кожного кроку (мс) і вільні сторінки до / після.
+    """
+    db = await get_db(detached=True)
+    try:
+        result: Dict[str, Any] = {'steps': []}
+        cursor = await db.execute("PRAGMA freelist_count")
+        result['freelist_before'] = (await cursor.fetchone())[0]
+        cursor = await db.execute("PRAGMA auto_vacuum")
+        incremental = (await cursor.fetchone())[0] == 2
+        
+        steps = [
+            ('wal_checkpoint', "PRAGMA wal_checkpoint(TRUNCATE)"),
+            ('optimize', "PRAGMA optimize"),
+            ('analyze', "ANALYZE"),
+            ('fts_optimize', "INSERT INTO search_index (search_index) VALUES ('optimize')"),
+            ('commit', None),
+        ]
+        if incremental:
+            steps.append(('incremental_vacuum', "PRAGMA incremental_vacuum"))
+        
+        for name, sql in steps:
+            start = time.perf_counter()
+            if sql is None:
+                await db.commit()
+            elif name == 'incremental_vacuum':
+                # execute() робить один крок = одна сторінка; executescript — до кінця
+                await db.executescript(sql)
+            else:
+                cursor = await db.execute(sql)
+                await cursor.fetchall()
+            result['steps'].append((name, (time.perf_counter() - start) * 1000))
+        
+        cursor = await db.execute("PRAGMA freelist_count")
+        result['freelist_after'] = (await cursor.fetchone())[0]
+        result['incremental'] = incremental
+        return result
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def vacuum_database() -> Dict[str, int]:
+    """
+    Повний VACUUM з переходом на auto_vacuum = INCREMENTAL
+    (далі вільні сторінки повертає optimize_database). Блокує БД на час виконання.
+    """
+    db = await get_db(detached=True)
+    try:
+        size_before = _file_size(str(config.DATABASE_PATH))
+        await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        await db.execute("VACUUM")
+        await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {'before': size_before, 'after': _file_size(str(config.DATABASE_PATH))}
+    finally:
+        await db.close()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                               ARCHIVE                                        ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+#
+# Стара історія переноситься з гарячих таблиць в архівну БД (config.ARCHIVE_PATH,
+# services/archive.py — порціями у фоні). Гарячі індекси (списки задач, /today,
+# streak) тоді покривають лише актуальні рядки.
+#
+# archive_meta.until — межа архіву: рядки з датою < until можуть бути в архіві.
+# Запити історії беруть джерело через _history(db, table, since): якщо період
+# не заходить за межу (since >= until) — гаряча таблиця як і раніше, інакше
+# архів підключається до з'єднання (ATTACH) і рядки йдуть UNION ALL.
+#
+# Архівуються лише рядки, які вже не змінюються: виконані one-time задачі без
+# проєкту (задачі проєктів рахуються в його прогресі), occurrences і логи звичок.
+# Нотатки occurrences / логів лишаються в пошуку; виконані задачі — ні
+# (результат пошуку веде на картку задачі, а вона вже в архіві).
+# Статуси логів звичок лишаються в habit_bitmaps (гаряча БД) — streak, heatmap
+# і статистика звички архів не підключають.
+
+# Таблиця → умова архівування (:cutoff — перша дата, що лишається в гарячій таблиці)
+ARCHIVE_TABLES = {
+    'tasks': "is_recurring = 0 AND is_completed = 1 AND goal_id IS NULL AND completed_at < :cutoff",
+    'task_occurrences': "date < :cutoff",
+    'habit_logs': "date < :cutoff",
+}
+
+# Таблиці архіву, документи яких повертаються в search_index
+ARCHIVE_SEARCH_TABLES = ('task_occurrences', 'habit_logs')
+
+# (назва, таблиця, колонки) — індекси архіву під запити історії
+ARCHIVE_INDEXES = (
+    ('ix_tasks_user', 'tasks', 'user_id, completed_at'),
+    ('ix_task_occ_task', 'task_occurrences', 'task_id, date'),
+    ('ix_task_occ_user', 'task_occurrences', 'user_id, date'),
+    ('ix_habit_logs_goal', 'habit_logs', 'goal_id, date'),
+    ('ix_habit_logs_user', 'habit_logs', 'user_id, date'),
+)
+
+# Рядків на транзакцію перенесення
+ARCHIVE_BATCH = 1000
+
+# Стан архіву процесу: межа і колонки таблиць (порядок як у гарячих)
+_archive: Dict[str, Any] = {'loaded': False, 'until': None, 'columns': {}}
+
+
+async def _sync_archive_schema(db) -> None:
+    """Таблиці архіву з колонками гарячих (нові колонки міграцій — ADD COLUMN)."""
+    await db.execute("PRAGMA archive.journal_mode = WAL")
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS archive.archive_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+    )
+    
+    columns = {}
+    for table in ARCHIVE_TABLES:
+        cursor = await db.execute(f"PRAGMA main.table_info({table})")
+        hot = [(row['name'], row['type']) for row in await cursor.fetchall()]
+        cursor = await db.execute(f"PRAGMA archive.table_info({table})")
+        existing = {row['name'] for row in await cursor.fetchall()}
+        
+        if not existing:
+            # Без обмежень і зовнішніх ключів — рядки вже перевірені в гарячій таблиці
+            definition = ", ".join(
+                "id INTEGER PRIMARY KEY" if name == 'id' else f"{name} {type_}"
+                for name, type_ in hot
+            )
+            await db.execute(f"CREATE TABLE archive.{table} ({definition})")
+        else:
+            for name, type_ in hot:
+                if name not in existing:
+                    await db.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {type_}")
+        columns[table] = [name for name, _ in hot]
+    
+    for name, table, index_columns in ARCHIVE_INDEXES:
+        await db.execute(f"CREATE INDEX IF NOT EXISTS archive.{name} ON {table}({index_columns})")
+    
+    _archive['columns'] = columns
+
+
+async def get_archived_until() -> Optional[str]:
+    """Межа архіву (ISO-дата) або None — архіву немає. Читається раз на процес."""
+    if _archive['loaded']:
+        return _archive['until']
+    
+    until = None
+    if config.ARCHIVE_PATH.exists():
+        db = await get_db(detached=True)
+        try:
+            await attach_archive(db)
+            await _sync_archive_schema(db)
+            cursor = await db.execute("SELECT value FROM archive.archive_meta WHERE key = 'until'")
+            row = await cursor.fetchone()
+            await db.commit()
+            until = row['value'] if row else None
+        finally:
+            await db.close()
+    
+    _archive['until'] = until
+    _archive['loaded'] = True
+    return until
+
+
+async def _history(db, table: str, since: Optional[str] = None) -> str:
+    """
+    FROM-джерело рядків table за період від since (ISO-дата; None — за весь час).
+    Період після межі архіву — гаряча таблиця, інакше UNION ALL з архівом
+    (умови WHERE SQLite проштовхує в обидві частини — пошук по індексах).
+    """
+    until = await get_archived_until()
+    if until is None or (since is not None and since >= until):
+        return table
+    
+    await attach_archive(db)
+    columns = ", ".join(_archive['columns'][table])
+    return f"(SELECT {columns} FROM main.{table} UNION ALL SELECT {columns} FROM archive.{table})"
+
+
+async def has_archivable(cutoff: str) -> bool:
+    """Чи є рядки, старші за cutoff, хоча б в одній таблиці архіву."""
+    db = await get_db()
+    try:
+        for table, condition in ARCHIVE_TABLES.items():
+            cursor = await db.execute(
+                f"SELECT EXISTS (SELECT 1 FROM main.{table} WHERE {condition})",
+                {'cutoff': cutoff}
+            )
+            if (await cursor.fetchone())[0]:
+                return True
+        return False
+    finally:
+        await db.close()
+
+
+async def start_archive(cutoff: str) -> None:
+    """
+    Підготувати перенесення рядків до cutoff: схема архіву і нова межа.
+    Межа зсувається ДО перенесення — запити історії вже дивляться в архів.
+    """
+    db = await get_db(detached=True)
+    try:
+        await attach_archive(db)
+        await _sync_archive_schema(db)
+        until = max(cutoff, await get_archived_until() or cutoff)
+        await db.execute(
+            "INSERT OR REPLACE INTO archive.archive_meta (key, value) VALUES ('until', ?)",
+            (until,)
+        )
+        await db.commit()
+        _archive['until'] = until
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def archive_batch(table: str, cutoff: str, after: int = 0) -> Tuple[int, Optional[int]]:
+    """
+    Перенести до ARCHIVE_BATCH рядків table з id > after (одна транзакція).
+    Повертає (перенесено, останній id або None — більше немає).
+    """
+    if table not in ARCHIVE_TABLES:
+        raise ValueError(f"Unknown archive table: {table}")
+    
+    db = await get_db(detached=True)
+    try:
+        await attach_archive(db)
+        await db.execute("BEGIN IMMEDIATE")
+        cursor = await db.execute(
+            f"""
+            SELECT id FROM main.{table}
+            WHERE id > :after AND {ARCHIVE_TABLES[table]}
+            ORDER BY id LIMIT :limit
+            """,
+            {'after': after, 'cutoff': cutoff, 'limit': ARCHIVE_BATCH}
+        )
+        ids = [row['id'] for row in await cursor.fetchall()]
+        if not ids:
+            await db.rollback()
+            return 0, None
+        
+        placeholders = ", ".join("?" * len(ids))
+        columns = ", ".join(_archive['columns'][table])
+        # OR REPLACE: якщо commit попередньої порції дійшов лише до архіву
+        await db.execute(
+            f"""
+            INSERT OR REPLACE INTO archive.{table} ({columns})
+            SELECT {columns} FROM main.{table} WHERE id IN ({placeholders})
+            """,
+            ids
+        )
+        # Тригер search_ad прибирає документи з search_index
+        await db.execute(f"DELETE FROM main.{table} WHERE id IN ({placeholders})", ids)
+        if table in ARCHIVE_SEARCH_TABLES:
+            await db.execute(
+                f"""
+                INSERT INTO search_index (rowid, title, body)
+                {search_documents_sql(table, 'a', f'FROM archive.{table} a')}
+                  AND a.id IN ({placeholders})
+                """,
+                ids
+            )
+        await db.commit()
+        return len(ids), ids[-1]
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
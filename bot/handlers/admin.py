@@ -0,0 +1,145 @@
+"""
+Адмін-команди (лише config.ADMIN_ID).
+LifeHub Bot v4.0
+
+/perf           — затримки по хендлерах (p50/p95/p99), апдейти в обробці,
+                  кеші, throttling, backlog rollover
+/perf db        — розмір БД, сторінки, рядки, архів, найбільші таблиці / індекси
+/perf slow      — останні повільні апдейти з їх SQL (SLOW_UPDATE_MS)
+/perf optimize  — wal_checkpoint, PRAGMA optimize, ANALYZE, FTS optimize,
+                  incremental_vacuum
+/perf vacuum    — повний VACUUM з переходом на auto_vacuum = INCREMENTAL
+
+Повідомлення від інших користувачів сюди не доходять (фільтр роутера)
+і обробляються далі як звичайні.
+"""
+
+import html
+
+from aiogram import Router, F
+from aiogram.types import Message
+from aiogram.filters import Command, CommandObject
+
+from bot.config import config
+from bot.database import queries
+from bot.keyboards import cache as keyboard_cache
+from bot.middlewares import throttling
+from bot.services import charts, metrics, rollover, srs, suggestions
+from bot.locales import uk
+
+
+router = Router()
+router.message.filter(F.from_user.id == config.ADMIN_ID)
+
+_MB = 1024 * 1024
+
+
+async def _overview() -> str:
+    lines = [uk.PERF['title'], uk.PERF['updates'].format(**metrics.update_stats())]
+    
+    lines.append(uk.PERF['latency_header'])
+    rows = metrics.latency()
+    lines += [uk.PERF['latency_row'].format(**row) for row in rows] or [uk.PERF['latency_empty']]
+    
+    kb_stats = keyboard_cache.cache_stats().values()
+    kb_hits = sum(s['hits'] for s in kb_stats)
+    kb_total = kb_hits + sum(s['misses'] for s in kb_stats)
+    index = suggestions.index_stats()
+    chart_cache = charts.cache_stats()
+    words = srs.session_stats()
+    lines.append(uk.PERF['caches'].format(
+        kb_rate=kb_hits * 100 / kb_total if kb_total else 0,
+        kb_hits=kb_hits,
+        kb_total=kb_total,
+        kb_size=sum(s['size'] for s in kb_stats),
+        sg_users=index['users'],
+        sg_items=index['items'],
+        ch_memory=chart_cache['memory'],
+        ch_rendering=chart_cache['rendering'],
+        srs_sessions=words['sessions'],
+        srs_pending=words['pending'],
+    ))
+    
+    lines.append(uk.PERF['throttling'].format(**throttling.throttle_stats()))
+    
+    backlog = {tz: days for tz, days in (await rollover.backlog()).items() if days}
+    lines.append(uk.PERF['backlog'].format(
+        backlog=", ".join(f"{tz} {days}" for tz, days in backlog.items()) or uk.PERF['backlog_clear']
+    ))
+    return "\n".join(lines)
+
+
+async def _db() -> str:
+    stats = await queries.get_db_stats()
+    lines = [uk.PERF['db'].format(
+        file_mb=stats['file_size'] / _MB,
+        wal_mb=stats['wal_size'] / _MB,
+        auto_vacuum={0: 'NONE', 1: 'FULL', 2: 'INCREMENTAL'}.get(stats['auto_vacuum']),
+        **{k: stats[k] for k in ('page_count', 'page_size', 'freelist_count', 'journal_mode')},
+    )]
+    
+    lines.append(uk.PERF['db_rows'])
+    lines += [f"{table}: {count}" for table, count in stats['rows'].items()]
+    
+    if stats['archived_until']:
+        lines.append(uk.PERF['db_archive'].format(
+            archive_mb=stats['archive_size'] / _MB,
+            until=stats['archived_until'],
+        ))
+    
+    if stats['largest']:
+        lines.append(uk.PERF['db_largest'])
+        lines += [f"{name}: {size / _MB:.1f} МБ" for name, size in stats['largest']]
+    return "\n".join(lines)
+
+
+def _slow() -> str:
+    entries = metrics.slow_updates()
+    if not entries:
+        return uk.PERF['slow_empty'].format(threshold=config.SLOW_UPDATE_MS or "—")
+    
+    text = ""
+    for entry in entries:
+        block = "\n".join(
+            [uk.PERF['slow_row'].format(**entry)]
+            + [f"  <code>{html.escape(sql)}</code>" for sql in entry['sql']]
+        )
+        # Ліміт повідомлення Telegram — 4096 символів
+        if len(text) + len(block) > 4000:
+            break
+        text += block + "\n\n"
+    return text
+
+
+async def _optimize() -> str:
+    result = await queries.optimize_database()
+    text = uk.PERF['optimize_done'].format(
+        steps="\n".join(f"{name}: {ms:.0f} мс" for name, ms in result['steps']),
+        freelist_before=result['freelist_before'],
+        freelist_after=result['freelist_after'],
+    )
+    if not result['incremental']:
+        text += uk.PERF['optimize_no_incremental']
+    return text
+
+
+@router.message(Command("perf"))
+async def cmd_perf(message: Message, command: CommandObject):
+    """Консоль продуктивності."""
+    action = (command.args or "").strip().lower()
+    
+    if action == "optimize":
+        text = await _optimize()
+    elif action == "vacuum":
+        sizes = await queries.vacuum_database()
+        text = uk.PERF['vacuum_done'].format(before_mb=sizes['before'] / _MB, after_mb=sizes['after'] / _MB)
+    elif action == "db":
+        text = await _db()
+    elif action == "slow":
+        text = _slow()
+    elif action:
+        text = uk.PERF['usage']
+    else:
+        text = await _overview()
+    
+    await message.answer(text, parse_mode="HTML")
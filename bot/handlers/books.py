@@ -0,0 +1,510 @@
+"""
+Обробники бібліотеки книг.
+LifeHub Bot v4.0
+
+/books    — бібліотека по статусах (keyset-пагінація)
+/book_add — файл (PDF / EPUB) або назва вручну
+
+Книгу можна прив'язати до Target ("24 книги" або "5000 сторінок"):
+прогрес читання потрапляє в ціль однією транзакцією (queries.update_book_progress).
+
+Файл книги не перезавантажується: зберігаємо file_id і надсилаємо за ним.
+Той самий файл (file_unique_id) вдруге не додається. Сторінки, автор
+і назва (замість імені файлу) визначаються у фоні в пулі процесів (services/bookmeta.py),
+а якщо файл уже розбирали для іншої книги — беруться з неї.
+"""
+
+import asyncio
+import html
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message, CallbackQuery, Document
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+
+from bot.database import queries
+from bot.services import bookmeta, workers
+from bot.states.states import BookCreation, BookProgress
+from bot.keyboards import books as kb
+from bot.keyboards.reply import get_main_menu, get_cancel_keyboard, get_skip_cancel_keyboard
+from bot.locales import uk
+
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Ліміт Bot API на завантаження файлу ботом (getFile)
+MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+
+_PROGRESS = re.compile(r"^\s*(\d+)\s*(?:/\s*(\d+)\s*)?$")
+
+# Фонові задачі метаданих (посилання, щоб їх не зібрав GC)
+_metadata_tasks: set = set()
+
+
+def _format_book(book: dict) -> str:
+    text = uk.BOOKS['view'].format(
+        title=html.escape(book['title']),
+        author=html.escape(book.get('author') or uk.BOOKS['no_author']),
+        progress=kb.book_progress(book),
+        status=kb.BOOK_STATUS_LABELS[book['status']],
+    )
+    if book.get('goal_title'):
+        text += uk.BOOKS['view_goal'].format(
+            goal=html.escape(book['goal_title']),
+            unit=uk.BOOKS['goal_units'][book['goal_unit']],
+        )
+    return text
+
+
+def _goal_posted(book: dict, escape: bool = True) -> str:
+    """
+    Повідомлення про запис у прив'язану ціль ('' — нічого не додано).
+    escape=False — для callback.answer (спливаюче вікно не розбирає HTML).
+    """
+    if not book.get('goal_value'):
+        return ""
+    goal = html.escape(book['goal_title']) if escape else book['goal_title']
+    return uk.BOOKS['goal_posted'].format(value=f"{book['goal_value']:+g}", goal=goal)
+
+
+async def render_books_page(
+    user_id: int,
+    status: str = None,
+    page: int = 0,
+    after: int = None,
+    before: int = None,
+):
+    """Текст + клавіатура сторінки бібліотеки. None — книг немає зовсім."""
+    counts = await queries.count_books(user_id)
+    if not any(counts.values()):
+        return None
+    
+    if status is None:
+        status = next((s for s in queries.BOOK_STATUSES if counts[s]), 'reading')
+    
+    result = await queries.get_books_page(user_id, status, after=after, before=before)
+    books = result['items']
+    
+    lines = [uk.BOOKS['title'].format(status=kb.BOOK_STATUS_LABELS[status]), ""]
+    if books:
+        for book in books:
+            author = f" — {html.escape(book['author'])}" if book.get('author') else ""
+            lines.append(f"• {html.escape(book['title'])}{author} [{kb.book_progress(book)}]")
+    else:
+        lines.append(uk.BOOKS['empty_status'])
+    
+    markup = kb.get_books_list(
+        books, status, counts,
+        page=page, has_prev=result['has_prev'], has_next=result['has_next'],
+    )
+    return "\n".join(lines), markup
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                              КОМАНДИ                                         ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+@router.message(Command("books"))
+async def cmd_books(message: Message):
+    """Показати бібліотеку."""
+    rendered = await render_books_page(message.from_user.id)
+    
+    if rendered is None:
+        await message.answer(uk.BOOKS['empty'], parse_mode="HTML")
+        return
+    
+    text, markup = rendered
+    await message.answer(text, parse_mode="HTML", reply_markup=markup)
+
+
+@router.message(Command("book_add"))
+async def cmd_book_add(message: Message, state: FSMContext):
+    """Почати додавання книги."""
+    await state.clear()
+    await state.set_state(BookCreation.file)
+    await message.answer(uk.BOOKS['create_prompt'], reply_markup=get_cancel_keyboard())
+
+
+@router.callback_query(F.data == "book:add")
+async def callback_book_add(callback: CallbackQuery, state: FSMContext):
+    """Додати книгу через inline."""
+    await state.clear()
+    await state.set_state(BookCreation.file)
+    await callback.message.answer(uk.BOOKS['create_prompt'], reply_markup=get_cancel_keyboard())
+    await callback.answer()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                         ДОДАВАННЯ ФАЙЛОМ                                     ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+async def _fill_metadata(status: Message, book_id: int, user_id: int, document: Document, kind: str) -> None:
+    """Завантажити файл, розібрати в пулі процесів і дописати метадані книги."""
+    fd, name = tempfile.mkstemp(prefix=f"lifehub_book_{book_id}_", suffix=f".{kind}")
+    os.close(fd)
+    path = Path(name)
+    
+    try:
+        await status.bot.download(document, destination=path)
+        metadata = await workers.run(bookmeta.extract_metadata, str(path), kind)
+        await queries.fill_book_metadata(book_id, user_id, metadata, file_title=Path(document.file_name).stem)
+    except Exception:
+        logger.exception(f"❌ Не вдалося визначити метадані книги {book_id}")
+    finally:
+        path.unlink(missing_ok=True)
+    
+    book = await queries.get_book_by_id(book_id, user_id)
+    if book:
+        try:
+            await status.edit_text(
+                f"{uk.BOOKS['created']}\n\n{_format_book(book)}",
+                parse_mode="HTML",
+                reply_markup=kb.get_book_actions(book)
+            )
+        except TelegramBadRequest:
+            pass
+
+
+@router.message(BookCreation.file, F.document)
+async def book_file(message: Message, state: FSMContext):
+    """Файл книги: дедуплікація за file_unique_id, метадані — у фоні."""
+    user_id = message.from_user.id
+    document = message.document
+    await state.clear()
+    
+    existing = await queries.find_book_by_file(user_id, document.file_unique_id)
+    if existing:
+        await message.answer(uk.BOOKS['duplicate'], reply_markup=get_main_menu())
+        await message.answer(
+            _format_book(existing),
+            parse_mode="HTML",
+            reply_markup=kb.get_book_actions(existing)
+        )
+        return
+    
+    file_name = document.file_name or ""
+    kind = bookmeta.BOOK_FORMATS.get(Path(file_name).suffix.lower())
+    
+    # Той самий файл уже розбирали для когось — метадані готові
+    metadata = await queries.get_file_metadata(document.file_unique_id) or {}
+    
+    book_id = await queries.create_book(
+        user_id,
+        Path(file_name).stem or uk.BOOKS['untitled'],
+        author=metadata.get('author'),
+        pages=metadata.get('pages'),
+        file_id=document.file_id,
+        file_unique_id=document.file_unique_id,
+        file_name=file_name or None,
+    )
+    if book_id is None:
+        # Той самий файл надіслано двічі поспіль
+        book = await queries.find_book_by_file(user_id, document.file_unique_id)
+    else:
+        book = await queries.get_book_by_id(book_id, user_id)
+    
+    await message.answer(uk.BOOKS['created'], reply_markup=get_main_menu())
+    
+    pending = (
+        book_id is not None and not metadata and kind is not None
+        and (document.file_size or 0) <= MAX_DOWNLOAD_BYTES
+    )
+    status = await message.answer(
+        _format_book(book) + (uk.BOOKS['metadata_pending'] if pending else ""),
+        parse_mode="HTML",
+        reply_markup=kb.get_book_actions(book)
+    )
+    
+    if pending:
+        task = asyncio.get_running_loop().create_task(
+            _fill_metadata(status, book['id'], user_id, document, kind)
+        )
+        _metadata_tasks.add(task)
+        task.add_done_callback(_metadata_tasks.discard)
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                         ДОДАВАННЯ ВРУЧНУ                                     ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+@router.message(BookCreation.file)
+async def book_title(message: Message, state: FSMContext):
+    """Замість файлу — назва книги."""
+    if not message.text or message.text == "❌ Скасувати":
+        await state.clear()
+        await message.answer(uk.CANCELLED, reply_markup=get_main_menu())
+        return
+    
+    await state.update_data(title=message.text.strip())
+    await state.set_state(BookCreation.author)
+    await message.answer(uk.BOOKS['create_author'], reply_markup=get_skip_cancel_keyboard())
+
+
+@router.message(BookCreation.author)
+async def book_author(message: Message, state: FSMContext):
+    """Отримуємо автора."""
+    if message.text == "❌ Скасувати":
+        await state.clear()
+        await message.answer(uk.CANCELLED, reply_markup=get_main_menu())
+        return
+    
+    author = None if message.text == "⏭ Пропустити" else message.text.strip()
+    await state.update_data(author=author)
+    await state.set_state(BookCreation.pages)
+    await message.answer(uk.BOOKS['create_pages'], reply_markup=get_skip_cancel_keyboard())
+
+
+@router.message(BookCreation.pages)
+async def book_pages(message: Message, state: FSMContext):
+    """Отримуємо кількість сторінок і зберігаємо книгу."""
+    if message.text == "❌ Скасувати":
+        await state.clear()
+        await message.answer(uk.CANCELLED, reply_markup=get_main_menu())
+        return
+    
+    pages = None
+    if message.text != "⏭ Пропустити":
+        if not (message.text or "").strip().isdigit() or int(message.text) <= 0:
+            await message.answer(uk.BOOKS['invalid_pages'])
+            return
+        pages = int(message.text)
+    
+    data = await state.get_data()
+    await state.clear()
+    
+    user_id = message.from_user.id
+    book_id = await queries.create_book(user_id, data['title'], author=data.get('author'), pages=pages)
+    book = await queries.get_book_by_id(book_id, user_id)
+    
+    await message.answer(uk.BOOKS['created'], reply_markup=get_main_menu())
+    await message.answer(_format_book(book), parse_mode="HTML", reply_markup=kb.get_book_actions(book))
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                              CALLBACKS                                       ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+@router.callback_query(F.data.startswith("books:tab:"))
+async def callback_books_tab(callback: CallbackQuery):
+    """Вкладка статусу: books:tab:{status}."""
+    status = callback.data.split(":")[-1]
+    rendered = await render_books_page(callback.from_user.id, status)
+    
+    if rendered is None:
+        await callback.message.edit_text(uk.BOOKS['empty'], parse_mode="HTML")
+    else:
+        text, markup = rendered
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("books:pg:"))
+async def callback_books_page(callback: CallbackQuery):
+    """Пагінація: books:pg:{status}:{n|p}:{page}:{id}."""
+    _, _, status, direction, page, book_id = callback.data.split(":")
+    user_id = callback.from_user.id
+    
+    if direction == "p":
+        rendered = await render_books_page(user_id, status, max(int(page), 0), before=int(book_id))
+    else:
+        rendered = await render_books_page(user_id, status, int(page), after=int(book_id))
+    
+    if rendered is None:
+        await callback.message.edit_text(uk.BOOKS['empty'], parse_mode="HTML")
+    else:
+        text, markup = rendered
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("book:view:"))
+async def callback_book_view(callback: CallbackQuery):
+    """Картка книги."""
+    book_id = int(callback.data.split(":")[-1])
+    book = await queries.get_book_by_id(book_id, callback.from_user.id)
+    
+    if not book:
+        await callback.answer(uk.BOOKS['not_found'], show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        _format_book(book),
+        parse_mode="HTML",
+        reply_markup=kb.get_book_actions(book)
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("book:file:"))
+async def callback_book_file(callback: CallbackQuery):
+    """Надіслати файл книги за file_id (без повторного завантаження)."""
+    book_id = int(callback.data.split(":")[-1])
+    book = await queries.get_book_by_id(book_id, callback.from_user.id)
+    
+    if not book or not book.get('file_id'):
+        await callback.answer(uk.BOOKS['not_found'], show_alert=True)
+        return
+    
+    await callback.answer()
+    try:
+        await callback.message.answer_document(book['file_id'])
+    except TelegramBadRequest:
+        await callback.message.answer(uk.BOOKS['file_missing'])
+
+
+@router.callback_query(F.data.startswith("book:status:"))
+async def callback_book_status(callback: CallbackQuery):
+    """Змінити статус: book:status:{id}:{status}."""
+    _, _, book_id, status = callback.data.split(":")
+    book_id = int(book_id)
+    user_id = callback.from_user.id
+    
+    book = None
+    if status in queries.BOOK_STATUSES:
+        book = await queries.set_book_status(book_id, user_id, status)
+    
+    if not book:
+        await callback.answer(uk.BOOKS['not_found'], show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        _format_book(book),
+        parse_mode="HTML",
+        reply_markup=kb.get_book_actions(book)
+    )
+    await callback.answer(_goal_posted(book, escape=False) or kb.BOOK_STATUS_LABELS[status])
+
+
+@router.callback_query(F.data.startswith("book:progress:"))
+async def callback_book_progress(callback: CallbackQuery, state: FSMContext):
+    """Почати введення поточної сторінки."""
+    book_id = int(callback.data.split(":")[-1])
+    
+    await state.set_state(BookProgress.current_page)
+    await state.update_data(book_id=book_id)
+    
+    await callback.message.answer(
+        uk.BOOKS['progress_prompt'],
+        parse_mode="HTML",
+        reply_markup=get_cancel_keyboard()
+    )
+    await callback.answer()
+
+
+@router.message(BookProgress.current_page)
+async def book_progress_value(message: Message, state: FSMContext):
+    """Поточна сторінка (або сторінка/всього)."""
+    if message.text == "❌ Скасувати":
+        await state.clear()
+        await message.answer(uk.CANCELLED, reply_markup=get_main_menu())
+        return
+    
+    match = _PROGRESS.match(message.text or "")
+    if not match or (match.group(2) and int(match.group(2)) <= 0):
+        await message.answer(uk.BOOKS['progress_invalid'], parse_mode="HTML")
+        return
+    
+    data = await state.get_data()
+    await state.clear()
+    
+    current_page = int(match.group(1))
+    pages = int(match.group(2)) if match.group(2) else None
+    book = await queries.update_book_progress(data['book_id'], message.from_user.id, current_page, pages)
+    
+    if not book:
+        await message.answer(uk.BOOKS['not_found'], reply_markup=get_main_menu())
+        return
+    
+    await message.answer(
+        _goal_posted(book) or uk.BOOKS['progress_saved'],
+        reply_markup=get_main_menu()
+    )
+    await message.answer(_format_book(book), parse_mode="HTML", reply_markup=kb.get_book_actions(book))
+
+
+@router.callback_query(F.data.startswith("book:goal:"))
+async def callback_book_goal(callback: CallbackQuery):
+    """Вибір Target для прогресу книги."""
+    book_id = int(callback.data.split(":")[-1])
+    user_id = callback.from_user.id
+    
+    book = await queries.get_book_by_id(book_id, user_id)
+    if not book:
+        await callback.answer(uk.BOOKS['not_found'], show_alert=True)
+        return
+    
+    targets = await queries.get_goals_by_type(user_id, 'target')
+    if not targets and not book.get('goal_id'):
+        await callback.answer(uk.BOOKS['goal_no_targets'], show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        uk.BOOKS['goal_select'],
+        reply_markup=kb.get_book_goal_select(book, targets)
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("book:goalunit:"))
+async def callback_book_goal_unit(callback: CallbackQuery):
+    """Що рахувати в цілі: book:goalunit:{book_id}:{goal_id}."""
+    _, _, book_id, goal_id = callback.data.split(":")
+    
+    await callback.message.edit_text(
+        uk.BOOKS['goal_unit_select'],
+        reply_markup=kb.get_book_goal_units(int(book_id), int(goal_id))
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("book:link:"))
+async def callback_book_link(callback: CallbackQuery):
+    """Прив'язати / відв'язати: book:link:{book_id}:{goal_id|0}:{unit}."""
+    _, _, book_id, goal_id, unit = callback.data.split(":")
+    book_id, goal_id = int(book_id), int(goal_id) or None
+    user_id = callback.from_user.id
+    
+    if unit not in queries.BOOK_GOAL_UNITS or not await queries.link_book_goal(book_id, user_id, goal_id, unit):
+        await callback.answer(uk.BOOKS['not_found'], show_alert=True)
+        return
+    
+    book = await queries.get_book_by_id(book_id, user_id)
+    await callback.message.edit_text(
+        _format_book(book),
+        parse_mode="HTML",
+        reply_markup=kb.get_book_actions(book)
+    )
+    await callback.answer(uk.BOOKS['goal_linked'] if goal_id else uk.BOOKS['goal_unlinked'])
+
+
+@router.callback_query(F.data.startswith("book:delete:"))
+async def callback_book_delete(callback: CallbackQuery):
+    """Підтвердження видалення."""
+    book_id = int(callback.data.split(":")[-1])
+    book = await queries.get_book_by_id(book_id, callback.from_user.id)
+    
+    if not book:
+        await callback.answer(uk.BOOKS['not_found'], show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        uk.BOOKS['delete_confirm'].format(title=html.escape(book['title'])),
+        reply_markup=kb.get_book_delete_confirm(book_id)
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("book:delete_yes:"))
+async def callback_book_delete_yes(callback: CallbackQuery):
+    """Видалити книгу."""
+    book_id = int(callback.data.split(":")[-1])
+    await queries.delete_book(book_id, callback.from_user.id)
+    await callback.message.edit_text(uk.BOOKS['deleted'])
+    await callback.answer()
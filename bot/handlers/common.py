@@ -90,7 +90,8 @@ async def btn_habits(message: Message):
 @router.message(F.text == "📚 Книги")
 async def btn_books(message: Message):
     """Кнопка Книги → /books."""
-    await message.answer("📚 <b>Книги</b>\n\n<i>В розробці...</i>", parse_mode="HTML")
+    from bot.handlers.books import cmd_books
+    await cmd_books(message)
 
 
 @router.message(F.text == "⚙️ Налаштування")
@@ -0,0 +1,156 @@
+"""
+Обробники експорту та імпорту даних.
+LifeHub Bot v4.0
+
+/export [csv|json] — архів з усіма задачами, occurrences, цілями,
+логами звичок і записами цілей.
+/import — задачі та звички з CSV / JSON однією транзакцією.
+"""
+
+import html
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from aiogram import Router, F
+from aiogram.types import Message, FSInputFile
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+
+from bot.database import queries
+from bot.services import export, importer
+from bot.states.states import DataImport
+from bot.keyboards.reply import get_main_menu, get_cancel_keyboard
+from bot.locales import uk
+
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Ліміт Bot API на завантаження документа
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# Ліміт Bot API на завантаження файлу ботом (getFile)
+MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+
+
+@router.message(Command("export"))
+async def cmd_export(message: Message, command: CommandObject):
+    """Експорт всіх даних користувача."""
+    user_id = message.from_user.id
+    fmt = (command.args or "csv").strip().lower()
+    
+    if fmt not in export.EXPORT_FORMATS:
+        await message.answer(uk.DATA['export_usage'], parse_mode="HTML")
+        return
+    
+    status = await message.answer(uk.DATA['export_started'])
+    
+    try:
+        path, counts = await export.build_export(user_id, fmt)
+    except Exception:
+        logger.exception("❌ Помилка експорту")
+        await status.edit_text(uk.ERRORS['general'])
+        return
+    
+    try:
+        if path.stat().st_size > MAX_UPLOAD_BYTES:
+            await status.edit_text(uk.DATA['export_too_large'])
+            return
+        
+        today = await queries.get_user_today(user_id)
+        summary = "\n".join(f"• {table}: {count}" for table, count in counts.items())
+        
+        await message.answer_document(
+            FSInputFile(path, filename=f"lifehub_{today.isoformat()}_{fmt}.zip"),
+            caption=uk.DATA['export_done'].format(summary=summary),
+            parse_mode="HTML"
+        )
+        await status.delete()
+    finally:
+        path.unlink(missing_ok=True)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                              ІМПОРТ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@router.message(Command("import"))
+async def cmd_import(message: Message, state: FSMContext):
+    """Початок імпорту — чекаємо файл."""
+    await state.set_state(DataImport.file)
+    await message.answer(
+        uk.DATA['import_prompt'].format(max_rows=importer.MAX_ROWS),
+        parse_mode="HTML",
+        reply_markup=get_cancel_keyboard()
+    )
+
+
+@router.message(DataImport.file, F.document)
+async def process_import_file(message: Message, state: FSMContext):
+    """Завантажити файл, провалідувати і вставити однією транзакцією."""
+    user_id = message.from_user.id
+    document = message.document
+    
+    if document.file_size and document.file_size > MAX_DOWNLOAD_BYTES:
+        await message.answer(uk.DATA['import_too_large'])
+        return
+    
+    suffix = Path(document.file_name or "").suffix.lower() or ".csv"
+    fd, name = tempfile.mkstemp(prefix=f"lifehub_import_{user_id}_", suffix=suffix)
+    os.close(fd)
+    path = Path(name)
+    
+    status = await message.answer(uk.DATA['import_started'])
+    started = time.perf_counter()
+    
+    try:
+        await message.bot.download(document, destination=path)
+        result, counts = await importer.import_file(user_id, path)
+    except importer.ImportFileError as e:
+        await status.edit_text(uk.DATA['import_bad_file'].format(error=html.escape(str(e))))
+        return
+    except Exception:
+        logger.exception("❌ Помилка імпорту")
+        await status.edit_text(uk.ERRORS['general'])
+        return
+    finally:
+        path.unlink(missing_ok=True)
+    
+    if result.error_count:
+        errors = "\n".join(f"• {line}: {html.escape(error)}" for line, error in result.errors)
+        await status.edit_text(
+            uk.DATA['import_errors'].format(count=result.error_count, errors=errors),
+            parse_mode="HTML"
+        )
+        return
+    
+    await state.clear()
+    
+    if counts is None:
+        await status.delete()
+        await message.answer(uk.DATA['import_empty'], reply_markup=get_main_menu())
+        return
+    
+    seconds = time.perf_counter() - started
+    await status.delete()
+    await message.answer(
+        uk.DATA['import_done'].format(
+            tasks=counts['tasks'],
+            habits=counts['habits'],
+            skipped=result.skipped,
+            projects=counts['projects'],
+            seconds=seconds,
+            rate=result.total / seconds if seconds else result.total,
+        ),
+        parse_mode="HTML",
+        reply_markup=get_main_menu()
+    )
+
+
+@router.message(DataImport.file)
+async def process_import_not_document(message: Message):
+    """Замість файлу прийшло щось інше."""
+    await message.answer(uk.DATA['import_not_document'])
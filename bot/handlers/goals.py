@@ -13,6 +13,8 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
 from bot.database import queries
+from bot.services import charts, trends
+from bot.services.stats import sparkline
 from bot.states.states import GoalCreation, GoalEntry
 from bot.keyboards import goals as kb
 from bot.keyboards.reply import get_main_menu, get_cancel_keyboard, get_skip_cancel_keyboard
@@ -26,23 +28,21 @@ router = Router()
 # ║                              КОМАНДИ                                         ║
 # ╚════════════════════════════════════════════════════════════════════════════╝
 
-@router.message(Command("goals"))
-async def cmd_goals(message: Message):
-    """Показати всі цілі (project, target, metric)."""
-    user_id = message.from_user.id
-    goals = await queries.get_all_goals(user_id, status='active')
-    
-    # Фільтруємо тільки project, target, metric (habits окремо)
-    goals = [g for g in goals if g['goal_type'] in ('project', 'target', 'metric')]
+async def render_goals_page(user_id: int, page: int = 0, after: int = None, before: int = None):
+    """
+    Текст + клавіатура однієї сторінки цілей (project, target, metric).
+    Повертає None, якщо цілей немає.
+    """
+    result = await queries.get_goals_page(user_id, after=after, before=before)
+    goals = result['items']
     
     if not goals:
-        await message.answer(
-            f"{uk.GOALS['title_all']}\n\n{uk.GOALS['empty']}",
-            parse_mode="HTML"
-        )
-        return
+        if page > 0:
+            return await render_goals_page(user_id)
+        return None
     
-    text = uk.GOALS['title_all'] + "\n\n"
+    total = await queries.count_goals(user_id)
+    text = f"{uk.GOALS['title_all']} ({total})\n\n"
     
     # Групуємо по типу
     projects = [g for g in goals if g['goal_type'] == 'project']
@@ -72,11 +72,31 @@ async def cmd_goals(message: Message):
             max_v = g.get('target_max') or '?'
             text += f"  • [{g['id']}] {g['title']} ({min_v}-{max_v})\n"
     
-    await message.answer(
-        text,
-        parse_mode="HTML",
-        reply_markup=kb.get_goals_list(goals)
+    markup = kb.get_goals_list(
+        goals,
+        page=page,
+        total=total,
+        has_prev=result['has_prev'],
+        has_next=result['has_next'],
+        per_page=queries.GOALS_PAGE_SIZE,
     )
+    return text, markup
+
+
+@router.message(Command("goals"))
+async def cmd_goals(message: Message):
+    """Показати всі цілі (project, target, metric)."""
+    rendered = await render_goals_page(message.from_user.id)
+    
+    if rendered is None:
+        await message.answer(
+            f"{uk.GOALS['title_all']}\n\n{uk.GOALS['empty']}",
+            parse_mode="HTML"
+        )
+        return
+    
+    text, markup = rendered
+    await message.answer(text, parse_mode="HTML", reply_markup=markup)
 
 
 @router.message(Command("goal_add"))
@@ -238,7 +258,7 @@ async def goal_deadline(callback: CallbackQuery, state: FSMContext):
         return
     
     deadline = None
-    today = date.today()
+    today = await queries.get_user_today(callback.from_user.id)
     
     if deadline_type == "month":
         # Кінець поточного місяця
@@ -289,7 +309,7 @@ async def goal_deadline_custom(message: Message, state: FSMContext):
                 day, month, year = parts
             else:
                 day, month = parts
-                year = date.today().year
+                year = (await queries.get_user_today(message.from_user.id)).year
             deadline = date(int(year), int(month), int(day)).isoformat()
         else:
             await message.answer(uk.ERRORS['invalid_date'])
@@ -456,6 +476,14 @@ async def callback_goal_view(callback: CallbackQuery):
         max_v = goal.get('target_max') or '?'
         text += f"📊 Діапазон: {min_v}-{max_v}\n"
     
+    if goal['goal_type'] == 'project':
+        rollup = await queries.get_goal_rollup(goal_id, user_id)
+        if rollup['goals'] or rollup['tasks']:
+            text += (
+                f"🌳 Вкладені цілі: {rollup['goals_completed']}/{rollup['goals']}"
+                f" · задачі: {rollup['tasks_done']}/{rollup['tasks']}\n"
+            )
+    
     if goal.get('description'):
         text += f"\n📝 {goal['description']}\n"
     
@@ -473,7 +501,35 @@ async def callback_goal_view(callback: CallbackQuery):
 @router.callback_query(F.data == "goals:list")
 async def callback_goals_list(callback: CallbackQuery):
     """Повернутись до списку цілей."""
-    await cmd_goals(callback.message)
+    rendered = await render_goals_page(callback.from_user.id)
+    
+    if rendered is None:
+        await callback.message.edit_text(
+            f"{uk.GOALS['title_all']}\n\n{uk.GOALS['empty']}",
+            parse_mode="HTML"
+        )
+    else:
+        text, markup = rendered
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("goals:pg:"))
+async def callback_goals_page(callback: CallbackQuery):
+    """Пагінація цілей: goals:pg:{n|p}:{page}:{id}."""
+    _, _, direction, page, goal_id = callback.data.split(":")
+    user_id = callback.from_user.id
+    
+    if direction == "p":
+        rendered = await render_goals_page(user_id, max(int(page), 0), before=int(goal_id))
+    else:
+        rendered = await render_goals_page(user_id, int(page), after=int(goal_id))
+    
+    if rendered is None:
+        await callback.message.edit_text(uk.GOALS['empty'])
+    else:
+        text, markup = rendered
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
     await callback.answer()
 
 
@@ -568,14 +624,14 @@ async def callback_goal_tasks(callback: CallbackQuery):
     goal_id = int(callback.data.split(":")[-1])
     user_id = callback.from_user.id
     
-    tasks = await queries.get_tasks_by_goal(goal_id, user_id)
-    goal = await queries.get_goal_by_id(goal_id, user_id)
+    tree = await queries.get_goal_tree(goal_id, user_id)
     
-    if not tasks:
+    if not tree or not tree['tasks']:
         await callback.answer("📭 Задач у проєкті немає", show_alert=True)
         return
     
-    text = f"📁 <b>{goal['title']}</b>\n\n📋 Задачі:\n"
+    tasks = tree['tasks']
+    text = f"📁 <b>{tree['title']}</b>\n\n📋 Задачі:\n"
     
     for task in tasks:
         status = "✅" if task['is_completed'] else "⬜"
@@ -590,30 +646,125 @@ async def callback_goal_tasks(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("goal:children:"))
 async def callback_goal_children(callback: CallbackQuery):
-    """Показати дочірні цілі проєкту."""
+    """Показати все дерево проєкту (вкладені цілі + кількість задач)."""
     goal_id = int(callback.data.split(":")[-1])
     user_id = callback.from_user.id
     
-    children = await queries.get_child_goals(goal_id, user_id)
-    goal = await queries.get_goal_by_id(goal_id, user_id)
+    tree = await queries.get_goal_tree(goal_id, user_id)
     
-    if not children:
+    if not tree or not tree['children']:
         await callback.answer("📭 Дочірніх цілей немає", show_alert=True)
         return
     
-    text = f"📁 <b>{goal['title']}</b>\n\n🎯 Дочірні цілі:\n"
+    text = f"📁 <b>{tree['title']}</b>\n\n🎯 Дочірні цілі:\n"
     
     type_emojis = {'project': '📁', 'habit': '✅', 'target': '🎯', 'metric': '📊'}
     
-    for child in children:
-        emoji = type_emojis.get(child['goal_type'], '🎯')
-        progress = child.get('progress', 0)
-        text += f"  {emoji} [{child['id']}] {child['title']} — {progress}%\n"
+    for node, depth in queries.iter_goal_tree(tree):
+        if depth == 0:
+            continue
+        emoji = type_emojis.get(node['goal_type'], '🎯')
+        indent = "  " * depth
+        tasks_str = ""
+        if node['tasks']:
+            done = sum(1 for t in node['tasks'] if t['is_completed'])
+            tasks_str = f" · 📋 {done}/{len(node['tasks'])}"
+        text += f"{indent}{emoji} [{node['id']}] {node['title']} — {node['progress']}%{tasks_str}\n"
     
     await callback.message.edit_text(text, parse_mode="HTML")
     await callback.answer()
 
 
+def _format_trend(goal: dict, trend: dict) -> str:
+    """Текст тренду (для повідомлення і caption графіка)."""
+    lines = [uk.GOALS['trend_title'].format(
+        title=goal['title'],
+        period=uk.GOALS['trend_periods'][trend['period']]
+    ), ""]
+    
+    if not trend['values']:
+        lines.append(uk.GOALS['trend_empty'])
+        return "\n".join(lines)
+    
+    # Sparkline по ковзному середньому (зсув на мінімум — для метрик як вага)
+    base = min(trend['rolling'])
+    scaled = [int((v - base) * 100) for v in trend['rolling']]
+    lines.append(uk.GOALS['trend_chart'].format(
+        chart=sparkline(scaled),
+        first=trend['labels'][0],
+        last=trend['labels'][-1],
+    ))
+    lines.append("")
+    
+    if trend['goal_type'] == 'metric':
+        lines.append(uk.GOALS['trend_metric'].format(
+            last=trend['last'], low=min(trend['min']), high=max(trend['max'])
+        ))
+        if trend['in_band_pct'] is not None:
+            low, high = trend['band']
+            lines.append(uk.GOALS['trend_band'].format(
+                band=f"{low if low is not None else '?'}–{high if high is not None else '?'}",
+                in_band=trend['in_band_pct']
+            ))
+    else:
+        lines.append(uk.GOALS['trend_target'].format(
+            total=round(sum(trend['values']), 2), remaining=trend['remaining']
+        ))
+    
+    if trend['slope_per_week'] is not None:
+        lines.append(uk.GOALS['trend_pace'].format(slope=trend['slope_per_week']))
+    if trend.get('days_to_band'):
+        lines.append(uk.GOALS['trend_eta_band'].format(days=trend['days_to_band']))
+    if trend.get('days_to_target'):
+        lines.append(uk.GOALS['trend_eta_target'].format(days=trend['days_to_target']))
+    
+    return "\n".join(lines)
+
+
+@router.callback_query(F.data.startswith("goal:history:"))
+async def callback_goal_history(callback: CallbackQuery):
+    """Тренд Target / Metric: goal:history:{id}[:{period}]."""
+    parts = callback.data.split(":")
+    goal_id = int(parts[2])
+    period = parts[3] if len(parts) > 3 else 'quarter'
+    user_id = callback.from_user.id
+    
+    goal = await queries.get_goal_by_id(goal_id, user_id)
+    trend = await trends.get_goal_trend(goal_id, user_id, period)
+    
+    if not goal or trend is None:
+        await callback.answer("❌ Ціль не знайдено", show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        _format_trend(goal, trend),
+        parse_mode="HTML",
+        reply_markup=kb.get_trend_keyboard(goal_id, trend['period'])
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("goal:chart:"))
+async def callback_goal_chart(callback: CallbackQuery):
+    """Графік тренду фото: goal:chart:{id}:{period}."""
+    _, _, goal_id, period = callback.data.split(":")
+    goal_id = int(goal_id)
+    user_id = callback.from_user.id
+    
+    goal = await queries.get_goal_by_id(goal_id, user_id)
+    trend = await trends.get_goal_trend(goal_id, user_id, period)
+    
+    if not goal or trend is None:
+        await callback.answer("❌ Ціль не знайдено", show_alert=True)
+        return
+    if not trend['values']:
+        await callback.answer(uk.GOALS['trend_empty'], show_alert=True)
+        return
+    
+    await callback.answer()
+    await charts.send_chart(callback.message, charts.trend_spec(trend), _format_trend(goal, trend))
+
+
 @router.callback_query(F.data.startswith("goals:header:"))
 async def callback_goals_header(callback: CallbackQuery):
     """Ігноруємо кліки на заголовки."""
@@ -11,13 +11,13 @@ Streak правила:
 - Пропуск без логу — streak = 0
 """
 
-from datetime import date
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
 from bot.database import queries
+from bot.services import charts
 from bot.states.states import HabitCreation
 from bot.keyboards import habits as kb
 from bot.keyboards.reply import get_main_menu, get_cancel_keyboard
@@ -44,7 +44,7 @@ async def cmd_habits(message: Message):
         )
         return
     
-    today = date.today()
+    today = await queries.get_user_today(user_id)
     weekday = uk.TODAY['weekdays'][today.isoweekday() - 1]
     
     text = f"{uk.HABITS['title_today']} ({weekday})\n\n"
@@ -411,16 +411,7 @@ async def callback_habit_undone(callback: CallbackQuery):
     user_id = callback.from_user.id
     
     # Видаляємо лог за сьогодні
-    db = await queries.get_db()
-    try:
-        today = date.today().isoformat()
-        await db.execute(
-            "DELETE FROM habit_logs WHERE goal_id = ? AND user_id = ? AND date = ?",
-            (habit_id, user_id, today)
-        )
-        await db.commit()
-    finally:
-        await db.close()
+    await queries.unlog_habit(habit_id, user_id)
     
     await callback.answer("↩️ Скасовано")
     await cmd_habits(callback.message)
@@ -473,6 +464,29 @@ async def callback_habit_stats(callback: CallbackQuery):
     await callback.answer()
 
 
+@router.callback_query(F.data.startswith("habit:heatmap:"))
+async def callback_habit_heatmap(callback: CallbackQuery):
+    """Heatmap звички за рік (фото)."""
+    habit_id = int(callback.data.split(":")[-1])
+    user_id = callback.from_user.id
+    
+    habit = await queries.get_goal_by_id(habit_id, user_id)
+    if not habit:
+        await callback.answer("❌ Звичку не знайдено", show_alert=True)
+        return
+    
+    await callback.answer()
+    
+    spec = await charts.heatmap_spec(habit_id, user_id)
+    caption = uk.HABITS['heatmap_caption'].format(
+        title=habit['title'],
+        done=spec['days'].count('d'),
+        skipped=spec['days'].count('s'),
+        missed=spec['days'].count('m'),
+    )
+    await charts.send_chart(callback.message, spec, caption)
+
+
 @router.callback_query(F.data.startswith("habit:delete:"))
 async def callback_habit_delete(callback: CallbackQuery):
     """Підтвердження видалення."""
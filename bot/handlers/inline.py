@@ -0,0 +1,141 @@
+"""
+Обробники inline-режиму.
+LifeHub Bot v4.0
+
+@бот <текст> у будь-якому чаті:
+- "➕ На сьогодні" / "📥 У вхідні" — нова задача з текстом запиту
+- відкриті пункти на сьогодні, що містять текст — виконати
+- недавні назви задач — додати ще раз на сьогодні
+
+Відповідь будується з індексу в пам'яті (services.suggestions).
+Дія виконується в chosen_inline_result — у @BotFather потрібно
+увімкнути /setinline і /setinlinefeedback (100%).
+"""
+
+import html
+import logging
+
+from aiogram import Router
+from aiogram.types import (
+    InlineQuery,
+    ChosenInlineResult,
+    InlineQueryResultArticle,
+    InlineQueryResultsButton,
+    InputTextMessageContent,
+)
+
+from bot.database import queries
+from bot.services import suggestions
+from bot.locales import uk
+
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Скільки секунд Telegram може віддавати кешовану відповідь (тільки цьому користувачу)
+INLINE_CACHE_TIME = 10
+
+# Ліміт Bot API на кількість результатів
+INLINE_MAX_RESULTS = 50
+
+
+def _article(result_id: str, title: str, description: str, message: str) -> InlineQueryResultArticle:
+    return InlineQueryResultArticle(
+        id=result_id,
+        title=title,
+        description=description,
+        input_message_content=InputTextMessageContent(message_text=message),
+    )
+
+
+@router.inline_query()
+async def inline_query(query: InlineQuery):
+    """Підказки з індексу — без звернень до БД."""
+    index = await suggestions.get_index(query.from_user.id)
+    text = query.query.strip()
+    title = html.escape(text)
+    results = []
+
+    if text:
+        results.append(_article(
+            "add:today",
+            uk.INLINE['add_today'].format(title=text),
+            uk.INLINE['add_hint'],
+            uk.INLINE['message_added_today'].format(title=title),
+        ))
+        results.append(_article(
+            "add:inbox",
+            uk.INLINE['add_inbox'].format(title=text),
+            uk.INLINE['add_hint'],
+            uk.INLINE['message_added_inbox'].format(title=title),
+        ))
+
+    open_items, recent = index.match(text, INLINE_MAX_RESULTS - len(results))
+
+    for item in open_items:
+        hint = uk.INLINE['done_hint'][item.kind]
+        results.append(_article(
+            f"done:{item.kind}:{item.id}",
+            uk.INLINE['done_title'].format(title=item.title),
+            f"{item.time} · {hint}" if item.time else hint,
+            uk.INLINE['message_done'].format(title=html.escape(item.title)),
+        ))
+
+    for item in recent:
+        results.append(_article(
+            f"recent:{item.id}",
+            uk.INLINE['add_today'].format(title=item.title),
+            uk.INLINE['recent_hint'],
+            uk.INLINE['message_added_today'].format(title=html.escape(item.title)),
+        ))
+
+    await query.answer(
+        results,
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=True,
+        button=InlineQueryResultsButton(text=uk.INLINE['button'], start_parameter="inline"),
+    )
+
+
+@router.chosen_inline_result()
+async def inline_chosen(chosen: ChosenInlineResult):
+    """Виконати вибрану дію (потрібен /setinlinefeedback)."""
+    user_id = chosen.from_user.id
+    action, _, rest = chosen.result_id.partition(":")
+
+    if action == "add":
+        title = chosen.query.strip()
+        if not title:
+            return
+        deadline = None
+        if rest == "today":
+            deadline = (await queries.get_user_today(user_id)).isoformat()
+        await queries.create_task(user_id, title, deadline=deadline)
+
+    elif action == "recent":
+        task = await queries.get_task_by_id(int(rest), user_id)
+        if not task:
+            return
+        await queries.create_task(
+            user_id,
+            task['title'],
+            description=task.get('description'),
+            priority=task.get('priority', 2),
+            deadline=(await queries.get_user_today(user_id)).isoformat(),
+            estimated_minutes=task.get('estimated_minutes'),
+            goal_id=task.get('goal_id'),
+        )
+
+    elif action == "done":
+        kind, _, item_id = rest.partition(":")
+        item_id = int(item_id)
+        if kind == "task":
+            await queries.complete_task(item_id, user_id)
+        elif kind == "recurring":
+            await queries.get_or_create_occurrence(item_id, user_id)
+            await queries.complete_occurrence(item_id, user_id)
+        elif kind == "habit":
+            await queries.log_habit(item_id, user_id, 'done')
+
+    else:
+        logger.warning(f"⚠️ Невідомий inline-результат: {chosen.result_id}")
@@ -0,0 +1,106 @@
+"""
+Обробники повнотекстового пошуку.
+LifeHub Bot v4.0
+
+/search <запит> — задачі, цілі, звички, нотатки occurrences і логів звичок.
+Слова від 3 літер — префікси: "прог англ" знайде "Програмування англійською".
+"""
+
+import html
+
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+
+from bot.database import queries
+from bot.keyboards import search as kb
+from bot.locales import uk
+
+
+router = Router()
+
+
+def _format_snippet(snippet: str) -> str:
+    """Snippet з маркерами → безпечний HTML з <b> на збігах."""
+    return (
+        html.escape(snippet)
+        .replace(queries.SEARCH_MARK_START, "<b>")
+        .replace(queries.SEARCH_MARK_END, "</b>")
+    )
+
+
+async def render_search_page(user_id: int, text: str, page: int = 0):
+    """Текст + клавіатура сторінки результатів. None — нічого не знайдено."""
+    result = await queries.search(user_id, text, page=page)
+    items = result['items']
+    
+    if not items:
+        return None
+    
+    lines = [uk.SEARCH['title'].format(query=html.escape(text)), ""]
+    start = page * queries.SEARCH_PAGE_SIZE
+    
+    for number, item in enumerate(items, start=start + 1):
+        # Для задач і цілей назва в індексі — з підсвіткою збігів
+        if item.get('title_hl'):
+            title = _format_snippet(item['title_hl'])
+        else:
+            title = html.escape(item.get('title') or '')
+        date_str = f" · {item['date']}" if item.get('date') else ""
+        lines.append(f"{number}. {kb.result_icon(item)} {title}{date_str}")
+        
+        # Опис / нотатка — тільки якщо збіг саме там
+        snippet = item.get('snippet') or ''
+        if queries.SEARCH_MARK_START in snippet:
+            lines.append(f"    <i>{_format_snippet(snippet)}</i>")
+    
+    markup = kb.get_search_results(items, page=page, has_more=result['has_more'])
+    return "\n".join(lines), markup
+
+
+@router.message(Command("search"))
+async def cmd_search(message: Message, command: CommandObject, state: FSMContext):
+    """Пошук: /search <запит>."""
+    text = (command.args or "").strip()
+    
+    if not text:
+        await message.answer(uk.SEARCH['usage'], parse_mode="HTML")
+        return
+    
+    # Запит для гортання — в FSM data (callback_data обмежена 64 байтами)
+    await state.update_data(search_query=text)
+    
+    rendered = await render_search_page(message.from_user.id, text)
+    if rendered is None:
+        await message.answer(uk.SEARCH['empty'].format(query=html.escape(text)), parse_mode="HTML")
+        return
+    
+    page_text, markup = rendered
+    await message.answer(page_text, parse_mode="HTML", reply_markup=markup)
+
+
+@router.callback_query(F.data.startswith("search:pg:"))
+async def callback_search_page(callback: CallbackQuery, state: FSMContext):
+    """Гортання результатів пошуку."""
+    page_str = callback.data.split(":")[-1]
+    
+    if page_str == "current":
+        await callback.answer()
+        return
+    
+    data = await state.get_data()
+    text = data.get('search_query')
+    
+    if not text:
+        await callback.answer(uk.SEARCH['expired'], show_alert=True)
+        return
+    
+    rendered = await render_search_page(callback.from_user.id, text, page=max(int(page_str), 0))
+    if rendered is None:
+        await callback.answer(uk.SEARCH['expired'], show_alert=True)
+        return
+    
+    page_text, markup = rendered
+    await callback.message.edit_text(page_text, parse_mode="HTML", reply_markup=markup)
+    await callback.answer()
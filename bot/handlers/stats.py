@@ -0,0 +1,71 @@
+"""
+Обробник /stats — історія за тиждень / місяць / рік.
+LifeHub Bot v4.0
+
+Дані з daily_stats (знімок кожного дня після опівночі),
+поточний день рахується наживо.
+"""
+
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery
+from aiogram.filters import Command
+
+from bot.services import stats as stats_service
+from bot.keyboards import stats as kb
+from bot.locales import uk
+
+
+router = Router()
+
+
+async def _format_stats(user_id: int, period: str) -> str:
+    """Текст статистики за період."""
+    data = await stats_service.get_period_stats(user_id, period)
+    totals = data['totals']
+    
+    values = [value for _, value in data['series']]
+    first_label = data['series'][0][0] if data['series'] else ''
+    last_label = data['series'][-1][0] if data['series'] else ''
+    
+    return uk.STATS['template'].format(
+        period=uk.STATS['periods'].get(period, period),
+        tasks_completed=totals['tasks_completed'],
+        occurrences_done=totals['occurrences_done'],
+        occurrences_skipped=totals['occurrences_skipped'],
+        occurrences_missed=totals['occurrences_missed'],
+        habits_done=totals['habits_done'],
+        habits_skipped=totals['habits_skipped'],
+        habits_missed=totals['habits_missed'],
+        goal_entries=totals['goal_entries'],
+        chart=stats_service.sparkline(values),
+        first=first_label,
+        last=last_label,
+    )
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: Message):
+    """Статистика за тиждень."""
+    text = await _format_stats(message.from_user.id, 'week')
+    await message.answer(
+        text,
+        parse_mode="HTML",
+        reply_markup=kb.get_period_keyboard('week')
+    )
+
+
+@router.callback_query(F.data.startswith("stats:period:"))
+async def callback_stats_period(callback: CallbackQuery):
+    """Змінити період."""
+    period = callback.data.replace("stats:period:", "")
+    if period not in stats_service.PERIODS:
+        await callback.answer()
+        return
+    
+    text = await _format_stats(callback.from_user.id, period)
+    await callback.message.edit_text(
+        text,
+        parse_mode="HTML",
+        reply_markup=kb.get_period_keyboard(period)
+    )
+    await callback.answer()
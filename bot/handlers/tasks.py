@@ -23,88 +23,115 @@ router = Router()
 # ║                              КОМАНДИ                                         ║
 # ╚════════════════════════════════════════════════════════════════════════════╝
 
+async def render_tasks_page(
+    user_id: int,
+    view: str = 'today',
+    page: int = 0,
+    after: tuple = None,
+    before: tuple = None,
+):
+    """
+    Текст + клавіатура однієї сторінки задач.
+    З БД читається тільки сторінка (keyset) і кешований лічильник.
+    Повертає None, якщо список порожній.
+    """
+    result = await queries.get_tasks_page(user_id, view, after=after, before=before)
+    tasks = result['items']
+    
+    if not tasks:
+        if page > 0:
+            # Сторінка спорожніла (задачі виконані/видалені) — на початок
+            return await render_tasks_page(user_id, view)
+        return None
+    
+    total = await queries.count_tasks(user_id, view)
+    
+    if view == 'today':
+        text = f"{uk.TASKS['title_today']} ({total})\n\n"
+        today = await queries.get_user_today(user_id)
+        
+        # Групуємо по пріоритету (в межах сторінки)
+        priority_groups = {0: [], 1: [], 2: [], 3: []}
+        for task in tasks:
+            p = task.get('priority', 2)
+            priority_groups[p].append(task)
+        
+        priority_labels = [
+            ("🔴 Терміново:", 0),
+            ("🟠 Високий:", 1),
+            ("🟡 Середній:", 2),
+            ("🟢 Низький:", 3),
+        ]
+        
+        for label, priority in priority_labels:
+            group_tasks = priority_groups[priority]
+            if group_tasks:
+                text += f"\n<b>{label}</b>\n"
+                for t in group_tasks:
+                    status = "✅" if t['is_completed'] else "•"
+                    deadline_str = ""
+                    if t.get('scheduled_time'):
+                        deadline_str = f" — {t['scheduled_time']}"
+                    elif t.get('deadline'):
+                        d = date.fromisoformat(t['deadline'])
+                        if d < today:
+                            deadline_str = " ⚠️ прострочено"
+                    
+                    goal_str = ""
+                    if t.get('goal_title'):
+                        goal_str = f" → 📁 {t['goal_title']}"
+                    
+                    text += f"  {status} [{t['id']}] {t['title']}{deadline_str}{goal_str}\n"
+    else:
+        title = uk.TASKS['title_inbox'] if view == 'inbox' else uk.TASKS['title_all']
+        text = f"{title} ({total})\n\n"
+        
+        for task in tasks:
+            text += f"• [{task['id']}] {task['title']}\n"
+        
+        if view == 'inbox':
+            text += "\n<i>Ці задачі потребують планування: дедлайн або прив'язка до проєкту.</i>"
+    
+    markup = kb.get_tasks_list(
+        tasks,
+        view=view,
+        page=page,
+        total=total,
+        prev_cursor=queries.task_cursor(tasks[0]) if result['has_prev'] else None,
+        next_cursor=queries.task_cursor(tasks[-1]) if result['has_next'] else None,
+        per_page=queries.TASKS_PAGE_SIZE,
+    )
+    return text, markup
+
+
 @router.message(Command("tasks"))
 async def cmd_tasks(message: Message):
     """Показати задачі на сьогодні."""
-    user_id = message.from_user.id
-    tasks = await queries.get_tasks_today(user_id)
+    rendered = await render_tasks_page(message.from_user.id, 'today')
     
-    if not tasks:
+    if rendered is None:
         text = f"{uk.TASKS['title_today']}\n\n{uk.TASKS['empty']}"
         await message.answer(text, parse_mode="HTML")
         return
     
-    text = uk.TASKS['title_today'] + "\n\n"
-    
-    # Групуємо по пріоритету
-    priority_groups = {0: [], 1: [], 2: [], 3: []}
-    for task in tasks:
-        p = task.get('priority', 2)
-        priority_groups[p].append(task)
-    
-    priority_labels = [
-        ("🔴 Терміново:", 0),
-        ("🟠 Високий:", 1),
-        ("🟡 Середній:", 2),
-        ("🟢 Низький:", 3),
-    ]
-    
-    for label, priority in priority_labels:
-        group_tasks = priority_groups[priority]
-        if group_tasks:
-            text += f"\n<b>{label}</b>\n"
-            for t in group_tasks:
-                status = "✅" if t['is_completed'] else "•"
-                deadline_str = ""
-                if t.get('scheduled_time'):
-                    deadline_str = f" — {t['scheduled_time']}"
-                elif t.get('deadline'):
-                    d = date.fromisoformat(t['deadline'])
-                    if d < date.today():
-                        deadline_str = " ⚠️ прострочено"
-                
-                goal_str = ""
-                if t.get('goal_title'):
-                    goal_str = f" → 📁 {t['goal_title']}"
-                
-                text += f"  {status} [{t['id']}] {t['title']}{deadline_str}{goal_str}\n"
-    
-    done = sum(1 for t in tasks if t['is_completed'])
-    total = len(tasks)
-    text += f"\n{uk.TASKS['completed_count'].format(done=done, total=total)}"
-    
-    await message.answer(
-        text,
-        parse_mode="HTML",
-        reply_markup=kb.get_tasks_list(tasks)
-    )
+    text, markup = rendered
+    await message.answer(text, parse_mode="HTML", reply_markup=markup)
 
 
 @router.message(Command("inbox"))
 async def cmd_inbox(message: Message):
     """Показати inbox (задачі без дедлайну і проєкту)."""
-    user_id = message.from_user.id
-    tasks = await queries.get_tasks_inbox(user_id)
+    rendered = await render_tasks_page(message.from_user.id, 'inbox')
     
-    if not tasks:
+    if rendered is None:
         await message.answer(
             f"{uk.TASKS['title_inbox']}\n\n{uk.TASKS['empty_inbox']}",
             parse_mode="HTML"
         )
         return
     
-    text = f"{uk.TASKS['title_inbox']} ({len(tasks)})\n\n"
-    
-    for task in tasks:
-        text += f"• [{task['id']}] {task['title']}\n"
-    
-    text += "\n<i>Ці задачі потребують планування: дедлайн або прив'язка до проєкту.</i>"
-    
-    await message.answer(
-        text,
-        parse_mode="HTML",
-        reply_markup=kb.get_tasks_list(tasks)
-    )
+    text, markup = rendered
+    await message.answer(text, parse_mode="HTML", reply_markup=markup)
 
 
 @router.message(Command("task_add"))
@@ -167,12 +194,13 @@ async def task_deadline(callback: CallbackQuery, state: FSMContext):
         return
     
     deadline = None
+    today = await queries.get_user_today(callback.from_user.id)
     if deadline_type == "today":
-        deadline = date.today().isoformat()
+        deadline = today.isoformat()
     elif deadline_type == "tomorrow":
-        deadline = (date.today() + timedelta(days=1)).isoformat()
+        deadline = (today + timedelta(days=1)).isoformat()
     elif deadline_type == "week":
-        deadline = (date.today() + timedelta(days=7)).isoformat()
+        deadline = (today + timedelta(days=7)).isoformat()
     
     await state.update_data(deadline=deadline)
     await state.set_state(TaskCreation.time)
@@ -194,7 +222,7 @@ async def task_deadline_custom(message: Message, state: FSMContext):
             parts = text.split(".")
             if len(parts) == 2:
                 day, month = parts
-                year = date.today().year
+                year = (await queries.get_user_today(message.from_user.id)).year
             else:
                 day, month, year = parts
             
@@ -535,20 +563,36 @@ async def callback_task_delete_confirm(callback: CallbackQuery):
         await callback.answer("❌ Помилка", show_alert=True)
 
 
-@router.callback_query(F.data.startswith("tasks:page:"))
+@router.callback_query(F.data.startswith("tasks:pg:"))
 async def callback_tasks_page(callback: CallbackQuery):
-    """Пагінація списку задач."""
-    page_str = callback.data.split(":")[-1]
+    """Пагінація списку задач (keyset-курсор у callback_data)."""
+    try:
+        view, direction, page, cursor = kb.parse_task_page_callback(callback.data)
+    except ValueError:
+        await callback.answer()
+        return
     
-    if page_str == "current":
+    if view not in queries.TASK_VIEWS:
         await callback.answer()
         return
     
-    page = int(page_str)
     user_id = callback.from_user.id
-    tasks = await queries.get_tasks_today(user_id)
+    if direction == "p":
+        rendered = await render_tasks_page(user_id, view, max(page, 0), before=cursor)
+    else:
+        rendered = await render_tasks_page(user_id, view, page, after=cursor)
     
-    await callback.message.edit_reply_markup(
-        reply_markup=kb.get_tasks_list(tasks, page=page)
-    )
+    if rendered is None:
+        await callback.message.edit_text(uk.TASKS['empty'])
+        await callback.answer()
+        return
+    
+    text, markup = rendered
+    await callback.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("tasks:page:"))
+async def callback_tasks_page_legacy(callback: CallbackQuery):
+    """Індикатор сторінки і кнопки зі старих повідомлень (tasks:page:N) — без дії."""
     await callback.answer()
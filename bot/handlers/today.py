@@ -41,7 +41,7 @@ async def cmd_today(message: Message, sort_mode: str = 'time'):
     
     schedule = await queries.get_today_schedule(user_id)
     
-    today = date.today()
+    today = date.fromisoformat(schedule['date'])
     weekday = uk.TODAY['weekdays'][today.isoweekday() - 1]
     date_str = today.strftime("%d.%m")
     
@@ -281,16 +281,7 @@ async def callback_recurring_undone(callback: CallbackQuery):
     task_id = int(callback.data.split(":")[-1])
     user_id = callback.from_user.id
     
-    db = await queries.get_db()
-    try:
-        today = date.today().isoformat()
-        await db.execute(
-            "UPDATE task_occurrences SET status = 'pending', completed_at = NULL WHERE task_id = ? AND date = ?",
-            (task_id, today)
-        )
-        await db.commit()
-    finally:
-        await db.close()
+    await queries.uncomplete_occurrence(task_id, user_id)
     
     await callback.answer("↩️ Скасовано")
     await cmd_today(callback.message)
@@ -331,6 +322,7 @@ async def callback_recurring_stats(callback: CallbackQuery):
 • Всього: {stats['total']} разів
 • Виконано: {stats['done']}
 • Пропущено: {stats['skipped']}
+• Не виконано: {stats['missed']}
 • Успішність: {stats['success_rate']}%
 """
     
@@ -349,7 +341,7 @@ async def send_morning_review(user_id: int, bot) -> None:
     """
     schedule = await queries.get_today_schedule(user_id)
     
-    today = date.today()
+    today = date.fromisoformat(schedule['date'])
     weekday = uk.TODAY['weekdays'][today.isoweekday() - 1]
     
     text = f"🌅 <b>Доброго ранку!</b> Ось твій {weekday}:\n\n"
@@ -0,0 +1,241 @@
+"""
+Обробники словника: додавання слів і повторення за SM-2.
+LifeHub Bot v4.0
+
+/words    — скільки слів і скільки до повторення
+/word_add — нове слово (слово → переклад → приклад)
+/learn    — сесія повторення (services/srs.py)
+
+Картка: слово → "Показати переклад" → оцінка → наступна картка.
+Оцінки пишуться в БД пакетом при завершенні сесії.
+"""
+
+import html
+
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+
+from bot.database import queries
+from bot.services import srs
+from bot.states.states import WordCreation
+from bot.keyboards import words as kb
+from bot.keyboards.reply import get_main_menu, get_cancel_keyboard, get_skip_cancel_keyboard
+from bot.locales import uk
+
+
+router = Router()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                              КОМАНДИ                                         ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+@router.message(Command("words"))
+async def cmd_words(message: Message):
+    """Словник: кількість слів і черга на сьогодні."""
+    user_id = message.from_user.id
+    today = await queries.get_user_today(user_id)
+    stats = await queries.get_words_stats(user_id, today)
+    
+    if not stats['total']:
+        await message.answer(uk.WORDS['empty'], parse_mode="HTML", reply_markup=kb.get_words_menu(0))
+        return
+    
+    await message.answer(
+        uk.WORDS['title'].format(**stats),
+        parse_mode="HTML",
+        reply_markup=kb.get_words_menu(stats['due'])
+    )
+
+
+@router.message(Command("word_add"))
+async def cmd_word_add(message: Message, state: FSMContext):
+    """Почати додавання слова."""
+    await state.clear()
+    await state.set_state(WordCreation.word)
+    await message.answer(uk.WORDS['create_word'], reply_markup=get_cancel_keyboard())
+
+
+@router.callback_query(F.data == "words:add")
+async def callback_word_add(callback: CallbackQuery, state: FSMContext):
+    """Додати слово через inline."""
+    await state.clear()
+    await state.set_state(WordCreation.word)
+    await callback.message.answer(uk.WORDS['create_word'], reply_markup=get_cancel_keyboard())
+    await callback.answer()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                         ДІАЛОГ СТВОРЕННЯ                                     ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+@router.message(WordCreation.word)
+async def word_word(message: Message, state: FSMContext):
+    """Отримуємо слово."""
+    if message.text == "❌ Скасувати":
+        await state.clear()
+        await message.answer(uk.CANCELLED, reply_markup=get_main_menu())
+        return
+    
+    await state.update_data(word=message.text.strip())
+    await state.set_state(WordCreation.translation)
+    await message.answer(
+        uk.WORDS['create_translation'].format(word=html.escape(message.text.strip())),
+        parse_mode="HTML"
+    )
+
+
+@router.message(WordCreation.translation)
+async def word_translation(message: Message, state: FSMContext):
+    """Отримуємо переклад."""
+    if message.text == "❌ Скасувати":
+        await state.clear()
+        await message.answer(uk.CANCELLED, reply_markup=get_main_menu())
+        return
+    
+    await state.update_data(translation=message.text.strip())
+    await state.set_state(WordCreation.example)
+    await message.answer(uk.WORDS['create_example'], reply_markup=get_skip_cancel_keyboard())
+
+
+@router.message(WordCreation.example)
+async def word_example(message: Message, state: FSMContext):
+    """Отримуємо приклад і зберігаємо слово."""
+    if message.text == "❌ Скасувати":
+        await state.clear()
+        await message.answer(uk.CANCELLED, reply_markup=get_main_menu())
+        return
+    
+    example = None if message.text == "⏭ Пропустити" else message.text.strip()
+    data = await state.get_data()
+    await state.clear()
+    
+    await queries.create_word(
+        message.from_user.id,
+        data['word'],
+        data['translation'],
+        example=example,
+    )
+    
+    await message.answer(
+        uk.WORDS['created'].format(
+            word=html.escape(data['word']),
+            translation=html.escape(data['translation'])
+        ),
+        parse_mode="HTML",
+        reply_markup=get_main_menu()
+    )
+
+
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                             ПОВТОРЕННЯ                                       ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+def _card_front(card: dict, session: srs.ReviewSession) -> str:
+    text = uk.WORDS['card_front'].format(word=html.escape(card['word']))
+    if session.reviewed:
+        text += uk.WORDS['card_progress'].format(reviewed=session.reviewed)
+    return text
+
+
+def _card_back(card: dict) -> str:
+    text = uk.WORDS['card_back'].format(
+        word=html.escape(card['word']),
+        translation=html.escape(card['translation'])
+    )
+    if card.get('example'):
+        text += uk.WORDS['card_example'].format(example=html.escape(card['example']))
+    return text
+
+
+def _session_summary(summary: dict) -> str:
+    if not summary or not summary['reviewed']:
+        return uk.WORDS['nothing_due']
+    return uk.WORDS['session_done'].format(**summary)
+
+
+async def _start_learning(message: Message, user_id: int) -> None:
+    """Нова сесія і перша картка."""
+    session = await srs.start_session(user_id)
+    card = await session.current()
+    
+    if card is None:
+        await srs.finish_session(user_id)
+        await message.answer(uk.WORDS['nothing_due'])
+        return
+    
+    await message.answer(
+        _card_front(card, session),
+        parse_mode="HTML",
+        reply_markup=kb.get_card_front(card['id'])
+    )
+
+
+@router.message(Command("learn"))
+async def cmd_learn(message: Message, state: FSMContext):
+    """Почати сесію повторення."""
+    await state.clear()
+    await _start_learning(message, message.from_user.id)
+
+
+@router.callback_query(F.data == "words:learn")
+async def callback_learn(callback: CallbackQuery, state: FSMContext):
+    """Почати сесію повторення з меню словника."""
+    await state.clear()
+    await callback.answer()
+    await _start_learning(callback.message, callback.from_user.id)
+
+
+@router.callback_query(F.data.startswith("words:show:"))
+async def callback_show(callback: CallbackQuery):
+    """Перевернути картку."""
+    word_id = int(callback.data.split(":")[-1])
+    session = srs.get_session(callback.from_user.id)
+    card = await session.current() if session else None
+    
+    if card is None or card['id'] != word_id:
+        await callback.answer(uk.WORDS['session_expired'], show_alert=True)
+        return
+    
+    await callback.message.edit_text(
+        _card_back(card),
+        parse_mode="HTML",
+        reply_markup=kb.get_card_rating(word_id)
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("words:rate:"))
+async def callback_rate(callback: CallbackQuery):
+    """Оцінка картки → наступна картка (з пам'яті, без звернення до БД)."""
+    _, _, word_id, quality = callback.data.split(":")
+    user_id = callback.from_user.id
+    session = srs.get_session(user_id)
+    
+    if session is None or not await session.answer(int(word_id), int(quality)):
+        await callback.answer(uk.WORDS['session_expired'], show_alert=True)
+        return
+    
+    card = await session.current()
+    if card is None:
+        summary = await srs.finish_session(user_id)
+        await callback.message.edit_text(_session_summary(summary), parse_mode="HTML")
+        await callback.answer()
+        return
+    
+    await callback.message.edit_text(
+        _card_front(card, session),
+        parse_mode="HTML",
+        reply_markup=kb.get_card_front(card['id'])
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data == "words:stop")
+async def callback_stop(callback: CallbackQuery):
+    """Завершити сесію (відповіді записуються в БД)."""
+    summary = await srs.finish_session(callback.from_user.id)
+    await callback.message.edit_text(_session_summary(summary), parse_mode="HTML")
+    await callback.answer()
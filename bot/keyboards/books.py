@@ -0,0 +1,127 @@
+"""
+Inline клавіатури для бібліотеки книг.
+LifeHub Bot v4.0
+"""
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from typing import List, Dict, Any
+
+
+BOOK_STATUS_LABELS = {
+    'reading': "📖 Читаю",
+    'want_to_read': "📋 Хочу прочитати",
+    'completed': "✅ Прочитано",
+}
+
+
+def book_progress(book: Dict[str, Any]) -> str:
+    """45/320 або 45/? якщо кількість сторінок невідома."""
+    return f"{book.get('current_page') or 0}/{book.get('pages') or '?'}"
+
+
+def get_books_list(
+    books: List[Dict[str, Any]],
+    status: str,
+    counts: Dict[str, int],
+    page: int = 0,
+    has_prev: bool = False,
+    has_next: bool = False,
+) -> InlineKeyboardMarkup:
+    """Вкладки статусів + сторінка книг + гортання (курсор — id)."""
+    builder = InlineKeyboardBuilder()
+    
+    # Вкладки: books:tab:{status}
+    builder.row(*[
+        InlineKeyboardButton(
+            text=f"{'• ' if value == status else ''}{label.split()[0]} {counts.get(value, 0)}",
+            callback_data=f"books:tab:{value}"
+        )
+        for value, label in BOOK_STATUS_LABELS.items()
+    ])
+    
+    for book in books:
+        builder.row(InlineKeyboardButton(
+            text=f"{book['title'][:30]} [{book_progress(book)}]",
+            callback_data=f"book:view:{book['id']}"
+        ))
+    
+    # Пагінація: books:pg:{status}:{n|p}:{page}:{id}
+    pagination = []
+    if has_prev and books:
+        pagination.append(InlineKeyboardButton(
+            text="◀️", callback_data=f"books:pg:{status}:p:{page-1}:{books[0]['id']}"
+        ))
+    if has_next and books:
+        pagination.append(InlineKeyboardButton(
+            text="▶️", callback_data=f"books:pg:{status}:n:{page+1}:{books[-1]['id']}"
+        ))
+    if pagination:
+        builder.row(*pagination)
+    
+    builder.row(InlineKeyboardButton(text="➕ Додати книгу", callback_data="book:add"))
+    
+    return builder.as_markup()
+
+
+def get_book_actions(book: Dict[str, Any]) -> InlineKeyboardMarkup:
+    """Дії з книгою."""
+    builder = InlineKeyboardBuilder()
+    book_id = book['id']
+    
+    builder.button(text="📄 Сторінка", callback_data=f"book:progress:{book_id}")
+    if book.get('file_id'):
+        builder.button(text="📥 Файл", callback_data=f"book:file:{book_id}")
+    
+    for value, label in BOOK_STATUS_LABELS.items():
+        if value != book['status']:
+            builder.button(text=label, callback_data=f"book:status:{book_id}:{value}")
+    
+    builder.button(text="🎯 Ціль", callback_data=f"book:goal:{book_id}")
+    builder.button(text="🗑 Видалити", callback_data=f"book:delete:{book_id}")
+    builder.button(text="◀️ Назад", callback_data=f"books:tab:{book['status']}")
+    
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+def get_book_goal_select(book: Dict[str, Any], targets: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
+    """Вибір Target для книги."""
+    builder = InlineKeyboardBuilder()
+    
+    for goal in targets:
+        mark = "• " if goal['id'] == book.get('goal_id') else ""
+        builder.button(
+            text=f"{mark}🎯 {goal['title'][:25]} ({goal.get('current_value') or 0}/{goal.get('target_value')})",
+            callback_data=f"book:goalunit:{book['id']}:{goal['id']}"
+        )
+    
+    if book.get('goal_id'):
+        builder.button(text="✖️ Відв'язати", callback_data=f"book:link:{book['id']}:0:pages")
+    builder.button(text="◀️ Назад", callback_data=f"book:view:{book['id']}")
+    
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+def get_book_goal_units(book_id: int, goal_id: int) -> InlineKeyboardMarkup:
+    """Що книга додає до цілі."""
+    builder = InlineKeyboardBuilder()
+    
+    builder.button(text="📄 Сторінки", callback_data=f"book:link:{book_id}:{goal_id}:pages")
+    builder.button(text="📚 Книги", callback_data=f"book:link:{book_id}:{goal_id}:books")
+    builder.button(text="◀️ Назад", callback_data=f"book:goal:{book_id}")
+    
+    builder.adjust(2, 1)
+    return builder.as_markup()
+
+
+def get_book_delete_confirm(book_id: int) -> InlineKeyboardMarkup:
+    """Підтвердження видалення."""
+    builder = InlineKeyboardBuilder()
+    
+    builder.button(text="🗑 Так, видалити", callback_data=f"book:delete_yes:{book_id}")
+    builder.button(text="◀️ Ні", callback_data=f"book:view:{book_id}")
+    
+    builder.adjust(2)
+    return builder.as_markup()
@@ -0,0 +1,172 @@
+"""
+Кеш статичних клавіатур.
+LifeHub Bot v4.0
+
+Більшість клавіатур — чисті функції: той самий набір аргументів
+(мова, режим, вибрані дні) завжди дає ту саму розмітку. Замість того щоб
+на кожен апдейт заново будувати InlineKeyboardBuilder і pydantic-моделі,
+@cached_keyboard будує клавіатуру один раз на набір аргументів і повертає
+спільний "заморожений" екземпляр.
+
+Заморожений екземпляр:
+- моделі кнопок і розмітки — frozen (присвоєння полів → ValidationError)
+- рядки кнопок — FrozenList (append/insert/... → TypeError)
+- text і callback_data інтерновані (sys.intern)
+
+ВАЖЛИВО: аргументи кешованих функцій мають бути hashable.
+Списки (вибрані дні, теги) передавати як бітову маску — див. days_mask().
+Клавіатури з даними користувача (назви задач, ID) НЕ кешувати!
+"""
+
+import copy
+import sys
+from functools import lru_cache, wraps
+from typing import Callable, Dict, Iterable, List
+
+from pydantic import ConfigDict
+from aiogram.types import (
+    InlineKeyboardMarkup,
+    InlineKeyboardButton,
+    ReplyKeyboardMarkup,
+    KeyboardButton,
+    ReplyKeyboardRemove,
+)
+
+
+class FrozenList(list):
+    """Список лише для читання (залишається list — aiogram серіалізує як звичайно)."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cached keyboard is read-only — build a new one instead")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return [copy.deepcopy(item, memo) for item in self]
+
+
+class FrozenInlineKeyboardButton(InlineKeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenInlineKeyboardMarkup(InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenKeyboardButton(KeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenReplyKeyboardMarkup(ReplyKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenReplyKeyboardRemove(ReplyKeyboardRemove):
+    model_config = ConfigDict(frozen=True)
+
+
+for _model in (
+    FrozenInlineKeyboardButton,
+    FrozenInlineKeyboardMarkup,
+    FrozenKeyboardButton,
+    FrozenReplyKeyboardMarkup,
+    FrozenReplyKeyboardRemove,
+):
+    _model.model_rebuild()
+
+
+def _set_fields(obj) -> Dict[str, object]:
+    """Явно задані поля моделі (інтерновані рядки)."""
+    fields = {}
+    for name in obj.model_fields_set:
+        value = getattr(obj, name)
+        fields[name] = sys.intern(value) if isinstance(value, str) else value
+    return fields
+
+
+def _freeze_rows(rows, button_cls) -> FrozenList:
+    return FrozenList(
+        FrozenList(button_cls.model_construct(**_set_fields(button)) for button in row)
+        for row in rows
+    )
+
+
+def freeze(markup):
+    """Заморожена копія розмітки (inline / reply / remove)."""
+    if isinstance(markup, InlineKeyboardMarkup):
+        fields = _set_fields(markup)
+        fields['inline_keyboard'] = _freeze_rows(markup.inline_keyboard, FrozenInlineKeyboardButton)
+        return FrozenInlineKeyboardMarkup.model_construct(**fields)
+    if isinstance(markup, ReplyKeyboardMarkup):
+        fields = _set_fields(markup)
+        fields['keyboard'] = _freeze_rows(markup.keyboard, FrozenKeyboardButton)
+        return FrozenReplyKeyboardMarkup.model_construct(**fields)
+    if isinstance(markup, ReplyKeyboardRemove):
+        return FrozenReplyKeyboardRemove.model_construct(**_set_fields(markup))
+    raise TypeError(f"Cannot freeze {type(markup).__name__}")
+
+
+# Всі кешовані функції — для статистики (/perf) і скидання кешу
+_registry: Dict[str, Callable] = {}
+
+
+def cached_keyboard(func: Callable = None, *, maxsize: int = 256):
+    """
+    Декоратор: будує клавіатуру один раз на набір аргументів.
+
+    @cached_keyboard
+    def get_priority_keyboard() -> InlineKeyboardMarkup: ...
+    """
+    if func is None:
+        return lambda f: cached_keyboard(f, maxsize=maxsize)
+
+    @lru_cache(maxsize=maxsize)
+    def build(*args, **kwargs):
+        return freeze(func(*args, **kwargs))
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return build(*args, **kwargs)
+
+    wrapper.cache_info = build.cache_info
+    wrapper.cache_clear = build.cache_clear
+    wrapper.uncached = func
+    _registry[f"{func.__module__}.{func.__qualname__}"] = wrapper
+    return wrapper
+
+
+def days_mask(days: Iterable[int] = None) -> int:
+    """Вибрані дні (ISO 1-7) → бітова маска (біт n = день n)."""
+    mask = 0
+    for day in days or ():
+        mask |= 1 << int(day)
+    return mask
+
+
+def values_mask(selected: Iterable[str], options: List[str]) -> int:
+    """Вибрані значення з фіксованого списку options → бітова маска за індексом."""
+    selected = set(selected or ())
+    mask = 0
+    for index, option in enumerate(options):
+        if option in selected:
+            mask |= 1 << index
+    return mask
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """hits / misses / size по кожній кешованій клавіатурі."""
+    stats = {}
+    for name, wrapper in _registry.items():
+        info = wrapper.cache_info()
+        stats[name] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+    return stats
+
+
+def clear_all() -> None:
+    """Скинути всі кеші клавіатур (наприклад, після зміни локалізації)."""
+    for wrapper in _registry.values():
+        wrapper.cache_clear()
@@ -6,8 +6,10 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from bot.locales import t
+from bot.keyboards.cache import cached_keyboard
 
 
+@cached_keyboard
 def get_language_keyboard() -> InlineKeyboardMarkup:
     """Клавіатура вибору мови."""
     builder = InlineKeyboardBuilder()
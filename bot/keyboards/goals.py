@@ -6,10 +6,18 @@ LifeHub Bot v4.0
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from typing import List, Dict, Any
+from bot.keyboards.cache import cached_keyboard, values_mask
 
 
-def get_goals_list(goals: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
-    """Список цілей згрупований по типу."""
+def get_goals_list(
+    goals: List[Dict[str, Any]],
+    page: int = 0,
+    total: int = 0,
+    has_prev: bool = False,
+    has_next: bool = False,
+    per_page: int = 10,
+) -> InlineKeyboardMarkup:
+    """Сторінка цілей згрупована по типу + гортання (курсор — id)."""
     builder = InlineKeyboardBuilder()
     
     # Групуємо по типу
@@ -20,7 +28,7 @@ def get_goals_list(goals: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
     # Проєкти
     if projects:
         builder.button(text="📁 ПРОЄКТИ", callback_data="goals:header:project")
-        for goal in projects[:5]:
+        for goal in projects:
             progress = goal.get('progress', 0)
             builder.button(
                 text=f"  📁 {goal['title'][:25]} [{progress}%]",
@@ -30,7 +38,7 @@ def get_goals_list(goals: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
     # Targets
     if targets:
         builder.button(text="🎯 ЦІЛІ", callback_data="goals:header:target")
-        for goal in targets[:5]:
+        for goal in targets:
             current = goal.get('current_value', 0)
             target = goal.get('target_value', 1)
             unit = goal.get('unit', '')
@@ -42,7 +50,7 @@ def get_goals_list(goals: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
     # Metrics
     if metrics:
         builder.button(text="📊 МЕТРИКИ", callback_data="goals:header:metric")
-        for goal in metrics[:5]:
+        for goal in metrics:
             builder.button(
                 text=f"  📊 {goal['title'][:25]}",
                 callback_data=f"goal:view:{goal['id']}"
@@ -50,12 +58,36 @@ def get_goals_list(goals: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
     
     builder.adjust(1)
     
+    # Пагінація: goals:pg:{n|p}:{page}:{id}
+    pagination = []
+    total_pages = max(1, (total + per_page - 1) // per_page, page + 1)
+    
+    if has_prev and goals:
+        first_id = max(g['id'] for g in goals)
+        pagination.append(
+            InlineKeyboardButton(text="◀️", callback_data=f"goals:pg:p:{page-1}:{first_id}")
+        )
+    
+    pagination.append(
+        InlineKeyboardButton(text=f"{page+1}/{total_pages}", callback_data="goals:header:page")
+    )
+    
+    if has_next and goals:
+        last_id = min(g['id'] for g in goals)
+        pagination.append(
+            InlineKeyboardButton(text="▶️", callback_data=f"goals:pg:n:{page+1}:{last_id}")
+        )
+    
+    if len(pagination) > 1:
+        builder.row(*pagination)
+    
     # Кнопка додавання
     builder.row(InlineKeyboardButton(text="➕ Додати ціль", callback_data="goal:add"))
     
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_goal_type_keyboard() -> InlineKeyboardMarkup:
     """Вибір типу цілі."""
     builder = InlineKeyboardBuilder()
@@ -89,6 +121,28 @@ def get_goal_actions(goal_id: int, goal_type: str) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+def get_trend_keyboard(goal_id: int, period: str) -> InlineKeyboardMarkup:
+    """Вибір періоду тренду цілі."""
+    builder = InlineKeyboardBuilder()
+    
+    periods = [
+        ("30 дн", "month"),
+        ("Квартал", "quarter"),
+        ("Рік", "year"),
+        ("Все", "all"),
+    ]
+    
+    for text, value in periods:
+        mark = "• " if value == period else ""
+        builder.button(text=f"{mark}{text}", callback_data=f"goal:history:{goal_id}:{value}")
+    
+    builder.button(text="🖼 Графік", callback_data=f"goal:chart:{goal_id}:{period}")
+    builder.button(text="◀️ Назад", callback_data=f"goal:view:{goal_id}")
+    
+    builder.adjust(4, 2)
+    return builder.as_markup()
+
+
 def get_parent_keyboard(projects: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
     """Вибір батьківського проєкту."""
     builder = InlineKeyboardBuilder()
@@ -105,22 +159,27 @@ def get_parent_keyboard(projects: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+DOMAINS = [
+    ("🏃 Health", "health"),
+    ("📚 Learning", "learning"),
+    ("💼 Career", "career"),
+    ("💰 Finance", "finance"),
+    ("👥 Relationships", "relationships"),
+    ("🌱 Growth", "growth"),
+]
+
+
 def get_domain_tags_keyboard(selected: List[str] = None) -> InlineKeyboardMarkup:
-    """Вибір тегів доменів."""
-    selected = selected or []
+    """Вибір тегів доменів (кеш за бітовою маскою вибраних тегів)."""
+    return _domain_tags_keyboard(values_mask(selected, [tag for _, tag in DOMAINS]))
+
+
+@cached_keyboard
+def _domain_tags_keyboard(mask: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     
-    domains = [
-        ("🏃 Health", "health"),
-        ("📚 Learning", "learning"),
-        ("💼 Career", "career"),
-        ("💰 Finance", "finance"),
-        ("👥 Relationships", "relationships"),
-        ("🌱 Growth", "growth"),
-    ]
-    
-    for name, tag in domains:
-        mark = "✅" if tag in selected else "⬜"
+    for index, (name, tag) in enumerate(DOMAINS):
+        mark = "✅" if mask & (1 << index) else "⬜"
         builder.button(text=f"{mark} {name}", callback_data=f"goal:tag:{tag}")
     
     builder.button(text="✅ Готово", callback_data="goal:tags:done")
@@ -129,6 +188,7 @@ def get_domain_tags_keyboard(selected: List[str] = None) -> InlineKeyboardMarkup
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_deadline_keyboard() -> InlineKeyboardMarkup:
     """Вибір дедлайну для цілі."""
     builder = InlineKeyboardBuilder()
@@ -6,6 +6,7 @@ LifeHub Bot v4.0
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from typing import List, Dict, Any
+from bot.keyboards.cache import cached_keyboard, days_mask
 
 
 def get_habits_today(habits: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
@@ -75,6 +76,7 @@ def get_habit_actions(habit_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_frequency_keyboard() -> InlineKeyboardMarkup:
     """Вибір частоти звички."""
     builder = InlineKeyboardBuilder()
@@ -89,8 +91,12 @@ def get_frequency_keyboard() -> InlineKeyboardMarkup:
 
 
 def get_weekdays_keyboard(selected: List[int] = None) -> InlineKeyboardMarkup:
-    """Вибір днів тижня."""
-    selected = selected or []
+    """Вибір днів тижня (кеш за бітовою маскою вибраних днів)."""
+    return _weekdays_keyboard(days_mask(selected))
+
+
+@cached_keyboard
+def _weekdays_keyboard(mask: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     
     days = [
@@ -99,7 +105,7 @@ def get_weekdays_keyboard(selected: List[int] = None) -> InlineKeyboardMarkup:
     ]
     
     for name, num in days:
-        mark = "✅" if num in selected else "⬜"
+        mark = "✅" if mask & (1 << num) else "⬜"
         builder.button(text=f"{mark} {name}", callback_data=f"habit:day:{num}")
     
     builder.button(text="✅ Готово", callback_data="habit:days:done")
@@ -108,6 +114,7 @@ def get_weekdays_keyboard(selected: List[int] = None) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_time_keyboard() -> InlineKeyboardMarkup:
     """Вибір часу нагадування."""
     builder = InlineKeyboardBuilder()
@@ -131,6 +138,7 @@ def get_time_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_duration_keyboard() -> InlineKeyboardMarkup:
     """Вибір тривалості."""
     builder = InlineKeyboardBuilder()
@@ -156,9 +164,10 @@ def get_stats_keyboard(habit_id: int) -> InlineKeyboardMarkup:
     builder.button(text="📅 Тиждень", callback_data=f"habit:stats_week:{habit_id}")
     builder.button(text="📅 Місяць", callback_data=f"habit:stats_month:{habit_id}")
     builder.button(text="📅 Всі дані", callback_data=f"habit:stats_all:{habit_id}")
+    builder.button(text="🗓 Heatmap", callback_data=f"habit:heatmap:{habit_id}")
     builder.button(text="◀️ Назад", callback_data=f"habit:view:{habit_id}")
     
-    builder.adjust(3, 1)
+    builder.adjust(3, 2)
     return builder.as_markup()
 
 
@@ -5,8 +5,10 @@ Inline клавіатури меню.
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from bot.locales import t
+from bot.keyboards.cache import cached_keyboard
 
 
+@cached_keyboard
 def get_main_menu_keyboard(lang: str = 'en') -> InlineKeyboardMarkup:
     """Головне меню бота."""
     builder = InlineKeyboardBuilder()
@@ -30,6 +32,7 @@ def get_main_menu_keyboard(lang: str = 'en') -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_back_to_menu_keyboard(lang: str = 'en') -> InlineKeyboardMarkup:
     """Кнопка повернення до меню."""
     builder = InlineKeyboardBuilder()
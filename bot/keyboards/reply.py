@@ -4,8 +4,10 @@ LifeHub Bot v4.0
 """
 
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
+from bot.keyboards.cache import cached_keyboard
 
 
+@cached_keyboard
 def get_main_menu() -> ReplyKeyboardMarkup:
     """Головне меню."""
     return ReplyKeyboardMarkup(
@@ -28,6 +30,7 @@ def get_main_menu() -> ReplyKeyboardMarkup:
     )
 
 
+@cached_keyboard
 def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     """Клавіатура зі скасуванням."""
     return ReplyKeyboardMarkup(
@@ -38,6 +41,7 @@ def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cached_keyboard
 def get_skip_cancel_keyboard() -> ReplyKeyboardMarkup:
     """Клавіатура з пропуском і скасуванням."""
     return ReplyKeyboardMarkup(
@@ -51,6 +55,7 @@ def get_skip_cancel_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cached_keyboard
 def get_confirm_keyboard() -> ReplyKeyboardMarkup:
     """Клавіатура підтвердження."""
     return ReplyKeyboardMarkup(
@@ -64,6 +69,7 @@ def get_confirm_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cached_keyboard
 def get_yes_no_keyboard() -> ReplyKeyboardMarkup:
     """Клавіатура Так/Ні."""
     return ReplyKeyboardMarkup(
@@ -77,6 +83,7 @@ def get_yes_no_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@cached_keyboard
 def remove_keyboard() -> ReplyKeyboardRemove:
     """Видалити клавіатуру."""
     return ReplyKeyboardRemove()
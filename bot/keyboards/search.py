@@ -0,0 +1,63 @@
+"""
+Inline клавіатури для /search.
+LifeHub Bot v4.0
+"""
+
+from typing import List, Dict, Any
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+
+SEARCH_ICONS = {
+    'task': "📋",
+    'goal': "🎯",
+    'habit': "✅",
+    'occurrence': "🔄",
+    'habit_log': "📝",
+}
+
+
+def result_callback(item: Dict[str, Any]) -> str:
+    """Куди веде результат пошуку."""
+    kind = item['kind']
+    if kind == 'task':
+        return f"task:view:{item['id']}"
+    if kind == 'goal':
+        prefix = "habit" if item.get('goal_type') == 'habit' else "goal"
+        return f"{prefix}:view:{item['id']}"
+    if kind == 'occurrence':
+        return f"recurring:stats:{item['parent_id']}"
+    return f"habit:view:{item['parent_id']}"
+
+
+def result_icon(item: Dict[str, Any]) -> str:
+    if item['kind'] == 'goal' and item.get('goal_type') == 'habit':
+        return SEARCH_ICONS['habit']
+    return SEARCH_ICONS[item['kind']]
+
+
+def get_search_results(items: List[Dict[str, Any]], page: int = 0, has_more: bool = False) -> InlineKeyboardMarkup:
+    """Результати пошуку + гортання (запит зберігається в FSM data)."""
+    builder = InlineKeyboardBuilder()
+    
+    for item in items:
+        builder.button(
+            text=f"{result_icon(item)} {(item.get('title') or '')[:30]}",
+            callback_data=result_callback(item)
+        )
+    
+    builder.adjust(1)
+    
+    pagination = []
+    if page > 0:
+        pagination.append(InlineKeyboardButton(text="◀️", callback_data=f"search:pg:{page-1}"))
+    if page > 0 or has_more:
+        pagination.append(InlineKeyboardButton(text=f"{page+1}", callback_data="search:pg:current"))
+    if has_more:
+        pagination.append(InlineKeyboardButton(text="▶️", callback_data=f"search:pg:{page+1}"))
+    
+    if pagination:
+        builder.row(*pagination)
+    
+    return builder.as_markup()
@@ -0,0 +1,27 @@
+"""
+Inline клавіатури для /stats.
+LifeHub Bot v4.0
+"""
+
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from bot.keyboards.cache import cached_keyboard
+
+
+@cached_keyboard
+def get_period_keyboard(period: str = 'week') -> InlineKeyboardMarkup:
+    """Вибір періоду статистики."""
+    builder = InlineKeyboardBuilder()
+    
+    periods = [
+        ("📅 Тиждень", "week"),
+        ("📅 Місяць", "month"),
+        ("📅 Рік", "year"),
+    ]
+    
+    for text, value in periods:
+        mark = "• " if value == period else ""
+        builder.button(text=f"{mark}{text}", callback_data=f"stats:period:{value}")
+    
+    builder.adjust(3)
+    return builder.as_markup()
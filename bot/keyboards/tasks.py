@@ -6,6 +6,7 @@ LifeHub Bot v4.0
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from typing import List, Dict, Any
+from bot.keyboards.cache import cached_keyboard, days_mask
 
 
 def get_task_actions(task_id: int, is_completed: bool = False) -> InlineKeyboardMarkup:
@@ -24,19 +25,41 @@ def get_task_actions(task_id: int, is_completed: bool = False) -> InlineKeyboard
     return builder.as_markup()
 
 
-def get_tasks_list(tasks: List[Dict[str, Any]], page: int = 0, per_page: int = 5) -> InlineKeyboardMarkup:
-    """Список задач з пагінацією."""
+def task_page_callback(view: str, direction: str, page: int, cursor: tuple) -> str:
+    """
+    callback_data для гортання: tasks:pg:{view}:{n|p}:{page}:{priority}:{HHMM}:{id}
+    (час без двокрапки — двокрапка є роздільником; ліміт Telegram — 64 байти).
+    """
+    priority, sort_time, task_id = cursor
+    return f"tasks:pg:{view}:{direction}:{page}:{priority}:{sort_time.replace(':', '')}:{task_id}"
+
+
+def parse_task_page_callback(data: str) -> tuple:
+    """tasks:pg:... → (view, direction, page, cursor)."""
+    _, _, view, direction, page, priority, hhmm, task_id = data.split(":")
+    return view, direction, int(page), (int(priority), f"{hhmm[:2]}:{hhmm[2:]}", int(task_id))
+
+
+def get_tasks_list(
+    tasks: List[Dict[str, Any]],
+    view: str = 'today',
+    page: int = 0,
+    total: int = 0,
+    prev_cursor: tuple = None,
+    next_cursor: tuple = None,
+    per_page: int = 5,
+) -> InlineKeyboardMarkup:
+    """
+    Одна сторінка задач (з БД вже вибрана потрібна сторінка) + гортання.
+    prev_cursor / next_cursor — keyset-курсори (queries.task_cursor), None — кнопки немає.
+    """
     builder = InlineKeyboardBuilder()
     
-    # Визначаємо діапазон
-    start = page * per_page
-    end = start + per_page
-    page_tasks = tasks[start:end]
+    priority_icons = ["🔴", "🟠", "🟡", "🟢"]
     
     # Кнопки задач
-    for task in page_tasks:
+    for task in tasks:
         status = "✅" if task['is_completed'] else "⬜"
-        priority_icons = ["🔴", "🟠", "🟡", "🟢"]
         priority = priority_icons[task.get('priority', 2)]
         
         text = f"{status} {priority} {task['title'][:30]}"
@@ -46,23 +69,25 @@ def get_tasks_list(tasks: List[Dict[str, Any]], page: int = 0, per_page: int = 5
     
     # Пагінація
     pagination = []
-    total_pages = (len(tasks) + per_page - 1) // per_page
+    total_pages = max(1, (total + per_page - 1) // per_page, page + 1)
     
-    if page > 0:
-        pagination.append(
-            InlineKeyboardButton(text="◀️", callback_data=f"tasks:page:{page-1}")
-        )
+    if prev_cursor:
+        pagination.append(InlineKeyboardButton(
+            text="◀️",
+            callback_data=task_page_callback(view, "p", page - 1, prev_cursor)
+        ))
     
     pagination.append(
         InlineKeyboardButton(text=f"{page+1}/{total_pages}", callback_data="tasks:page:current")
     )
     
-    if page < total_pages - 1:
-        pagination.append(
-            InlineKeyboardButton(text="▶️", callback_data=f"tasks:page:{page+1}")
-        )
+    if next_cursor:
+        pagination.append(InlineKeyboardButton(
+            text="▶️",
+            callback_data=task_page_callback(view, "n", page + 1, next_cursor)
+        ))
     
-    if total_pages > 1:
+    if len(pagination) > 1:
         builder.row(*pagination)
     
     # Кнопка додавання
@@ -71,6 +96,7 @@ def get_tasks_list(tasks: List[Dict[str, Any]], page: int = 0, per_page: int = 5
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_priority_keyboard() -> InlineKeyboardMarkup:
     """Вибір пріоритету."""
     builder = InlineKeyboardBuilder()
@@ -84,6 +110,7 @@ def get_priority_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_deadline_keyboard() -> InlineKeyboardMarkup:
     """Вибір дедлайну."""
     builder = InlineKeyboardBuilder()
@@ -99,6 +126,7 @@ def get_deadline_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_time_keyboard() -> InlineKeyboardMarkup:
     """Вибір часу."""
     builder = InlineKeyboardBuilder()
@@ -129,6 +157,7 @@ def get_goal_keyboard(projects: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_recurring_keyboard() -> InlineKeyboardMarkup:
     """Вибір типу повторення."""
     builder = InlineKeyboardBuilder()
@@ -143,8 +172,12 @@ def get_recurring_keyboard() -> InlineKeyboardMarkup:
 
 
 def get_weekdays_inline(selected: List[int] = None) -> InlineKeyboardMarkup:
-    """Inline вибір днів тижня."""
-    selected = selected or []
+    """Inline вибір днів тижня (кеш за бітовою маскою вибраних днів)."""
+    return _weekdays_inline(days_mask(selected))
+
+
+@cached_keyboard
+def _weekdays_inline(mask: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     
     days = [
@@ -153,7 +186,7 @@ def get_weekdays_inline(selected: List[int] = None) -> InlineKeyboardMarkup:
     ]
     
     for name, num in days:
-        mark = "✅" if num in selected else "⬜"
+        mark = "✅" if mask & (1 << num) else "⬜"
         builder.button(text=f"{mark} {name}", callback_data=f"task:day:{num}")
     
     builder.button(text="✅ Готово", callback_data="task:days:done")
@@ -8,8 +8,10 @@ LifeHub Bot v4.0
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from bot.keyboards.cache import cached_keyboard
 
 
+@cached_keyboard
 def get_today_keyboard(sort_mode: str = 'time') -> InlineKeyboardMarkup:
     """Головна клавіатура /today."""
     builder = InlineKeyboardBuilder()
@@ -80,6 +82,7 @@ def get_today_item_actions(item_type: str, item_id: int, status: str = None) ->
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_morning_keyboard() -> InlineKeyboardMarkup:
     """Клавіатура ранкового огляду."""
     builder = InlineKeyboardBuilder()
@@ -91,6 +94,7 @@ def get_morning_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@cached_keyboard
 def get_evening_keyboard() -> InlineKeyboardMarkup:
     """Клавіатура вечірнього підсумку."""
     builder = InlineKeyboardBuilder()
@@ -0,0 +1,50 @@
+"""
+Inline клавіатури для словника (/words, /learn).
+LifeHub Bot v4.0
+"""
+
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+
+# Оцінки SM-2 на кнопках (0..5)
+RATINGS = (
+    ("❌ Не згадав", 1),
+    ("😐 Важко", 3),
+    ("🙂 Добре", 4),
+    ("😎 Легко", 5),
+)
+
+
+def get_words_menu(due: int) -> InlineKeyboardMarkup:
+    """Меню словника."""
+    builder = InlineKeyboardBuilder()
+    
+    if due:
+        builder.button(text=f"🧠 Повторити ({due})", callback_data="words:learn")
+    builder.button(text="➕ Додати слово", callback_data="words:add")
+    
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+def get_card_front(word_id: int) -> InlineKeyboardMarkup:
+    """Лицьова сторона картки."""
+    builder = InlineKeyboardBuilder()
+    builder.button(text="👁 Показати переклад", callback_data=f"words:show:{word_id}")
+    builder.button(text="⏹ Завершити", callback_data="words:stop")
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+def get_card_rating(word_id: int) -> InlineKeyboardMarkup:
+    """Оцінка відповіді."""
+    builder = InlineKeyboardBuilder()
+    
+    for text, quality in RATINGS:
+        builder.button(text=text, callback_data=f"words:rate:{word_id}:{quality}")
+    builder.button(text="⏹ Завершити", callback_data="words:stop")
+    
+    builder.adjust(2, 2, 1)
+    return builder.as_markup()
+
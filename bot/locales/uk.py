@@ -40,9 +40,25 @@ HELP = """
 /habits — Звички на сьогодні
 /habit_add — Додати звичку
 
-<b>Книги (скоро):</b>
+<b>Статистика:</b>
+/stats — Тиждень / місяць / рік
+
+<b>Дані:</b>
+/export — Експорт у CSV (/export json — JSON Lines)
+/import — Імпорт задач і звичок з CSV / JSON
+/search — Пошук по задачах, цілях і нотатках
+
+<b>Словник:</b>
+/words — Словник
+/word_add — Додати слово
+/learn — Повторення (SM-2)
+
+<b>Inline:</b>
+@бот текст — швидко додати задачу або виконати пункт на сьогодні
+
+<b>Книги:</b>
 /books — Бібліотека
-/book_add — Додати книгу
+/book_add — Додати книгу (PDF / EPUB або назва)
 """
 
 CANCELLED = "❌ Скасовано."
@@ -141,6 +157,23 @@ GOALS = {
     'pace_on_track': "📈 В темпі! Так тримати!",
     'pace_behind': "⚠️ Трохи відстаєш від графіку",
     
+    # Тренд (goal:history)
+    'trend_periods': {
+        'month': "30 днів, по днях",
+        'quarter': "квартал, по тижнях",
+        'year': "рік, по тижнях",
+        'all': "вся історія, по місяцях",
+    },
+    'trend_title': "📈 <b>{title}</b> — {period}",
+    'trend_empty': "📭 Записів за цей період немає.",
+    'trend_chart': "<code>{chart}</code>\n<i>{first} → {last}</i>",
+    'trend_metric': "📍 Останнє: {last} · Мін–макс: {low}–{high}",
+    'trend_band': "🎯 Діапазон {band}: в ньому {in_band}% точок",
+    'trend_target': "📍 За період: {total} · Залишилось: {remaining}",
+    'trend_pace': "📉 Темп: {slope:+} / тиждень",
+    'trend_eta_band': "⏳ До діапазону ~{days} дн. при поточному темпі",
+    'trend_eta_target': "⏳ До цілі ~{days} дн. при поточному темпі",
+    
     # Дії
     'deleted': "🗑 Ціль видалено.",
 }
@@ -186,6 +219,9 @@ HABITS = {
 📅 Цього місяця: {month_done}/{month_total} ({month_rate}%)
 📈 Всього виконано: {total_done} разів
 """,
+    
+    # Heatmap
+    'heatmap_caption': "🗓 <b>{title}</b> — рік\n✅ {done} · ⏭ {skipped} · ❌ {missed}",
 }
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -218,6 +254,211 @@ RECURRING = {
     'marked_skip': "⏭ «{title}» пропущено",
 }
 
+# ═══════════════════════════════════════════════════════════════════════════════
+#                              СТАТИСТИКА
+# ═══════════════════════════════════════════════════════════════════════════════
+
+STATS = {
+    'periods': {
+        'week': "7 днів",
+        'month': "30 днів",
+        'year': "рік",
+    },
+    
+    'template': """
+📊 <b>Статистика за {period}</b>
+
+📋 Задач виконано: {tasks_completed}
+🔄 Повторювані: ✅ {occurrences_done} · ⏭ {occurrences_skipped} · ❌ {occurrences_missed}
+✅ Звички: ✅ {habits_done} · ⏭ {habits_skipped} · ❌ {habits_missed}
+🎯 Записів цілей: {goal_entries}
+
+<code>{chart}</code>
+<i>{first} → {last}</i>
+""",
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                              ЕКСПОРТ / ІМПОРТ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+DATA = {
+    'export_usage': "📦 Використання: <code>/export</code> або <code>/export json</code>",
+    'export_started': "📦 Готую архів...",
+    'export_done': "📦 <b>Експорт готовий</b>\n\n{summary}",
+    'export_too_large': "❌ Архів більший за 50 МБ — Telegram не дозволяє його надіслати.",
+    'import_prompt': (
+        "📥 <b>Імпорт</b>\n\n"
+        "Надішли файл <b>.csv</b> або <b>.json</b> (до {max_rows} рядків).\n\n"
+        "Колонки: <code>type</code> (task / habit), <code>title</code>, "
+        "<code>priority</code>, <code>deadline</code>, <code>scheduled_time</code>, "
+        "<code>recurrence_rule</code>, <code>recurrence_days</code>, <code>goal_id</code>, "
+        "<code>frequency</code>, <code>schedule_days</code>, <code>reminder_time</code>, "
+        "<code>parent_id</code>"
+    ),
+    'import_not_document': "📎 Надішли файл документом або натисни «❌ Скасувати».",
+    'import_too_large': "❌ Файл більший за 20 МБ.",
+    'import_started': "📥 Імпортую...",
+    'import_bad_file': "❌ Не вдалося прочитати файл: {error}",
+    'import_empty': "📭 У файлі немає рядків для імпорту.",
+    'import_errors': (
+        "❌ <b>Нічого не імпортовано</b> — помилок: {count}\n\n"
+        "{errors}\n\n"
+        "Виправ файл і надішли ще раз."
+    ),
+    'import_done': (
+        "✅ <b>Імпорт завершено</b>\n\n"
+        "• Задач: {tasks}\n"
+        "• Звичок: {habits}\n"
+        "• Пропущено виконаних: {skipped}\n"
+        "• Оновлено проєктів: {projects}\n\n"
+        "⏱ {seconds:.1f} с ({rate:.0f} рядків/с)"
+    ),
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                                ПОШУК
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SEARCH = {
+    'usage': "🔎 Використання: <code>/search слова</code>\n\nСлова від 3 літер шукаються як початок слова: <code>/search англ прак</code>",
+    'title': "🔎 <b>Пошук:</b> {query}",
+    'empty': "🔎 За запитом «{query}» нічого не знайдено.",
+    'expired': "Пошук застарів — повтори /search",
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                                КНИГИ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+BOOKS = {
+    'title': "📚 <b>Бібліотека</b> — {status}",
+    'empty': "📚 <b>Бібліотека</b>\n\nКниг ще немає — надішли PDF / EPUB або назву: /book_add",
+    'empty_status': "<i>Тут поки порожньо.</i>",
+    
+    # Створення
+    'create_prompt': "📚 Надішли файл книги (PDF / EPUB) або введи назву:",
+    'create_author': "✍️ Автор (або пропусти):",
+    'create_pages': "📄 Скільки сторінок? (або пропусти)",
+    'invalid_pages': "❌ Введи ціле число сторінок.",
+    'created': "✅ Книгу додано!",
+    'untitled': "Без назви",
+    'duplicate': "📚 Цей файл уже є в бібліотеці:",
+    'metadata_pending': "\n\n⏳ <i>Рахую сторінки...</i>",
+    
+    # Перегляд
+    'view': "📖 <b>{title}</b>\n✍️ {author}\n\n📄 Сторінка: {progress}\n📌 {status}",
+    'view_goal': "\n🎯 {goal} ({unit})",
+    'no_author': "—",
+    'file_missing': "❌ Telegram більше не віддає цей файл — додай книгу ще раз.",
+    
+    # Прогрес
+    'progress_prompt': "📄 На якій ти сторінці? Можна з загальною кількістю: <code>45/320</code>",
+    'progress_saved': "✅ Прогрес збережено",
+    'progress_invalid': "❌ Введи номер сторінки, напр. <code>45</code> або <code>45/320</code>.",
+    
+    # Прив'язка до Target
+    'goal_units': {'pages': "сторінки", 'books': "книги"},
+    'goal_select': "🎯 До якої цілі додавати прогрес цієї книги?",
+    'goal_unit_select': "🎯 Що рахувати в цілі?\n\n📄 Сторінки — кожна прочитана сторінка\n📚 Книги — +1, коли книгу прочитано",
+    'goal_no_targets': "Немає цілей-Target — створи, напр. «24 книги»: /goal_add",
+    'goal_linked': "🎯 Прив'язано — рахується прогрес від цього моменту",
+    'goal_unlinked': "✖️ Відв'язано від цілі",
+    'goal_posted': "🎯 {value} → {goal}",
+    
+    'delete_confirm': "🗑 Видалити «{title}»?",
+    'deleted': "🗑 Книгу видалено.",
+    'not_found': "❌ Книгу не знайдено",
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                                СЛОВНИК
+# ═══════════════════════════════════════════════════════════════════════════════
+
+WORDS = {
+    'title': "🔤 <b>Словник</b>\n\n📚 Слів: {total}\n🧠 До повторення сьогодні: {due}",
+    'empty': "🔤 <b>Словник</b>\n\nСлів ще немає — додай перше: /word_add",
+    
+    # Створення
+    'create_word': "🔤 Введи слово:",
+    'create_translation': "💬 Переклад для <b>{word}</b>:",
+    'create_example': "📝 Приклад використання (або пропусти):",
+    'created': "✅ Слово <b>{word}</b> — {translation} додано. Повторення вже сьогодні.",
+    
+    # Повторення
+    'card_front': "🧠 <b>{word}</b>\n\n<i>Згадай переклад</i>",
+    'card_back': "🧠 <b>{word}</b>\n\n💬 {translation}",
+    'card_example': "\n📝 <i>{example}</i>",
+    'card_progress': "\n\n✅ Повторено: {reviewed}",
+    'nothing_due': "🎉 На сьогодні все повторено!",
+    'session_done': "🏁 <b>Сесію завершено</b>\n\n✅ Повторено: {reviewed}\n❌ Не згадано: {failed}",
+    'session_expired': "Сесія завершилась — почни знову: /learn",
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                          АДМІН: ПРОДУКТИВНІСТЬ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+PERF = {
+    'usage': (
+        "📈 <b>/perf</b> — затримки і стан\n"
+        "<code>/perf db</code> — розмір БД і таблиці\n"
+        "<code>/perf slow</code> — останні повільні апдейти\n"
+        "<code>/perf optimize</code> — checkpoint, optimize, ANALYZE, FTS, incremental vacuum\n"
+        "<code>/perf vacuum</code> — повний VACUUM (блокує БД)"
+    ),
+    'title': "📈 <b>Продуктивність</b>",
+    'updates': "⚙️ Апдейтів: {total} · в обробці: {in_flight} · помилок: {errors}",
+    'latency_header': "\n⏱ <b>Затримка, мс</b> (p50 / p95 / p99, к-сть)",
+    'latency_row': "<code>{handler}</code> {p50:.0f} / {p95:.0f} / {p99:.0f} ({count})",
+    'latency_empty': "<i>Ще немає даних</i>",
+    'caches': (
+        "\n🗂 <b>Кеші</b>\n"
+        "Клавіатури: {kb_rate:.0f}% влучань ({kb_hits}/{kb_total}), {kb_size} шт.\n"
+        "Підказки inline: {sg_users} корист., {sg_items} пунктів\n"
+        "Графіки: {ch_memory} file_id, рендериться {ch_rendering}\n"
+        "Сесії слів: {srs_sessions}, незаписаних відповідей {srs_pending}"
+    ),
+    'throttling': "\n🚦 <b>Throttling</b>: відкинуто {dropped}, склеєно {coalesced}, bucket-ів {buckets}",
+    'backlog': "\n🌙 <b>Rollover</b>: {backlog}",
+    'backlog_clear': "усі дні закрито",
+    'db': (
+        "💾 <b>База даних</b>\n\n"
+        "Файл: {file_mb:.1f} МБ · WAL: {wal_mb:.1f} МБ\n"
+        "Сторінок: {page_count} × {page_size} Б · вільних: {freelist_count}\n"
+        "journal_mode: {journal_mode} · auto_vacuum: {auto_vacuum}"
+    ),
+    'db_rows': "\n📊 <b>Рядків</b>",
+    'db_largest': "\n📦 <b>Найбільші</b>",
+    'db_archive': "\n🗄 <b>Архів</b>: {archive_mb:.1f} МБ · рядки до {until}",
+    'slow_empty': "🐢 Повільних апдейтів немає (поріг SLOW_UPDATE_MS: {threshold})",
+    'slow_row': "🐢 {at} <code>{handler}</code> {ms:.0f} мс · БД {db_ms:.0f} мс · SQL {statements} · API {api_calls}",
+    'optimize_done': "🛠 <b>Обслуговування БД</b>\n\n{steps}\n\nВільних сторінок: {freelist_before} → {freelist_after}",
+    'optimize_no_incremental': "\n<i>auto_vacuum не INCREMENTAL — вільні сторінки поверне /perf vacuum</i>",
+    'vacuum_done': "🧹 <b>VACUUM</b>: {before_mb:.1f} → {after_mb:.1f} МБ, auto_vacuum = INCREMENTAL",
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                              INLINE-РЕЖИМ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+INLINE = {
+    'add_today': "➕ На сьогодні: {title}",
+    'add_inbox': "📥 У вхідні: {title}",
+    'add_hint': "Нова задача",
+    'recent_hint': "Недавня задача — додати на сьогодні",
+    'done_title': "✅ {title}",
+    'done_hint': {
+        'task': "Виконати задачу",
+        'recurring': "Виконати повторювану задачу",
+        'habit': "Відмітити звичку",
+    },
+    'message_added_today': "➕ Задача на сьогодні: <b>{title}</b>",
+    'message_added_inbox': "📥 Задача у вхідних: <b>{title}</b>",
+    'message_done': "✅ Виконано: <b>{title}</b>",
+    'button': "📋 Відкрити LifeHub",
+}
+
 # ═══════════════════════════════════════════════════════════════════════════════
 #                              КНОПКИ
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -269,4 +510,5 @@ ERRORS = {
     'invalid_date': "❌ Невірний формат дати. Використовуй ДД.ММ.РРРР",
     'invalid_time': "❌ Невірний формат часу. Використовуй ГГ:ХХ",
     'invalid_number': "❌ Введи число.",
+    'too_fast': "⏳ Занадто часто — зачекай секунду.",
 }
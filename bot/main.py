@@ -19,7 +19,13 @@ from aiogram.enums import ParseMode
 
 from bot.config import config
 from bot.database.models import init_database
-from bot.handlers import common, tasks, goals, habits, today
+from bot.database import migrations
+from bot.middlewares.db import DbSessionMiddleware, CommitBeforeRequestMiddleware
+from bot.middlewares import metrics as metrics_middleware
+from bot.middlewares.throttling import ThrottlingMiddleware
+from bot.handlers import admin, common, tasks, goals, habits, today, stats, data, search, inline, words, books
+from bot.services.rollover import rollover_loop
+from bot.services import archive, metrics, srs, workers
 
 
 # Налаштування логування
@@ -43,6 +49,7 @@ async def main():
     # Ініціалізація бази даних
     logger.info("📦 Ініціалізація бази даних...")
     await init_database()
+    await migrations.migrate()
     
     # Створення бота
     bot = Bot(
@@ -53,16 +60,49 @@ async def main():
     # Створення диспетчера
     dp = Dispatcher()
     
+    # Профілювання апдейтів (зовнішнє — рахує і commit сесії БД)
+    dp.update.outer_middleware(metrics_middleware.MetricsMiddleware())
+    metrics_middleware.setup(dp)
+    
+    # Одне з'єднання з БД на апдейт; commit перед кожним запитом до Telegram
+    dp.update.outer_middleware(DbSessionMiddleware())
+    bot.session.middleware(CommitBeforeRequestMiddleware())
+    
+    # Час запитів до Bot API (без commit перед ними)
+    bot.session.middleware(metrics_middleware.ApiCallsMiddleware())
+    
+    # Флуд callback-ами відсікається до хендлера і запитів до БД
+    dp.callback_query.outer_middleware(ThrottlingMiddleware())
+    
     # Реєстрація роутерів
+    dp.include_router(admin.router)
     dp.include_router(common.router)
     dp.include_router(tasks.router)
     dp.include_router(goals.router)
     dp.include_router(habits.router)
     dp.include_router(today.router)
+    dp.include_router(stats.router)
+    dp.include_router(data.router)
+    dp.include_router(search.router)
+    dp.include_router(inline.router)
+    dp.include_router(words.router)
+    dp.include_router(books.router)
     
     # Запуск
     logger.info("🚀 Бот запускається...")
     
+    # Закриття днів після опівночі (по часових поясах)
+    rollover_task = asyncio.create_task(rollover_loop())
+    
+    # Дані міграцій — порціями у фоні, бот тим часом працює
+    backfill_task = asyncio.create_task(migrations.run_backfills())
+    
+    # Стара історія — в архівну БД, теж порціями у фоні
+    archive_task = asyncio.create_task(archive.archive_loop()) if config.ARCHIVE_AFTER_DAYS else None
+    
+    # Endpoint /metrics для Prometheus
+    metrics_runner = await metrics.start_server(config.METRICS_PORT) if config.METRICS_PORT else None
+    
     try:
         # Видаляємо webhook якщо є
         await bot.delete_webhook(drop_pending_updates=True)
@@ -73,6 +113,14 @@ async def main():
             allowed_updates=dp.resolve_used_update_types()
         )
     finally:
+        rollover_task.cancel()
+        backfill_task.cancel()
+        if archive_task is not None:
+            archive_task.cancel()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        workers.shutdown()
+        await srs.close_all()
         await bot.session.close()
         logger.info("👋 Бот зупинено.")
 
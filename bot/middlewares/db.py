@@ -0,0 +1,56 @@
+"""
+Сесія БД на апдейт (unit of work).
+LifeHub Bot v4.0
+
+DbSessionMiddleware — outer middleware на dp.update: один апдейт = одне
+з'єднання (відкривається при першому запиті) і commit у кінці.
+Помилка в обробнику — rollback незакоміченої роботи апдейту.
+
+CommitBeforeRequestMiddleware — middleware сесії бота: перед кожним
+запитом до Bot API сесія комітить, щоб транзакція (і блокування на запис)
+не трималась під час мережевого запиту, а користувач бачив лише
+збережені зміни.
+
+Сама сесія — bot/database/models.py (DbSession).
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject
+
+from bot.database.models import current_session, start_session, end_session
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """Одне з'єднання і одна транзакція на апдейт."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        session, token = start_session()
+        data['db_session'] = session
+        try:
+            result = await handler(event, data)
+            await session.commit()
+            return result
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+            end_session(token)
+
+
+class CommitBeforeRequestMiddleware(BaseRequestMiddleware):
+    """Commit сесії апдейту перед запитом до Telegram."""
+
+    async def __call__(self, make_request, bot, method):
+        session = current_session()
+        if session is not None:
+            await session.commit()
+        return await make_request(bot, method)
@@ -0,0 +1,136 @@
+"""
+Профілювання апдейтів.
+LifeHub Bot v4.0
+
+MetricsMiddleware      — outer middleware на dp.update (зовнішній до
+                         DbSessionMiddleware): час апдейту, SQL і commit
+                         з DbSession, запис у services/metrics.py
+HandlerNameMiddleware  — inner middleware на подіях диспетчера: який
+                         хендлер обробив апдейт (tasks.callback_task_done)
+ApiCallsMiddleware     — middleware сесії бота: запити до Bot API і їх час
+
+Апдейт довший за SLOW_UPDATE_MS пишеться в лог разом з його SQL.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject
+
+from bot.config import config
+from bot.services import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Скільки SQL показувати в лозі повільного апдейту
+SLOW_LOG_STATEMENTS = 50
+
+# ... і в /perf slow (повідомлення Telegram обмежене 4096 символами)
+SLOW_PERF_STATEMENTS = 5
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """Лічильники апдейту → гістограми."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        stats, token = metrics.start_update()
+        data['update_stats'] = stats
+        failed = False
+        try:
+            return await handler(event, data)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            metrics.end_update(token)
+            _record(stats, data.get('db_session'), failed)
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Назва хендлера в UpdateStats (inner — вже відомо, який хендлер)."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        stats = data.get('update_stats')
+        handler_object = data.get('handler')
+        if stats is not None and handler_object is not None:
+            callback = handler_object.callback
+            module = getattr(callback, '__module__', '').rsplit('.', 1)[-1]
+            stats.handler = f"{module}.{getattr(callback, '__name__', 'handler')}"
+        return await handler(event, data)
+
+
+class ApiCallsMiddleware(BaseRequestMiddleware):
+    """Запити до Bot API в межах апдейту."""
+
+    async def __call__(self, make_request, bot, method):
+        stats = metrics.current_update()
+        if stats is None:
+            return await make_request(bot, method)
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            stats.api_calls += 1
+            stats.api_time += time.perf_counter() - start
+
+
+def setup(dp: Dispatcher) -> None:
+    """Inner middleware на всі типи подій (діє і на вкладені роутери)."""
+    for name, observer in dp.observers.items():
+        if name not in ('update', 'error'):
+            observer.middleware(HandlerNameMiddleware())
+
+
+def _record(stats: metrics.UpdateStats, session, failed: bool) -> None:
+    name = stats.handler
+    elapsed = time.perf_counter() - stats.started
+
+    metrics.observe('lifehub_update_duration_seconds', name, elapsed)
+    metrics.observe('lifehub_update_api_calls', name, stats.api_calls)
+    metrics.observe('lifehub_update_api_seconds', name, stats.api_time)
+    if session is not None:
+        metrics.observe('lifehub_update_db_seconds', name, session.db_time)
+        metrics.observe('lifehub_update_sql_statements', name, session.statements)
+        metrics.observe('lifehub_update_db_commits', name, session.commits)
+    if failed:
+        metrics.increment('lifehub_update_errors_total', name)
+
+    if not config.SLOW_UPDATE_MS or elapsed * 1000 < config.SLOW_UPDATE_MS:
+        return
+
+    metrics.increment('lifehub_slow_updates_total', name)
+    statements = (session.sql if session is not None else None) or []
+    metrics.remember_slow({
+        'handler': name,
+        'at': time.strftime('%H:%M:%S'),
+        'ms': elapsed * 1000,
+        'db_ms': session.db_time * 1000 if session else 0,
+        'statements': session.statements if session else 0,
+        'api_calls': stats.api_calls,
+        'sql': [' '.join(sql.split())[:200] for sql in statements[:SLOW_PERF_STATEMENTS]],
+    })
+    lines = [
+        f"🐢 Повільний апдейт: {name} {elapsed * 1000:.0f} мс "
+        f"(БД {session.db_time * 1000 if session else 0:.0f} мс, "
+        f"SQL {session.statements if session else 0}, "
+        f"commit {session.commits if session else 0}, "
+        f"API {stats.api_calls} / {stats.api_time * 1000:.0f} мс)"
+    ]
+    lines += [f"  {' '.join(sql.split())[:300]}" for sql in statements[:SLOW_LOG_STATEMENTS]]
+    if len(statements) > SLOW_LOG_STATEMENTS:
+        lines.append(f"  ... ще {len(statements) - SLOW_LOG_STATEMENTS}")
+    logger.warning("\n".join(lines))
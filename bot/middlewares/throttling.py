@@ -0,0 +1,129 @@
+"""
+Обмеження частоти callback-запитів.
+LifeHub Bot v4.0
+
+Кожна пара (користувач, дія) має token bucket: THROTTLE_BURST натискань
+підряд, далі THROTTLE_RATE на секунду. Дія — перші два сегменти
+callback_data ("task:done:15" → "task:done").
+
+- Однакові натискання (та сама callback_data) протягом THROTTLE_COALESCE_MS
+  склеюються: виконується лише останнє, попередні отримують порожній
+  callback.answer() (кнопка перестає "крутитись")
+- Різні натискання понад ліміт отримують callback.answer з попередженням,
+  хендлер і БД не чіпаються
+
+Реєструється як outer middleware на dp.callback_query — до хендлера,
+з'єднання сесії БД ще не відкрите.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery
+
+from bot.config import config
+from bot.locales import uk
+
+
+# Скільки bucket-ів / натискань тримати; понад це — прибираються неактуальні
+MAX_BUCKETS = 10000
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated: float
+
+
+_buckets: Dict[Tuple[int, str], _Bucket] = {}
+
+# (користувач, callback_data) → (час останнього натискання, номер натискання)
+_last_press: Dict[Tuple[int, str], Tuple[float, int]] = {}
+
+_counters = {'dropped': 0, 'coalesced': 0}
+
+
+def _take(key: Tuple[int, str], now: float) -> bool:
+    """Забрати токен з bucket-а. False — ліміт вичерпано."""
+    bucket = _buckets.get(key)
+    if bucket is None:
+        if len(_buckets) >= MAX_BUCKETS:
+            _prune(now)
+        bucket = _buckets[key] = _Bucket(config.THROTTLE_BURST, now)
+    else:
+        bucket.tokens = min(
+            config.THROTTLE_BURST,
+            bucket.tokens + (now - bucket.updated) * config.THROTTLE_RATE
+        )
+        bucket.updated = now
+
+    if bucket.tokens < 1:
+        return False
+    bucket.tokens -= 1
+    return True
+
+
+def _prune(now: float) -> None:
+    """Прибрати bucket-и, що вже наповнились, і старі натискання."""
+    refill = config.THROTTLE_BURST / config.THROTTLE_RATE
+    window = config.THROTTLE_COALESCE_MS / 1000
+    for key in [k for k, b in _buckets.items() if now - b.updated >= refill]:
+        del _buckets[key]
+    for key in [k for k, (at, _) in _last_press.items() if now - at >= window]:
+        del _last_press[key]
+
+
+def _mark(data: Dict[str, Any], name: str) -> None:
+    """Відкинуті апдейти — окремим рядком у метриках, а не під хендлером."""
+    stats = data.get('update_stats')
+    if stats is not None:
+        stats.handler = name
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Token bucket на (користувач, дія) + склеювання однакових натискань."""
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not event.data:
+            return await handler(event, data)
+
+        user_id = event.from_user.id
+        now = time.monotonic()
+        window = config.THROTTLE_COALESCE_MS / 1000
+
+        press_key = (user_id, event.data)
+        if len(_last_press) >= MAX_BUCKETS:
+            _prune(now)
+        previous = _last_press.get(press_key)
+        number = previous[1] + 1 if previous else 0
+        _last_press[press_key] = (now, number)
+
+        if previous is not None and now - previous[0] < window:
+            # Повторне натискання: чекаємо вікно — прийде ще одне, виконається воно
+            await asyncio.sleep(window)
+            latest = _last_press.get(press_key)
+            if latest is not None and latest[1] != number:
+                _counters['coalesced'] += 1
+                _mark(data, "coalesced")
+                await event.answer()
+                return None
+        elif not _take((user_id, ":".join(event.data.split(":")[:2])), now):
+            _counters['dropped'] += 1
+            _mark(data, "throttled")
+            await event.answer(uk.ERRORS['too_fast'])
+            return None
+
+        return await handler(event, data)
+
+
+def throttle_stats() -> Dict[str, int]:
+    """Відкинуті / склеєні натискання — для /perf."""
+    return {'buckets': len(_buckets), **_counters}
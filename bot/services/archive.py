@@ -0,0 +1,85 @@
+"""
+Архів історії — перенесення старих рядків з гарячих таблиць.
+LifeHub Bot v4.0
+
+Раз на ARCHIVE_INTERVAL: виконані one-time задачі, occurrences і логи
+звичок, старші за config.ARCHIVE_AFTER_DAYS, переносяться в архівну БД
+(config.ARCHIVE_PATH) порціями по queries.ARCHIVE_BATCH рядків — окрема
+коротка транзакція на порцію, пауза між порціями, апдейти тим часом
+обслуговуються. Вмикається ARCHIVE_AFTER_DAYS > 0 (за замовчуванням вимкнено —
+з архівом резервна копія — два файли).
+
+Запити історії (статистика, streak, графіки, експорт, пошук нотаток)
+підключають архів самі, лише коли період заходить за його межу —
+див. queries, розділ Archive.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Dict
+
+from bot.config import config
+from bot.database import queries
+from bot.services import clock
+from bot.services.rollover import MAX_CATCHUP_DAYS
+
+
+logger = logging.getLogger(__name__)
+
+# Як часто архівувати (секунди)
+ARCHIVE_INTERVAL = 24 * 60 * 60
+
+# Пауза між порціями (секунди) — апдейти встигають взяти блокування на запис
+ARCHIVE_PAUSE = 0.05
+
+# Дні, які ще може закрити rollover (і перерахувати daily_stats), не архівуються
+MIN_ARCHIVE_DAYS = MAX_CATCHUP_DAYS + 1
+
+
+async def run_archive() -> Dict[str, int]:
+    """
+    Перенести в архів усе старіше за межу.
+    Повертає кількість перенесених рядків по таблицях.
+    """
+    days = max(config.ARCHIVE_AFTER_DAYS, MIN_ARCHIVE_DAYS)
+    cutoff = (clock.local_today(config.TIMEZONE) - timedelta(days=days)).isoformat()
+    
+    # Нема чого переносити — архів не створюється, запити історії його не чіпають
+    if not await queries.has_archivable(cutoff):
+        return {}
+    await queries.start_archive(cutoff)
+    
+    moved = {}
+    for table in queries.ARCHIVE_TABLES:
+        started = time.perf_counter()
+        moved[table] = 0
+        after = 0
+        while True:
+            count, after = await queries.archive_batch(table, cutoff, after)
+            if after is None:
+                break
+            moved[table] += count
+            await asyncio.sleep(ARCHIVE_PAUSE)
+        
+        if moved[table]:
+            logger.info(
+                f"🗄 Архів {table}: {moved[table]} рядків до {cutoff} "
+                f"за {time.perf_counter() - started:.1f} с"
+            )
+    
+    return moved
+
+
+async def archive_loop() -> None:
+    """Фонова задача: архівування раз на ARCHIVE_INTERVAL (перше — після старту)."""
+    while True:
+        try:
+            await run_archive()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("❌ Помилка архівування")
+        
+        await asyncio.sleep(ARCHIVE_INTERVAL)
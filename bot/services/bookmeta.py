@@ -0,0 +1,132 @@
+"""
+Метадані файлів книг: кількість сторінок, назва, автор.
+LifeHub Bot v4.0
+
+Чисті функції без доступу до БД — виконуються в пулі процесів
+(services/workers.py), вхід — шлях до вже завантаженого файлу.
+
+- PDF: PyMuPDF (fitz), якщо встановлений; інакше — /Count дерева сторінок
+  (з розпакуванням object streams для PDF 1.5+)
+- EPUB: назва й автор з OPF, сторінки — оцінка за обсягом тексту
+  (EPUB_CHARS_PER_PAGE символів на сторінку)
+"""
+
+import posixpath
+import re
+import zipfile
+import zlib
+from typing import Any, Dict, Optional
+from urllib.parse import unquote
+from xml.etree import ElementTree
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+
+# Розширення → формат
+BOOK_FORMATS = {'.pdf': 'pdf', '.epub': 'epub'}
+
+# Середня друкована сторінка
+EPUB_CHARS_PER_PAGE = 1800
+
+_PAGES_COUNT = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b")
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_FLATE_STREAM = re.compile(rb"/FlateDecode[^>]*>>\s*stream\r?\n")
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+_NS = {
+    'container': 'urn:oasis:names:tc:opendocument:xmlns:container',
+    'opf': 'http://www.idpf.org/2007/opf',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+}
+
+
+def _pdf_count(data: bytes) -> Optional[int]:
+    """Найбільший /Count серед вузлів /Pages (корінь дерева сторінок)."""
+    counts = [int(a or b) for a, b in _PAGES_COUNT.findall(data)]
+    return max(counts) if counts else None
+
+
+def _pdf_metadata(path: str) -> Dict[str, Any]:
+    if fitz is not None:
+        with fitz.open(path) as doc:
+            meta = doc.metadata or {}
+            return {
+                'pages': doc.page_count,
+                'title': meta.get('title') or None,
+                'author': meta.get('author') or None,
+            }
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    pages = _pdf_count(data)
+    if pages is None:
+        # PDF 1.5+: словники сторінок стиснуті в object streams
+        pages = 0
+        for match in _FLATE_STREAM.finditer(data):
+            end = data.find(b"endstream", match.end())
+            if end < 0:
+                continue
+            try:
+                chunk = zlib.decompressobj().decompress(data[match.end():end])
+            except zlib.error:
+                continue
+            count = _pdf_count(chunk)
+            if count is not None:
+                pages = max(pages, count)
+        pages = pages or len(_PAGE_OBJECT.findall(data)) or None
+
+    return {'pages': pages, 'title': None, 'author': None}
+
+
+def _epub_metadata(path: str) -> Dict[str, Any]:
+    with zipfile.ZipFile(path) as book:
+        container = ElementTree.fromstring(book.read("META-INF/container.xml"))
+        rootfile = container.find(".//container:rootfile", _NS)
+        opf_path = rootfile.get("full-path")
+        opf = ElementTree.fromstring(book.read(opf_path))
+        base = posixpath.dirname(opf_path)
+
+        title = opf.findtext(".//dc:title", namespaces=_NS)
+        author = opf.findtext(".//dc:creator", namespaces=_NS)
+
+        manifest = {
+            item.get("id"): item.get("href")
+            for item in opf.iterfind(".//opf:manifest/opf:item", _NS)
+        }
+        chars = 0
+        for itemref in opf.iterfind(".//opf:spine/opf:itemref", _NS):
+            href = manifest.get(itemref.get("idref"))
+            if not href:
+                continue
+            try:
+                html = book.read(posixpath.join(base, unquote(href))).decode("utf-8", "ignore")
+            except KeyError:
+                continue
+            chars += len(_SPACE.sub(" ", _TAG.sub(" ", html)).strip())
+
+    return {
+        'pages': max(1, round(chars / EPUB_CHARS_PER_PAGE)) if chars else None,
+        'title': title.strip() if title else None,
+        'author': author.strip() if author else None,
+    }
+
+
+def extract_metadata(path: str, kind: str) -> Dict[str, Any]:
+    """
+    Точка входу для пулу процесів. kind: pdf | epub.
+    Повертає {'pages', 'title', 'author'} (None — не вдалося визначити).
+    """
+    try:
+        if kind == 'pdf':
+            return _pdf_metadata(path)
+        if kind == 'epub':
+            return _epub_metadata(path)
+    except (OSError, ValueError, KeyError, AttributeError, RuntimeError,
+            zipfile.BadZipFile, ElementTree.ParseError):
+        pass
+    return {'pages': None, 'title': None, 'author': None}
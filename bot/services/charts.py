@@ -0,0 +1,137 @@
+"""
+Графіки: heatmap звички і тренд Target / Metric у вигляді фото.
+LifeHub Bot v4.0
+
+1. Дані → spec (лише те, що впливає на пікселі)
+2. key = sha256(CHART_VERSION + spec)
+3. key вже є в chart_cache → повторно надсилаємо фото за file_id
+4. інакше рендер у пулі процесів (services/render.py), завантаження,
+   file_id зберігається під key
+
+Однакові графіки рендеряться і вантажаться в Telegram один раз.
+Змінили вигляд графіків — збільшіть CHART_VERSION.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
+
+from bot.database import queries
+from bot.services import render, workers
+
+
+logger = logging.getLogger(__name__)
+
+CHART_VERSION = 1
+
+# Тижнів у heatmap звички
+HEATMAP_WEEKS = 53
+
+# Скільки file_id тримати в пам'яті перед chart_cache
+MEMORY_CACHE_SIZE = 1024
+
+_HEATMAP_CODES = {'done': 'd', 'skipped': 's', 'missed': 'm'}
+
+_file_ids: "OrderedDict[str, str]" = OrderedDict()
+
+# Рендер, що вже виконується: key → future (однакові запити чекають один рендер)
+_rendering: Dict[str, asyncio.Future] = {}
+
+
+def chart_key(spec: Dict[str, Any]) -> str:
+    """Хеш вмісту графіка."""
+    payload = json.dumps([CHART_VERSION, spec], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def heatmap_spec(habit_id: int, user_id: int) -> Dict[str, Any]:
+    """Spec heatmap: коди днів від понеділка HEATMAP_WEEKS тижнів тому до сьогодні."""
+    today = await queries.get_user_today(user_id)
+    start = today - timedelta(days=today.weekday() + 7 * (HEATMAP_WEEKS - 1))
+    statuses = await queries.get_habit_statuses(habit_id, user_id, start)
+
+    days = []
+    day = start
+    while day <= today:
+        days.append(_HEATMAP_CODES.get(statuses.get(day.isoformat()), '.'))
+        day += timedelta(days=1)
+
+    return {'kind': 'heatmap', 'start': start.isoformat(), 'days': "".join(days)}
+
+
+def trend_spec(trend: Dict[str, Any]) -> Dict[str, Any]:
+    """Spec графіка з результату trends.get_goal_trend()."""
+    return {
+        'kind': 'trend',
+        'labels': trend['labels'],
+        'values': trend['values'],
+        'rolling': trend['rolling'],
+        'min': trend['min'],
+        'max': trend['max'],
+        'band': list(trend['band']) if trend.get('band') else None,
+        'bars': trend['goal_type'] == 'target',
+    }
+
+
+def _remember(key: str, file_id: str) -> None:
+    _file_ids[key] = file_id
+    _file_ids.move_to_end(key)
+    while len(_file_ids) > MEMORY_CACHE_SIZE:
+        _file_ids.popitem(last=False)
+
+
+async def _render(key: str, spec: Dict[str, Any]) -> bytes:
+    """Рендер у пулі процесів; паралельні запити того ж key чекають один рендер."""
+    pending = _rendering.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _rendering[key] = future
+    try:
+        png = await workers.run(render.render, spec)
+        future.set_result(png)
+        return png
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()   # щоб не було "exception was never retrieved"
+        raise
+    finally:
+        _rendering.pop(key, None)
+
+
+async def send_chart(message: Message, spec: Dict[str, Any], caption: str) -> None:
+    """Надіслати графік: за file_id, якщо такий уже є, інакше рендер + завантаження."""
+    key = chart_key(spec)
+
+    file_id = _file_ids.get(key) or await queries.get_chart_file_id(key)
+    if file_id:
+        try:
+            await message.answer_photo(file_id, caption=caption)
+            _remember(key, file_id)
+            return
+        except TelegramBadRequest:
+            logger.warning(f"⚠️ file_id графіка {key[:12]} більше не дійсний")
+            _file_ids.pop(key, None)
+            await queries.delete_chart_file_id(key)
+
+    png = await _render(key, spec)
+    sent = await message.answer_photo(
+        BufferedInputFile(png, filename=f"{spec['kind']}.png"),
+        caption=caption,
+    )
+    file_id = sent.photo[-1].file_id
+    _remember(key, file_id)
+    await queries.save_chart_file_id(key, file_id)
+
+
+def cache_stats() -> Dict[str, int]:
+    """Розмір кешу в пам'яті — для /perf."""
+    return {'memory': len(_file_ids), 'rendering': len(_rendering)}
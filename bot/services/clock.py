@@ -0,0 +1,84 @@
+"""
+Годинник застосунку: локальний час і "сьогодні" для кожного користувача.
+LifeHub Bot v4.0
+
+ВАЖЛИВО: НЕ використовувати date.today() / datetime.now() сервера!
+Дата користувача залежить від його часового поясу (user_settings.timezone),
+тому всі обчислення дат ідуть через local_today() / local_now().
+
+Годинник можна підмінити через set_clock() — тести та бенчмарки
+використовують FrozenClock, щоб зафіксувати час.
+"""
+
+from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from bot.config import config
+
+
+class Clock:
+    """Системний годинник. Повертає поточний момент в UTC."""
+
+    def utcnow(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+
+class FrozenClock(Clock):
+    """Зафіксований годинник (для тестів і бенчмарків)."""
+
+    def __init__(self, moment: datetime):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        self.moment = moment
+
+    def utcnow(self) -> datetime:
+        return self.moment
+
+    def advance(self, **kwargs) -> None:
+        """Зсунути час вперед: advance(days=1), advance(minutes=30)."""
+        self.moment += timedelta(**kwargs)
+
+
+_clock: Clock = Clock()
+
+
+def get_clock() -> Clock:
+    """Поточний годинник застосунку."""
+    return _clock
+
+
+def set_clock(clock: Clock) -> None:
+    """Підмінити годинник (FrozenClock для тестів, Clock() щоб повернути)."""
+    global _clock
+    _clock = clock
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: Optional[str] = None) -> ZoneInfo:
+    """
+    ZoneInfo за назвою (кешується — кожна зона парситься один раз).
+    Невідома зона → config.TIMEZONE → UTC.
+    """
+    for candidate in (name, config.TIMEZONE):
+        if not candidate:
+            continue
+        try:
+            return ZoneInfo(candidate)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    return ZoneInfo("UTC")
+
+
+def local_now(tz_name: Optional[str] = None) -> datetime:
+    """
+    Поточний локальний час у зоні tz_name (naive datetime).
+    Саме в такому вигляді зберігаємо completed_at в БД.
+    """
+    return _clock.utcnow().astimezone(get_zone(tz_name)).replace(tzinfo=None)
+
+
+def local_today(tz_name: Optional[str] = None) -> date:
+    """Поточна локальна дата у зоні tz_name."""
+    return local_now(tz_name).date()
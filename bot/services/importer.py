@@ -0,0 +1,361 @@
+"""
+Імпорт задач і звичок з CSV / JSON.
+LifeHub Bot v4.0
+
+Файл читається потоково (рядок за рядком / об'єкт за об'єктом) в окремому
+потоці, кожен рядок валідується і перетворюється на кортеж для
+queries.bulk_import() — одна транзакція на весь файл.
+
+Політика "все або нічого": якщо хоч один рядок невалідний —
+нічого не вставляється, користувач отримує перелік помилок з номерами рядків.
+
+Формати:
+- csv: заголовок з назвами колонок (UTF-8, роздільник , або ;)
+- json: масив об'єктів [...] або JSON Lines (один об'єкт на рядок)
+
+Колонки:
+- type: task | habit (за замовчуванням task; goal_type=habit з експорту теж працює)
+- title (обов'язково), description
+- task: priority (0-3), deadline (РРРР-ММ-ДД або ДД.ММ.РРРР), scheduled_time,
+  scheduled_end, estimated_minutes, recurrence_rule (daily/weekdays/custom),
+  recurrence_days (1,3,5), is_fixed, goal_id (ID активного проєкту)
+- habit: frequency (daily/weekdays/custom), schedule_days, reminder_time,
+  duration_minutes, parent_id (ID активного проєкту)
+
+Виконані задачі (is_completed=1) пропускаються.
+"""
+
+import asyncio
+import csv
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bot.database import queries
+
+
+# Ліміт рядків в одному файлі
+MAX_ROWS = 100_000
+
+# Скільки помилок показувати користувачу
+MAX_ERRORS = 10
+
+# Рядків на одну порцію парсингу (в окремому потоці)
+PARSE_CHUNK = 5000
+
+# Скільки символів значення з файлу цитувати в помилці
+ERROR_VALUE_CHARS = 30
+
+RECURRENCE_RULES = ('daily', 'weekdays', 'custom')
+HABIT_FREQUENCIES = ('daily', 'weekdays', 'custom')
+
+_TIME_RE = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+_DAYS_RE = re.compile(r"^[1-7](,[1-7])*$")
+_TRUE = ('1', 'true', 'yes', 'так', '+')
+_FALSE = ('', '0', 'false', 'no', 'ні', '-')
+
+
+class ImportFileError(ValueError):
+    """Файл не вдалося прочитати (формат, кодування, ліміт рядків)."""
+
+
+@dataclass
+class ImportResult:
+    """Результат парсингу + валідації."""
+    tasks: List[tuple] = field(default_factory=list)
+    habits: List[tuple] = field(default_factory=list)
+    skipped: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    error_count: int = 0
+
+    @property
+    def total(self) -> int:
+        return len(self.tasks) + len(self.habits)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line, message))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                              ЧИТАННЯ ФАЙЛУ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _iter_csv(stream) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    sample = stream.read(4096)
+    stream.seek(0)
+    delimiter = ';' if sample.count(';') > sample.count(',') else ','
+
+    reader = csv.DictReader(stream, delimiter=delimiter)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _iter_jsonl(stream) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ImportFileError(f"рядок {line_no}: некоректний JSON ({e.msg})")
+
+
+def _iter_json_array(stream) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Потоковий розбір масиву [...] — в пам'яті тільки поточний шматок файлу."""
+    decoder = json.JSONDecoder()
+    buffer = stream.read(65536).lstrip()[1:]   # пропускаємо '['
+    index = 0
+
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        while not buffer:
+            chunk = stream.read(65536)
+            if not chunk:
+                raise ImportFileError("JSON-масив не закритий")
+            buffer = chunk.lstrip(" \t\r\n,")
+        if buffer[0] == ']':
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            chunk = stream.read(65536)
+            if not chunk:
+                raise ImportFileError(f"об'єкт {index + 1}: некоректний JSON ({e.msg})")
+            buffer += chunk
+            continue
+
+        index += 1
+        yield index, obj
+        buffer = buffer[end:]
+
+
+def iter_records(path: Path, stream) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(номер рядка/об'єкта, словник) — формат за розширенням або вмістом."""
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        return _iter_csv(stream)
+
+    head = stream.read(1024).lstrip('﻿ \t\r\n')
+    stream.seek(0)
+    if head.startswith('['):
+        return _iter_json_array(stream)
+    if head.startswith('{'):
+        return _iter_jsonl(stream)
+    if suffix in ('.json', '.jsonl'):
+        raise ImportFileError("очікується JSON-масив або JSON Lines")
+    return _iter_csv(stream)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#                              ВАЛІДАЦІЯ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _text(row: Dict[str, Any], key: str) -> Optional[str]:
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _int(row: Dict[str, Any], key: str, low: int = None, high: int = None) -> Optional[int]:
+    value = _text(row, key)
+    if value is None:
+        return None
+    # "2.0" (Excel) — так; 2.7, inf, nan, 1e999 — помилка рядка, а не всього імпорту
+    try:
+        number = float(value)
+        if not number.is_integer():
+            raise ValueError(value)
+        number = int(number)
+    except (ValueError, OverflowError):
+        raise ValueError(f"{key}: очікується ціле число")
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise ValueError(f"{key}: має бути від {low} до {high}")
+    return number
+
+
+def _bool(row: Dict[str, Any], key: str) -> bool:
+    value = (_text(row, key) or '').lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"{key}: очікується 0/1")
+
+
+def _time(row: Dict[str, Any], key: str) -> Optional[str]:
+    value = _text(row, key)
+    if value is None:
+        return None
+    match = _TIME_RE.match(value)
+    if not match:
+        raise ValueError(f"{key}: очікується ГГ:ХХ")
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
+
+def _date(row: Dict[str, Any], key: str) -> Optional[str]:
+    value = _text(row, key)
+    if value is None:
+        return None
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value[:10], fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"{key}: очікується РРРР-ММ-ДД або ДД.ММ.РРРР")
+
+
+def _days(row: Dict[str, Any], key: str) -> Optional[str]:
+    value = _text(row, key)
+    if value is None:
+        return None
+    value = value.replace(' ', '')
+    if not _DAYS_RE.match(value):
+        raise ValueError(f"{key}: очікуються дні 1-7 через кому")
+    return ",".join(sorted(set(value.split(',')), key=int))
+
+
+def _project(row: Dict[str, Any], key: str, projects: set) -> Optional[int]:
+    project_id = _int(row, key)
+    if project_id is not None and project_id not in projects:
+        raise ValueError(f"{key}: проєкт #{str(project_id)[:ERROR_VALUE_CHARS]} не знайдено")
+    return project_id
+
+
+def _task_row(row: Dict[str, Any], projects: set) -> tuple:
+    rule = (_text(row, 'recurrence_rule') or '').lower() or None
+    if rule is not None and rule not in RECURRENCE_RULES:
+        raise ValueError(f"recurrence_rule: одне з {', '.join(RECURRENCE_RULES)}")
+
+    days = _days(row, 'recurrence_days')
+    if rule == 'custom' and not days:
+        raise ValueError("recurrence_days: обов'язково для custom")
+
+    priority = _int(row, 'priority', 0, 3)
+
+    return (
+        _text(row, 'title'),
+        _text(row, 'description'),
+        2 if priority is None else priority,
+        None if rule else _date(row, 'deadline'),
+        _time(row, 'scheduled_time'),
+        _time(row, 'scheduled_end'),
+        _int(row, 'estimated_minutes', 1, 24 * 60),
+        int(rule is not None),
+        rule,
+        days if rule == 'custom' else None,
+        int(_bool(row, 'is_fixed')),
+        _project(row, 'goal_id', projects),
+    )
+
+
+def _habit_row(row: Dict[str, Any], projects: set) -> tuple:
+    frequency = (_text(row, 'frequency') or 'daily').lower()
+    if frequency not in HABIT_FREQUENCIES:
+        raise ValueError(f"frequency: одне з {', '.join(HABIT_FREQUENCIES)}")
+
+    days = _days(row, 'schedule_days')
+    if frequency == 'custom' and not days:
+        raise ValueError("schedule_days: обов'язково для custom")
+
+    return (
+        _text(row, 'title'),
+        _text(row, 'description'),
+        _project(row, 'parent_id', projects) or _project(row, 'goal_id', projects),
+        frequency,
+        days if frequency == 'custom' else None,
+        _time(row, 'reminder_time'),
+        _int(row, 'duration_minutes', 1, 24 * 60),
+    )
+
+
+def _validate(records: List[Tuple[int, Any]], projects: set, result: ImportResult) -> None:
+    """Провалідувати порцію записів (виконується в окремому потоці)."""
+    for line, row in records:
+        if not isinstance(row, dict):
+            result.add_error(line, "очікується об'єкт з полями")
+            continue
+
+        kind = (_text(row, 'type') or _text(row, 'goal_type') or 'task').lower()
+        try:
+            if not _text(row, 'title'):
+                raise ValueError("title: обов'язкове поле")
+
+            if kind == 'task':
+                if _bool(row, 'is_completed'):
+                    result.skipped += 1
+                    continue
+                result.tasks.append(_task_row(row, projects))
+            elif kind == 'habit':
+                result.habits.append(_habit_row(row, projects))
+            else:
+                raise ValueError(f"type: task або habit, а не '{kind[:ERROR_VALUE_CHARS]}'")
+        except ValueError as e:
+            result.add_error(line, str(e))
+
+
+def _read_chunk(records: Iterator, size: int) -> List[Tuple[int, Any]]:
+    chunk = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) >= size:
+            break
+    return chunk
+
+
+async def parse_file(user_id: int, path: Path) -> ImportResult:
+    """
+    Прочитати та провалідувати файл порціями по PARSE_CHUNK рядків.
+
+    ImportFileError — файл не читається як CSV/JSON або більший за MAX_ROWS.
+    """
+    projects = {p['id'] for p in await queries.get_projects(user_id)}
+    result = ImportResult()
+    rows = 0
+
+    try:
+        stream = await asyncio.to_thread(open, path, encoding='utf-8-sig', newline='')
+    except OSError as e:
+        raise ImportFileError(str(e))
+
+    try:
+        records = await asyncio.to_thread(iter_records, path, stream)
+        while True:
+            chunk = await asyncio.to_thread(_read_chunk, records, PARSE_CHUNK)
+            if not chunk:
+                break
+            rows += len(chunk)
+            if rows > MAX_ROWS:
+                raise ImportFileError(f"більше {MAX_ROWS} рядків")
+            await asyncio.to_thread(_validate, chunk, projects, result)
+    except UnicodeDecodeError:
+        raise ImportFileError("файл має бути в кодуванні UTF-8")
+    except csv.Error as e:
+        raise ImportFileError(f"некоректний CSV ({e})")
+    finally:
+        await asyncio.to_thread(stream.close)
+
+    return result
+
+
+async def import_file(user_id: int, path: Path) -> Tuple[ImportResult, Optional[Dict[str, int]]]:
+    """
+    Парсинг + вставка.
+
+    Повертає (result, counts). counts = None, якщо є помилки валідації
+    (нічого не вставлено).
+    """
+    result = await parse_file(user_id, path)
+    if result.error_count or not result.total:
+        return result, None
+
+    counts = await queries.bulk_import(user_id, result.tasks, result.habits)
+    return result, counts
@@ -0,0 +1,217 @@
+"""
+Метрики апдейтів: гістограми по хендлерах і endpoint /metrics.
+LifeHub Bot v4.0
+
+На кожен апдейт bot/middlewares/metrics.py збирає UpdateStats:
+хендлер, загальний час, час у aiosqlite, кількість SQL і commit
+(з DbSession), запити до Bot API. Тут вони складаються в гістограми
+з фіксованими кошиками і віддаються у форматі Prometheus:
+
+    curl http://127.0.0.1:$METRICS_PORT/metrics
+
+Endpoint слухає лише localhost і вмикається METRICS_PORT у .env.
+Ті самі гістограми (перцентилі) і останні повільні апдейти показує /perf.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_COUNTS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+# Метрика → (опис, кошики)
+HISTOGRAMS = {
+    'lifehub_update_duration_seconds': ("Wall time of an update", _SECONDS),
+    'lifehub_update_db_seconds': ("Time spent in aiosqlite per update", _SECONDS),
+    'lifehub_update_sql_statements': ("SQL statements per update", _COUNTS),
+    'lifehub_update_db_commits': ("Commits per update", _COUNTS),
+    'lifehub_update_api_calls': ("Bot API requests per update", _COUNTS),
+    'lifehub_update_api_seconds': ("Time spent in Bot API requests per update", _SECONDS),
+}
+
+# Скільки останніх повільних апдейтів тримати для /perf
+SLOW_KEEP = 10
+
+COUNTERS = {
+    'lifehub_update_errors_total': "Updates that raised an exception",
+    'lifehub_slow_updates_total': "Updates slower than SLOW_UPDATE_MS",
+}
+
+
+@dataclass
+class UpdateStats:
+    """Лічильники одного апдейту."""
+    task: Optional[asyncio.Task] = field(default_factory=asyncio.current_task)
+    started: float = field(default_factory=time.perf_counter)
+    handler: str = "unhandled"
+    api_calls: int = 0
+    api_time: float = 0.0
+
+
+class Histogram:
+    """Кумулятивна гістограма з кошиками le."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        result, total = [], 0
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Оцінка перцентиля: лінійно всередині кошика (як histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        # Вище останнього кошика — відома лише нижня межа
+        return self.buckets[-1]
+
+
+_current: ContextVar[Optional[UpdateStats]] = ContextVar("update_stats", default=None)
+
+# (метрика, хендлер) → гістограма / лічильник
+_histograms: Dict[Tuple[str, str], Histogram] = {}
+_counters: Dict[Tuple[str, str], int] = {}
+_slow: Deque[Dict[str, Any]] = deque(maxlen=SLOW_KEEP)
+_in_flight = 0
+
+
+def start_update() -> Tuple[UpdateStats, Token]:
+    global _in_flight
+    _in_flight += 1
+    stats = UpdateStats()
+    return stats, _current.set(stats)
+
+
+def end_update(token: Token) -> None:
+    global _in_flight
+    _in_flight -= 1
+    _current.reset(token)
+
+
+def current_update() -> Optional[UpdateStats]:
+    """Статистика апдейту поточної задачі (фонові задачі не рахуються)."""
+    stats = _current.get()
+    if stats is not None and stats.task is asyncio.current_task():
+        return stats
+    return None
+
+
+def observe(name: str, handler: str, value: float) -> None:
+    histogram = _histograms.get((name, handler))
+    if histogram is None:
+        histogram = _histograms[(name, handler)] = Histogram(HISTOGRAMS[name][1])
+    histogram.observe(value)
+
+
+def increment(name: str, handler: str) -> None:
+    _counters[(name, handler)] = _counters.get((name, handler), 0) + 1
+
+
+def remember_slow(entry: Dict[str, Any]) -> None:
+    _slow.append(entry)
+
+
+def slow_updates() -> List[Dict[str, Any]]:
+    """Останні повільні апдейти, новіші першими."""
+    return list(reversed(_slow))
+
+
+def latency(limit: int = 15) -> List[Dict[str, Any]]:
+    """p50 / p95 / p99 часу апдейту по хендлерах (мс), найчастіші першими."""
+    rows = [
+        {
+            'handler': handler,
+            'count': histogram.count,
+            'p50': histogram.quantile(0.5) * 1000,
+            'p95': histogram.quantile(0.95) * 1000,
+            'p99': histogram.quantile(0.99) * 1000,
+        }
+        for (name, handler), histogram in _histograms.items()
+        if name == 'lifehub_update_duration_seconds'
+    ]
+    rows.sort(key=lambda row: row['count'], reverse=True)
+    return rows[:limit]
+
+
+def update_stats() -> Dict[str, int]:
+    """Апдейти в обробці і всього — для /perf."""
+    total = sum(
+        histogram.count for (name, _), histogram in _histograms.items()
+        if name == 'lifehub_update_duration_seconds'
+    )
+    errors = sum(v for (name, _), v in _counters.items() if name == 'lifehub_update_errors_total')
+    return {'in_flight': _in_flight, 'total': total, 'errors': errors}
+
+
+def _format_le(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else str(bound)
+
+
+def render() -> str:
+    """Всі метрики у текстовому форматі Prometheus 0.0.4."""
+    lines = []
+    for name, (description, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, handler), histogram in sorted(_histograms.items()):
+            if metric != name:
+                continue
+            for bound, total in zip(buckets, histogram.cumulative()):
+                lines.append(f'{name}_bucket{{handler="{handler}",le="{_format_le(bound)}"}} {total}')
+            lines.append(f'{name}_bucket{{handler="{handler}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{handler="{handler}"}} {round(histogram.sum, 6)}')
+            lines.append(f'{name}_count{{handler="{handler}"}} {histogram.count}')
+    for name, description in COUNTERS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for (metric, handler), value in sorted(_counters.items()):
+            if metric == name:
+                lines.append(f'{name}{{handler="{handler}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+async def start_server(port: int):
+    """HTTP endpoint /metrics на 127.0.0.1:port (зупинка — runner.cleanup())."""
+    # aiohttp.web (~30 мс імпорту) — лише коли endpoint увімкнено
+    from aiohttp import web
+
+    async def metrics_handler(request: web.Request) -> web.Response:
+        return web.Response(
+            body=render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    logger.info(f"📈 Метрики: http://127.0.0.1:{port}/metrics")
+    return runner
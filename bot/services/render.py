@@ -0,0 +1,201 @@
+"""
+Рендер графіків у PNG (тільки stdlib: zlib + struct).
+LifeHub Bot v4.0
+
+Чисті функції без доступу до БД і event loop — виконуються
+в пулі процесів (services/workers.py). Вхід — spec зі services/charts.py
+(лише прості типи, щоб передавався між процесами), вихід — байти PNG.
+
+Підписів у зображенні немає — числа й дати йдуть у caption повідомлення.
+"""
+
+import struct
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Color = Tuple[int, int, int]
+
+WHITE: Color = (255, 255, 255)
+GRID: Color = (235, 235, 235)
+BAND: Color = (216, 243, 220)
+RANGE: Color = (205, 205, 205)
+LINE: Color = (31, 119, 180)
+ROLLING: Color = (255, 127, 14)
+
+# Heatmap: код дня → колір (як у GitHub)
+HEATMAP_COLORS: Dict[str, Color] = {
+    '.': (235, 237, 240),   # немає логу
+    'd': (48, 161, 78),     # done
+    's': (155, 233, 168),   # skipped
+    'm': (244, 166, 166),   # missed
+    ' ': WHITE,             # майбутнє
+}
+
+HEATMAP_CELL = 20
+HEATMAP_GAP = 4
+HEATMAP_MARGIN = 20
+
+LINE_WIDTH = 1000
+LINE_HEIGHT = 500
+LINE_MARGIN = 30
+
+
+class Canvas:
+    """RGB-полотно з мінімальним набором примітивів."""
+
+    def __init__(self, width: int, height: int, background: Color = WHITE):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(bytes(background) * (width * height))
+
+    def fill_rect(self, x0: int, y0: int, x1: int, y1: int, color: Color) -> None:
+        """Прямокутник [x0, x1) × [y0, y1), обрізаний по краях."""
+        x0, x1 = max(0, min(x0, x1)), min(self.width, max(x0, x1))
+        y0, y1 = max(0, min(y0, y1)), min(self.height, max(y0, y1))
+        if x0 >= x1 or y0 >= y1:
+            return
+        row = bytes(color) * (x1 - x0)
+        for y in range(y0, y1):
+            start = (y * self.width + x0) * 3
+            self.pixels[start:start + len(row)] = row
+
+    def line(self, x0: int, y0: int, x1: int, y1: int, color: Color, width: int = 1) -> None:
+        """Відрізок (Брезенгем) квадратним пензлем товщиною width."""
+        half = width // 2
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        err = dx + dy
+        while True:
+            self.fill_rect(x0 - half, y0 - half, x0 - half + width, y0 - half + width, color)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def polyline(self, points: Sequence[Tuple[int, int]], color: Color, width: int = 1) -> None:
+        if len(points) == 1:
+            x, y = points[0]
+            self.fill_rect(x - width, y - width, x + width + 1, y + width + 1, color)
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            self.line(x0, y0, x1, y1, color, width)
+
+    def to_png(self) -> bytes:
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return (
+                struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+            )
+
+        stride = self.width * 3
+        raw = bytearray()
+        for y in range(self.height):
+            raw.append(0)   # filter: None
+            raw += self.pixels[y * stride:(y + 1) * stride]
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(bytes(raw), 6))
+            + chunk(b"IEND", b"")
+        )
+
+
+def render_heatmap(spec: Dict) -> bytes:
+    """
+    Heatmap звички: колонки — тижні, рядки — Пн..Нд.
+    spec['days'] — рядок кодів HEATMAP_COLORS, по символу на день від понеділка.
+    """
+    days: str = spec['days']
+    weeks = max(1, -(-len(days) // 7))
+    step = HEATMAP_CELL + HEATMAP_GAP
+
+    canvas = Canvas(
+        2 * HEATMAP_MARGIN + weeks * step - HEATMAP_GAP,
+        2 * HEATMAP_MARGIN + 7 * step - HEATMAP_GAP,
+    )
+    for index, code in enumerate(days):
+        x = HEATMAP_MARGIN + (index // 7) * step
+        y = HEATMAP_MARGIN + (index % 7) * step
+        canvas.fill_rect(x, y, x + HEATMAP_CELL, y + HEATMAP_CELL, HEATMAP_COLORS.get(code, WHITE))
+    return canvas.to_png()
+
+
+def render_trend(spec: Dict) -> bytes:
+    """
+    Тренд Target / Metric.
+
+    spec: values, rolling, min, max (рівні за довжиною), band (lo, hi) або None,
+    bars — True для Target (стовпчики сум замість лінії).
+    """
+    values: List[float] = spec['values']
+    rolling: List[float] = spec['rolling']
+    lows: List[float] = spec['min']
+    highs: List[float] = spec['max']
+    band: Optional[Sequence[Optional[float]]] = spec.get('band')
+    bars: bool = spec.get('bars', False)
+
+    canvas = Canvas(LINE_WIDTH, LINE_HEIGHT)
+    left, right = LINE_MARGIN, LINE_WIDTH - LINE_MARGIN
+    top, bottom = LINE_MARGIN, LINE_HEIGHT - LINE_MARGIN
+
+    # Горизонтальна сітка
+    for i in range(5):
+        y = top + (bottom - top) * i // 4
+        canvas.fill_rect(left, y, right, y + 1, GRID)
+
+    if not values:
+        return canvas.to_png()
+
+    span = [*values, *rolling] + ([*lows, *highs] if not bars else [0])
+    if band:
+        span += [b for b in band if b is not None]
+    lo, hi = min(span), max(span)
+    if hi == lo:
+        lo, hi = lo - 1, hi + 1
+    pad = (hi - lo) * 0.05
+    lo, hi = lo - pad, hi + pad
+
+    def y_of(value: float) -> int:
+        return int(round(bottom - (value - lo) / (hi - lo) * (bottom - top)))
+
+    count = len(values)
+    slot = (right - left) / count
+
+    def x_of(index: int) -> int:
+        return int(round(left + slot * (index + 0.5)))
+
+    if band:
+        band_lo = band[0] if band[0] is not None else lo
+        band_hi = band[1] if band[1] is not None else hi
+        canvas.fill_rect(left, y_of(band_hi), right, y_of(band_lo) + 1, BAND)
+
+    if bars:
+        width = max(1, int(slot * 0.7))
+        for i, value in enumerate(values):
+            x = x_of(i)
+            canvas.fill_rect(x - width // 2, y_of(value), x - width // 2 + width, y_of(0) + 1, LINE)
+    else:
+        for i in range(count):
+            if highs[i] != lows[i]:
+                canvas.line(x_of(i), y_of(highs[i]), x_of(i), y_of(lows[i]), RANGE, 3)
+        canvas.polyline([(x_of(i), y_of(v)) for i, v in enumerate(values)], LINE, 3)
+
+    canvas.polyline([(x_of(i), y_of(v)) for i, v in enumerate(rolling)], ROLLING, 2)
+    return canvas.to_png()
+
+
+RENDERERS = {
+    'heatmap': render_heatmap,
+    'trend': render_trend,
+}
+
+
+def render(spec: Dict) -> bytes:
+    """Точка входу для пулу процесів."""
+    return RENDERERS[spec['kind']](spec)
@@ -0,0 +1,81 @@
+"""
+Day rollover — закриття минулих днів після опівночі.
+LifeHub Bot v4.0
+
+Кожен часовий пояс — окремий "кошик": коли в ньому настає нова дата,
+вчорашній день закривається одним set-based проходом (queries.close_day):
+пропущені звички → 'missed', pending occurrences → 'missed',
+обірвані серії → 0, знімок daily_stats.
+
+Після простою бота пропущені дні закриваються по черзі
+(але не більше MAX_CATCHUP_DAYS назад).
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Dict
+
+from bot.database import queries
+from bot.services import clock
+
+
+logger = logging.getLogger(__name__)
+
+# Як часто перевіряти, чи настала нова дата (секунди)
+CHECK_INTERVAL = 60
+
+# Скільки днів максимум закриваємо після простою
+MAX_CATCHUP_DAYS = 31
+
+
+async def run_rollover() -> int:
+    """
+    Закрити всі дні, що вже минули, в кожному часовому поясі.
+    Повертає кількість закритих (пояс, день).
+    """
+    closed = 0
+    
+    for tz_name in await queries.get_timezone_buckets():
+        today = clock.local_today(tz_name)
+        last_closed = await queries.get_last_closed_day(tz_name)
+        
+        if last_closed is None:
+            # Перший запуск — закриваємо тільки вчора
+            day = today - timedelta(days=1)
+        else:
+            day = max(last_closed + timedelta(days=1), today - timedelta(days=MAX_CATCHUP_DAYS))
+        
+        while day < today:
+            result = await queries.close_day(tz_name, day)
+            logger.info(f"🌙 Rollover {tz_name} {day.isoformat()}: {result}")
+            closed += 1
+            day += timedelta(days=1)
+    
+    return closed
+
+
+async def backlog() -> Dict[str, int]:
+    """Скільки минулих днів ще не закрито в кожному поясі — для /perf."""
+    result = {}
+    for tz_name in await queries.get_timezone_buckets():
+        last_closed = await queries.get_last_closed_day(tz_name)
+        today = clock.local_today(tz_name)
+        if last_closed is None:
+            result[tz_name] = 1
+        else:
+            result[tz_name] = min(max((today - last_closed).days - 1, 0), MAX_CATCHUP_DAYS)
+    return result
+
+
+async def rollover_loop() -> None:
+    """Фонова задача: перевіряє настання нової дати кожні CHECK_INTERVAL секунд."""
+    while True:
+        try:
+            await run_rollover()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("❌ Помилка day rollover")
+        
+        await asyncio.sleep(CHECK_INTERVAL)
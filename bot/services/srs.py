@@ -0,0 +1,215 @@
+"""
+Повторення слів за SM-2.
+LifeHub Bot v4.0
+
+Сесія повторення живе в пам'яті:
+- картки йдуть порціями з черги (queries.get_due_words, keyset по (due_date, id))
+- наступна порція довантажується у фоні, поки користувач відповідає на поточну
+- оцінка рахується одразу (sm2), а в БД пишеться пакетом — в кінці сесії
+  або кожні FLUSH_SIZE відповідей (queries.apply_word_reviews)
+
+Відповідь на картку не чіпає SQLite — затримка не залежить від розміру словника.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from bot.database import queries
+from bot.services import clock
+
+
+logger = logging.getLogger(__name__)
+
+# Коли в черзі лишилось стільки карток — довантажуємо наступну порцію
+PREFETCH_AT = 5
+
+# Скільки відповідей тримати в пам'яті до запису в БД
+FLUSH_SIZE = 100
+
+# Сесія без відповідей довше — закривається при наступному зверненні
+SESSION_IDLE = 30 * 60
+
+# Оцінка < цього — картку не згадали: повтор з інтервалом 1 і ще раз у цій сесії
+PASS_QUALITY = 3
+
+MIN_EASE = 1.3
+
+
+@dataclass(frozen=True)
+class Review:
+    """Новий стан картки після відповіді."""
+    ease_factor: float
+    interval: int
+    repetitions: int
+    due_date: date
+
+
+def sm2(ease_factor: float, interval: int, repetitions: int, quality: int, today: date) -> Review:
+    """
+    Один крок SM-2. quality: 0..5.
+
+    Не згадали (quality < 3) — repetitions з нуля, повтор завтра.
+    Згадали — інтервал 1 → 6 → interval * EF. EF змінюється за кожну відповідь.
+    """
+    ease = ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    ease = max(MIN_EASE, ease)
+
+    if quality < PASS_QUALITY:
+        repetitions, interval = 0, 1
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease_factor)
+        repetitions += 1
+
+    return Review(round(ease, 2), interval, repetitions, today + timedelta(days=interval))
+
+
+class ReviewSession:
+    """Сесія повторення одного користувача."""
+
+    def __init__(self, user_id: int, tz_name: str):
+        self.user_id = user_id
+        # Пояс фіксується на сесію: і дата черги, і last_review — в ньому
+        self.tz_name = tz_name
+        self.today = clock.local_today(tz_name)
+        self.queue: Deque[Dict[str, Any]] = deque()
+        self.pending: Dict[int, tuple] = {}
+        self.reviewed = 0
+        self.failed = 0
+        self.last_active = time.monotonic()
+
+        self._cursor: Optional[Tuple[str, int]] = None
+        self._exhausted = False
+        self._prefetch: Optional[asyncio.Task] = None
+        self._relearned: set = set()
+
+    async def _load_batch(self) -> None:
+        if self._exhausted:
+            return
+        batch = await queries.get_due_words(self.user_id, self.today, after=self._cursor)
+        if len(batch) < queries.WORDS_BATCH_SIZE:
+            self._exhausted = True
+        if batch:
+            self._cursor = (batch[-1]['due_date'], batch[-1]['id'])
+            self.queue.extend(batch)
+
+    def _schedule_prefetch(self) -> None:
+        if self._exhausted or len(self.queue) > PREFETCH_AT:
+            return
+        if self._prefetch is None or self._prefetch.done():
+            self._prefetch = asyncio.get_running_loop().create_task(self._load_batch())
+
+    async def current(self) -> Optional[Dict[str, Any]]:
+        """Поточна картка. None — черга на сьогодні порожня."""
+        if not self.queue:
+            if self._prefetch is not None and not self._prefetch.done():
+                await self._prefetch
+            if not self.queue:
+                await self._load_batch()
+        self._schedule_prefetch()
+        return self.queue[0] if self.queue else None
+
+    async def answer(self, word_id: int, quality: int) -> bool:
+        """
+        Оцінити поточну картку. False — word_id не поточна картка
+        (повторне натискання старої кнопки).
+        """
+        if not self.queue or self.queue[0]['id'] != word_id:
+            return False
+
+        card = self.queue.popleft()
+        self.last_active = time.monotonic()
+
+        # Повтор у тій самій сесії розклад не змінює — лише закріплення
+        if word_id not in self._relearned:
+            review = sm2(card['ease_factor'], card['interval'], card['repetitions'], quality, self.today)
+            self.pending[word_id] = (
+                review.ease_factor, review.interval, review.repetitions,
+                review.due_date.isoformat(), clock.local_now(self.tz_name).isoformat(timespec='seconds'),
+            )
+            self.reviewed += 1
+
+        if quality < PASS_QUALITY:
+            if word_id not in self._relearned:
+                self.failed += 1
+            self._relearned.add(word_id)
+            self.queue.append(card)
+
+        if len(self.pending) >= FLUSH_SIZE:
+            await self.flush()
+        self._schedule_prefetch()
+        return True
+
+    async def flush(self) -> int:
+        """Записати накопичені відповіді в БД."""
+        if not self.pending:
+            return 0
+        reviews = [(word_id, *values) for word_id, values in self.pending.items()]
+        self.pending = {}
+        return await queries.apply_word_reviews(self.user_id, reviews)
+
+    async def close(self) -> Dict[str, int]:
+        """Завершити сесію: зупинити довантаження і записати відповіді."""
+        if self._prefetch is not None and not self._prefetch.done():
+            self._prefetch.cancel()
+        await self.flush()
+        return {'reviewed': self.reviewed, 'failed': self.failed}
+
+
+_sessions: Dict[int, ReviewSession] = {}
+
+
+async def start_session(user_id: int) -> ReviewSession:
+    """Нова сесія (попередня, якщо була, закривається)."""
+    await finish_session(user_id)
+    session = ReviewSession(user_id, await queries.get_user_timezone(user_id))
+    _sessions[user_id] = session
+    await _close_idle()
+    return session
+
+
+def get_session(user_id: int) -> Optional[ReviewSession]:
+    return _sessions.get(user_id)
+
+
+async def finish_session(user_id: int) -> Optional[Dict[str, int]]:
+    session = _sessions.pop(user_id, None)
+    if session is None:
+        return None
+    return await session.close()
+
+
+async def _close_idle() -> None:
+    """Закрити покинуті сесії (відповіді не губляться — записуються)."""
+    deadline = time.monotonic() - SESSION_IDLE
+    for user_id in [uid for uid, s in _sessions.items() if s.last_active < deadline]:
+        try:
+            await finish_session(user_id)
+        except Exception:
+            logger.exception(f"❌ Не вдалося закрити сесію слів {user_id}")
+
+
+async def close_all() -> None:
+    """Записати всі незавершені сесії (при зупинці бота)."""
+    for user_id in list(_sessions):
+        try:
+            await finish_session(user_id)
+        except Exception:
+            logger.exception(f"❌ Не вдалося закрити сесію слів {user_id}")
+
+
+def session_stats() -> Dict[str, int]:
+    """Активні сесії і незаписані відповіді — для /perf."""
+    return {
+        'sessions': len(_sessions),
+        'pending': sum(len(s.pending) for s in _sessions.values()),
+    }
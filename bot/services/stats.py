@@ -0,0 +1,134 @@
+"""
+Історія статистики: тиждень / місяць / рік.
+LifeHub Bot v4.0
+
+Читає готові рядки daily_stats (пише day rollover) + наживо рахує
+поточний день. Сирі логи не скануються.
+
+Backfill для існуючої БД:
+    python -m bot.services.stats --backfill [--since РРРР-ММ-ДД]
+
+Перерахунок current_value / progress Target з усіх записів (repair):
+    python -m bot.services.stats --repair-targets
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+from typing import Dict, Any, List
+
+from bot.database import queries
+
+
+# Період → кількість днів (включно з сьогодні)
+PERIODS = {
+    'week': 7,
+    'month': 30,
+    'year': 365,
+}
+
+
+def _done_count(row: Dict[str, Any]) -> int:
+    """Скільки всього зроблено за день/місяць."""
+    return (
+        (row.get('tasks_completed') or 0)
+        + (row.get('occurrences_done') or 0)
+        + (row.get('habits_done') or 0)
+    )
+
+
+async def get_period_stats(user_id: int, period: str = 'week') -> Dict[str, Any]:
+    """
+    Статистика за період.
+
+    Повертає:
+    - totals: суми по всіх полях DAILY_STATS_FIELDS
+    - series: [(мітка, зроблено)] — по днях (week/month) або по місяцях (year)
+    """
+    days = PERIODS.get(period, PERIODS['week'])
+    today = await queries.get_user_today(user_id)
+    start = today - timedelta(days=days - 1)
+    yesterday = today - timedelta(days=1)
+
+    live = await queries.get_live_day_stats(user_id, today)
+    totals = {field: live.get(field) or 0 for field in queries.DAILY_STATS_FIELDS}
+
+    series: List[tuple] = []
+
+    if period == 'year':
+        rows = await queries.get_monthly_stats(user_id, start, yesterday)
+        by_month = {row['month']: row for row in rows}
+
+        month = start.replace(day=1)
+        while month <= today:
+            key = month.strftime("%Y-%m")
+            row = dict(by_month.get(key) or {})
+            if key == today.strftime("%Y-%m"):
+                for field in queries.DAILY_STATS_FIELDS:
+                    row[field] = (row.get(field) or 0) + (live.get(field) or 0)
+            series.append((month.strftime("%m.%y"), _done_count(row)))
+            month = (month + timedelta(days=32)).replace(day=1)
+
+        for row in rows:
+            for field in queries.DAILY_STATS_FIELDS:
+                totals[field] += row[field] or 0
+    else:
+        rows = await queries.get_daily_stats(user_id, start, yesterday)
+        by_day = {row['date']: row for row in rows}
+
+        day = start
+        while day < today:
+            row = by_day.get(day.isoformat()) or {}
+            series.append((day.strftime("%d.%m"), _done_count(row)))
+            day += timedelta(days=1)
+        series.append((today.strftime("%d.%m"), _done_count(live)))
+
+        for row in rows:
+            for field in queries.DAILY_STATS_FIELDS:
+                totals[field] += row[field] or 0
+
+    return {
+        'period': period,
+        'start': start.isoformat(),
+        'end': today.isoformat(),
+        'totals': totals,
+        'series': series,
+    }
+
+
+def sparkline(values: List[int]) -> str:
+    """Міні-графік з блоків ▁▂▃▄▅▆▇█."""
+    blocks = "▁▂▃▄▅▆▇█"
+    top = max(values) if values else 0
+    if top == 0:
+        return blocks[0] * len(values)
+    return "".join(blocks[min(7, v * 8 // (top + 1))] for v in values)
+
+
+async def _main() -> None:
+    """CLI: backfill daily_stats / repair прогресу Target."""
+    from bot.database.models import init_database
+
+    parser = argparse.ArgumentParser(description="LifeHub daily_stats")
+    parser.add_argument("--backfill", action="store_true", help="заповнити daily_stats з існуючих даних")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="з дати (РРРР-ММ-ДД)")
+    parser.add_argument("--repair-targets", action="store_true", help="перерахувати прогрес Target з записів")
+    args = parser.parse_args()
+
+    if not args.backfill and not args.repair_targets:
+        parser.print_help()
+        return
+
+    await init_database()
+
+    if args.backfill:
+        processed = await queries.backfill_daily_stats(args.since)
+        print(f"✅ daily_stats: оброблено {processed} днів")
+
+    if args.repair_targets:
+        fixed = await queries.repair_target_progress()
+        print(f"✅ Target: виправлено {fixed} цілей")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,181 @@
+"""
+Індекс підказок для inline-режиму.
+LifeHub Bot v4.0
+
+На кожного користувача в пам'яті тримаємо:
+- відкриті пункти на сьогодні (задачі, recurring, звички) — для швидкого виконання
+- недавні назви задач — для швидкого повторного додавання
+
+Inline-запит відповідає тільки з індексу — SQLite на гарячому шляху не чіпаємо.
+Індекс будується при першому запиті користувача і перебудовується у фоні
+після змін його даних (change listener) або при зміні дати.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+from bot.database import queries
+
+
+logger = logging.getLogger(__name__)
+
+# Скільки користувачів тримати в пам'яті (LRU)
+MAX_USERS = 5000
+
+# Скільки недавніх назв задач індексувати
+RECENT_TITLES = 50
+
+# Зміни, після яких індекс застаріває
+TRACKED_ENTITIES = ('tasks', 'goals', 'occurrences', 'habit_logs')
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """Пункт індексу. kind: task | recurring | habit | recent."""
+    kind: str
+    id: int
+    title: str
+    time: Optional[str]
+    key: str        # title.casefold() — для пошуку
+
+
+@dataclass(frozen=True)
+class UserIndex:
+    """Знімок підказок користувача на дату day."""
+    day: date
+    open_items: Tuple[Suggestion, ...]
+    recent: Tuple[Suggestion, ...]
+
+    def match(self, text: str, limit: int) -> Tuple[List[Suggestion], List[Suggestion]]:
+        """
+        (відкриті пункти, недавні назви), що містять text.
+        Недавні назви, які збігаються з відкритими задачами, пропускаються.
+        """
+        needle = text.strip().casefold()
+        open_items = [item for item in self.open_items if needle in item.key][:limit]
+
+        taken = {item.key for item in open_items}
+        recent = [
+            item for item in self.recent
+            if needle in item.key and item.key not in taken and item.key != needle
+        ][:max(0, limit - len(open_items))]
+
+        return open_items, recent
+
+
+_indexes: "OrderedDict[int, UserIndex]" = OrderedDict()
+
+# Фонові перебудови: user_id → task; _dirty — зміни, що прийшли під час перебудови
+_refreshing: Dict[int, asyncio.Task] = {}
+_dirty: Set[int] = set()
+
+
+async def _build(user_id: int) -> UserIndex:
+    """Зібрати індекс з БД."""
+    today = await queries.get_user_today(user_id)
+    schedule = await queries.get_today_schedule(user_id, today)
+    open_items = []
+
+    for item in schedule['timeline']:
+        if item['type'] == 'task':
+            kind, done = 'task', item.get('is_completed')
+        elif item['type'] == 'recurring_task':
+            kind, done = 'recurring', item['occurrence']['status'] != 'pending'
+        else:
+            kind, done = 'habit', item.get('today_status') is not None
+        if done:
+            continue
+        open_items.append(Suggestion(
+            kind=kind,
+            id=item['id'],
+            title=item['title'],
+            time=item.get('time'),
+            key=item['title'].casefold(),
+        ))
+
+    recent = tuple(
+        Suggestion(kind='recent', id=row['id'], title=row['title'], time=None, key=row['title'].casefold())
+        for row in await queries.get_recent_task_titles(user_id, RECENT_TITLES)
+    )
+
+    return UserIndex(day=today, open_items=tuple(open_items), recent=recent)
+
+
+def _store(user_id: int, index: UserIndex) -> None:
+    _indexes[user_id] = index
+    _indexes.move_to_end(user_id)
+    while len(_indexes) > MAX_USERS:
+        _indexes.popitem(last=False)
+
+
+async def _refresh(user_id: int) -> None:
+    """Перебудовувати, доки під час перебудови приходять нові зміни."""
+    try:
+        while True:
+            _dirty.discard(user_id)
+            _store(user_id, await _build(user_id))
+            if user_id not in _dirty:
+                break
+    except Exception:
+        logger.exception(f"❌ Не вдалося перебудувати inline-індекс {user_id}")
+        _indexes.pop(user_id, None)
+    finally:
+        _refreshing.pop(user_id, None)
+
+
+def _schedule_refresh(user_id: int) -> None:
+    _dirty.add(user_id)
+    if user_id in _refreshing:
+        return
+    try:
+        _refreshing[user_id] = asyncio.get_running_loop().create_task(_refresh(user_id))
+    except RuntimeError:
+        # Немає event loop (CLI-скрипти) — просто скидаємо індекс
+        _dirty.discard(user_id)
+        _indexes.pop(user_id, None)
+
+
+def _on_change(user_id: Optional[int], entity: str) -> None:
+    if entity not in TRACKED_ENTITIES:
+        return
+    targets = list(_indexes) if user_id is None else [user_id]
+    for target in targets:
+        # Перебудовуємо тільки тих, хто вже користувався inline-режимом
+        if target in _indexes:
+            _schedule_refresh(target)
+
+
+queries.add_change_listener(_on_change)
+
+
+async def get_index(user_id: int) -> UserIndex:
+    """
+    Індекс користувача.
+
+    Гарячий шлях — лише пам'ять. БД читається, тільки якщо індексу ще немає,
+    настала нова дата або якраз іде перебудова після зміни.
+    """
+    pending = _refreshing.get(user_id)
+    if pending is not None:
+        await asyncio.shield(pending)
+
+    index = _indexes.get(user_id)
+    if index is None or index.day != await queries.get_user_today(user_id):
+        index = await _build(user_id)
+        _store(user_id, index)
+    else:
+        _indexes.move_to_end(user_id)
+    return index
+
+
+def index_stats() -> Dict[str, int]:
+    """Розмір індексу — для /perf."""
+    return {
+        'users': len(_indexes),
+        'refreshing': len(_refreshing),
+        'items': sum(len(i.open_items) + len(i.recent) for i in _indexes.values()),
+    }
@@ -0,0 +1,169 @@
+"""
+Тренди Target / Metric цілей.
+LifeHub Bot v4.0
+
+Ряди для графіків з goal_entries:
+- month — по днях (сирі записи за 30 днів)
+- quarter / year — по тижнях, all — по місяцях (готові кошики goal_entry_buckets)
+
+Для Metric: середнє по кошику, мін / макс (смуга), ковзне середнє,
+темп (зважена лінійна регресія) і прогноз входу в цільовий діапазон.
+Для Target: сума по кошику, ковзне середнє, темп і прогноз досягнення.
+
+Кількість точок обмежена MAX_POINTS — багаторічна історія
+зливається в ширші кошики, відповідь не росте з кількістю записів.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from bot.database import queries
+
+
+# Період → (зерно, днів назад; None — вся історія)
+TREND_PERIODS = {
+    'month': ('day', 30),
+    'quarter': ('week', 91),
+    'year': ('week', 364),
+    'all': ('month', None),
+}
+
+# Вікно ковзного середнього (в кошиках)
+ROLLING_WINDOW = {'day': 7, 'week': 4, 'month': 3}
+
+# Середина кошика в днях (x для регресії)
+_GRAIN_MIDDLE = {'day': 0, 'week': 3, 'month': 15}
+
+# Максимум точок у відповіді
+MAX_POINTS = 60
+
+
+def _start_for(grain: str, days: Optional[int], today: date) -> Optional[date]:
+    """Перша дата періоду, вирівняна на початок кошика."""
+    if days is None:
+        return None
+    start = today - timedelta(days=days - 1)
+    if grain == 'week':
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def _merge(rows: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Злити сусідні кошики, щоб точок було не більше limit."""
+    if len(rows) <= limit:
+        return rows
+    size = -(-len(rows) // limit)
+    merged = []
+    for i in range(0, len(rows), size):
+        group = rows[i:i + size]
+        merged.append({
+            'bucket': group[0]['bucket'],
+            'count': sum(r['count'] for r in group),
+            'total': sum(r['total'] for r in group),
+            'min_value': min(r['min_value'] for r in group),
+            'max_value': max(r['max_value'] for r in group),
+        })
+    return merged
+
+
+def _regression(xs: List[float], ys: List[float], ws: List[float]) -> Optional[float]:
+    """Нахил зваженої лінійної регресії (одиниць за день). None — мало точок."""
+    weight = sum(ws)
+    if len(xs) < 2 or weight <= 0:
+        return None
+    mean_x = sum(w * x for w, x in zip(ws, xs)) / weight
+    mean_y = sum(w * y for w, y in zip(ws, ys)) / weight
+    var_x = sum(w * (x - mean_x) ** 2 for w, x in zip(ws, xs))
+    if var_x == 0:
+        return None
+    cov = sum(w * (x - mean_x) * (y - mean_y) for w, x, y in zip(ws, xs, ys))
+    return cov / var_x
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+async def get_goal_trend(goal_id: int, user_id: int, period: str = 'quarter') -> Optional[Dict[str, Any]]:
+    """
+    Тренд цілі за період. None — ціль не знайдено або це не Target / Metric.
+
+    Повертає компактні масиви однакової довжини (labels, values, min, max,
+    count, rolling) + підсумки: last, slope_per_week і прогноз
+    (metric: band, in_band_pct, days_to_band; target: remaining, days_to_target).
+    """
+    goal = await queries.get_goal_by_id(goal_id, user_id)
+    if not goal or goal['goal_type'] not in ('target', 'metric'):
+        return None
+
+    grain, days = TREND_PERIODS.get(period, TREND_PERIODS['quarter'])
+    today = await queries.get_user_today(user_id)
+    start = _start_for(grain, days, today)
+
+    rows = await queries.get_goal_entry_series(goal_id, user_id, grain, start)
+    rows = _merge(rows, MAX_POINTS)
+
+    is_metric = goal['goal_type'] == 'metric'
+    # Metric — середнє значення виміру, Target — скільки додано за кошик
+    values = [r['total'] / r['count'] if is_metric else r['total'] for r in rows]
+    counts = [r['count'] for r in rows]
+
+    window = ROLLING_WINDOW[grain]
+    rolling = []
+    for i in range(len(rows)):
+        lo = max(0, i - window + 1)
+        if is_metric:
+            rolling.append(sum(r['total'] for r in rows[lo:i + 1]) / sum(counts[lo:i + 1]))
+        else:
+            rolling.append(sum(values[lo:i + 1]) / (i + 1 - lo))
+
+    first = date.fromisoformat(rows[0]['bucket']) if rows else today
+    xs = [(date.fromisoformat(r['bucket']) - first).days + _GRAIN_MIDDLE[grain] for r in rows]
+
+    trend: Dict[str, Any] = {
+        'goal_id': goal_id,
+        'goal_type': goal['goal_type'],
+        'period': period,
+        'grain': grain,
+        'labels': [r['bucket'] for r in rows],
+        'values': [_round(v) for v in values],
+        'min': [_round(r['min_value']) for r in rows],
+        'max': [_round(r['max_value']) for r in rows],
+        'count': counts,
+        'rolling': [_round(v) for v in rolling],
+        'last': _round(values[-1]) if values else None,
+        'slope_per_week': None,
+    }
+
+    if is_metric:
+        slope = _regression(xs, values, counts)
+        low, high = goal.get('target_min'), goal.get('target_max')
+        trend['band'] = (low, high)
+        trend['in_band_pct'] = None
+        trend['days_to_band'] = None
+
+        if values and (low is not None or high is not None):
+            inside = [
+                (low is None or v >= low) and (high is None or v <= high)
+                for v in values
+            ]
+            trend['in_band_pct'] = int(sum(inside) * 100 / len(inside))
+
+            last = values[-1]
+            if slope and not inside[-1]:
+                edge = low if low is not None and last < low else high
+                distance = edge - last
+                if distance * slope > 0:
+                    trend['days_to_band'] = int(distance / slope) + 1
+    else:
+        # Темп Target — середня сума за день за період
+        span = (today - first).days + 1 if rows else 0
+        slope = sum(values) / span if span > 0 else None
+        remaining = max(0.0, (goal.get('target_value') or 0) - (goal.get('current_value') or 0))
+        trend['remaining'] = _round(remaining)
+        trend['days_to_target'] = int(remaining / slope) + 1 if slope and remaining > 0 else None
+
+    if slope is not None:
+        trend['slope_per_week'] = _round(slope * 7)
+
+    return trend
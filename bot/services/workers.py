@@ -0,0 +1,60 @@
+"""
+Пул процесів для CPU-важкої роботи (рендер графіків, метадані книг).
+LifeHub Bot v4.0
+
+Event loop не блокується: функція виконується в окремому процесі,
+хендлер лише чекає на результат. Пул створюється при першому виклику
+(spawn — без fork процесу з уже запущеними потоками aiosqlite)
+і закривається в bot.main при зупинці.
+
+ВАЖЛИВО: функції та аргументи мають бути picklable —
+top-level функції модулів без доступу до БД
+(див. services/render.py, services/bookmeta.py).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = min(2, os.cpu_count() or 1)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run(func: Callable, *args: Any) -> Any:
+    """Виконати func(*args) в пулі процесів."""
+    global _pool
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(), partial(func, *args))
+    except BrokenProcessPool:
+        # Процес впав (OOM, kill) — пересоздаємо пул і пробуємо ще раз
+        logger.warning("⚠️ Пул процесів зламався — перезапуск")
+        shutdown()
+        return await loop.run_in_executor(_get_pool(), partial(func, *args))
+
+
+def shutdown() -> None:
+    """Закрити пул (не чекаючи незавершених задач)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
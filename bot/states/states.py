@@ -156,6 +156,15 @@ class LearningSession(StatesGroup):
     rate = State()            # Оцінка (0-5)
 
 
+# ╔════════════════════════════════════════════════════════════════════════════╗
+# ║                               DATA                                           ║
+# ╚════════════════════════════════════════════════════════════════════════════╝
+
+class DataImport(StatesGroup):
+    """Імпорт задач і звичок з файлу."""
+    file = State()            # Очікування документа (CSV / JSON)
+
+
 # ╔════════════════════════════════════════════════════════════════════════════╗
 # ║                             SETTINGS                                         ║
 # ╚════════════════════════════════════════════════════════════════════════════╝